@@ -1,3 +1,8 @@
-from .base_anonymizer import Anonymizer, AnonymizerException  # noqa
+from .base_anonymizer import Anonymizer, AnonymizerException, SALT_APPEND, SALT_LOCATIONS, SALT_PREPEND  # noqa
+from .hashlib_anonymizer import HashlibAnonymizer  # noqa
 from .sha_anonymizer import SHAAnonymizer  # noqa
 from .md5_anonymizer import MD5Anonymizer  # noqa
+from .blake2_anonymizer import BLAKE2Anonymizer, BLAKE2_VARIANTS  # noqa
+from .hmac_anonymizer import HMACAnonymizer  # noqa
+from .cached_anonymizer import CachedAnonymizer, CacheStats, ENTRY_OVERHEAD  # noqa
+from .pseudonym_store import PseudonymStore, StoredAnonymizer, DEFAULT_MAX_ENTRIES, DEFAULT_STORE_CACHE_SIZE  # noqa
@@ -1,4 +1,9 @@
 import abc
+from typing import Callable
+
+SALT_PREPEND = "prepend"
+SALT_APPEND = "append"
+SALT_LOCATIONS = [SALT_PREPEND, SALT_APPEND]
 
 
 class AnonymizerException(Exception):
@@ -9,3 +14,41 @@ class Anonymizer(metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def encode_data(self, input_data):
         pass
+
+    def get_salted_encoder(self, salt: str, salt_location: str) -> Callable[[str], str]:
+        """
+        Returns a function that anonymizes a single value with the salt added to it.
+        Subclasses may override it to prepare as much of the work as possible once instead of per value.
+        Args:
+            salt: Salt string.
+            salt_location: "prepend" or "append".
+
+        Returns:
+            Function taking the value and returning the anonymized value.
+        """
+        if salt_location == SALT_PREPEND:
+            def encode(value: str) -> str:
+                return self.encode_data("".join([salt, value]))
+        elif salt_location == SALT_APPEND:
+            def encode(value: str) -> str:
+                return self.encode_data("".join([value, salt]))
+        else:
+            raise AnonymizerException(f"{salt_location} salt location is not supported, "
+                                      f"use one of {SALT_LOCATIONS}")
+        return encode
+
+    def get_salted_bytes_encoder(self, salt: str, salt_location: str) -> Callable[[bytes], bytes]:
+        """
+        Returns a function that anonymizes a single UTF-8 encoded value, the result is encoded the same way.
+        The default decodes the value for the salted encoder, anonymizers hashing bytes override it.
+        """
+        encode = self.get_salted_encoder(salt, salt_location)
+
+        def encode_bytes(value: bytes) -> bytes:
+            return encode(value.decode()).encode()
+        return encode_bytes
+
+    def flush(self) -> None:
+        """
+        Called after a file is anonymized, anonymizers buffering state (e.g. a pseudonym store) persist it.
+        """
@@ -0,0 +1,61 @@
+import hashlib
+from functools import partial
+from typing import Callable, Optional
+
+from .base_anonymizer import AnonymizerException, SALT_LOCATIONS
+from .hashlib_anonymizer import HashlibAnonymizer
+
+BLAKE2_VARIANTS = {
+    "b": hashlib.blake2b,
+    "s": hashlib.blake2s
+}
+
+
+class BLAKE2Anonymizer(HashlibAnonymizer):
+    """
+    BLAKE2b or BLAKE2s hex digest of a configurable size. The salt is used as the native BLAKE2 key instead
+    of being added to the value, so the salt location has no effect. Salts longer than the maximal key size
+    are hashed to a key of that size first.
+    """
+
+    def __init__(self, variant: str = "b", digest_size: Optional[int] = None) -> None:
+        if variant not in BLAKE2_VARIANTS:
+            raise AnonymizerException(f"BLAKE2{variant} is not supported by BLAKE2Anonymizer")
+        self.variant = variant
+        hash_constructor = BLAKE2_VARIANTS[variant]
+        self.digest_size = digest_size or hash_constructor.MAX_DIGEST_SIZE
+        if not 1 <= self.digest_size <= hash_constructor.MAX_DIGEST_SIZE:
+            raise AnonymizerException(f"Digest size of BLAKE2{variant} must be between 1 and "
+                                      f"{hash_constructor.MAX_DIGEST_SIZE} bytes, not {digest_size}")
+        super().__init__(partial(hash_constructor, digest_size=self.digest_size))
+
+    def get_salted_encoder(self, salt: str, salt_location: str) -> Callable[[str], str]:
+        keyed_state = self.get_keyed_state(salt, salt_location)
+
+        def encode(value: str) -> str:
+            value_hash = keyed_state.copy()
+            value_hash.update(value.encode())
+            return value_hash.hexdigest()
+        return encode
+
+    def get_salted_bytes_encoder(self, salt: str, salt_location: str) -> Callable[[bytes], bytes]:
+        keyed_state = self.get_keyed_state(salt, salt_location)
+
+        def encode_bytes(value: bytes) -> bytes:
+            value_hash = keyed_state.copy()
+            value_hash.update(value)
+            return value_hash.hexdigest().encode()
+        return encode_bytes
+
+    def get_keyed_state(self, salt: str, salt_location: str):
+        if salt_location not in SALT_LOCATIONS:
+            raise AnonymizerException(f"{salt_location} salt location is not supported, "
+                                      f"use one of {SALT_LOCATIONS}")
+        return self.hash_constructor(key=self.get_key(salt))
+
+    def get_key(self, salt: str) -> bytes:
+        hash_constructor = BLAKE2_VARIANTS[self.variant]
+        key = salt.encode()
+        if len(key) > hash_constructor.MAX_KEY_SIZE:
+            key = hash_constructor(key, digest_size=hash_constructor.MAX_KEY_SIZE).digest()
+        return key
@@ -0,0 +1,97 @@
+from collections import OrderedDict
+import sys
+from typing import Callable, Optional, Tuple
+
+from .base_anonymizer import Anonymizer
+
+# approximate memory taken by one OrderedDict entry on top of its key and value strings
+ENTRY_OVERHEAD = 100
+
+
+class CacheStats:
+    def __init__(self, hits: int = 0, misses: int = 0, evictions: int = 0) -> None:
+        self.hits = hits
+        self.misses = misses
+        self.evictions = evictions
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def merge(self, other: "CacheStats") -> None:
+        self.hits += other.hits
+        self.misses += other.misses
+        self.evictions += other.evictions
+
+    def __str__(self) -> str:
+        return (f"{self.hits} hits, {self.misses} misses, {self.evictions} evictions, "
+                f"hit ratio {self.hit_ratio:.1%}")
+
+
+class CachedAnonymizer(Anonymizer):
+    """
+    Wraps another anonymizer with a least recently used cache keyed on the input value.
+    The cache is bounded by an approximate memory budget, so high cardinality columns only cause evictions.
+    """
+
+    def __init__(self, anonymizer: Anonymizer, max_memory: int) -> None:
+        self.anonymizer = anonymizer
+        self.max_memory = max_memory
+        self.memory = 0
+        self.stats = CacheStats()
+        self._cache = OrderedDict()
+        # salt and salt location the cached values were produced with, None for unsalted encode_data
+        self._salting: Optional[Tuple[str, str]] = None
+
+    def encode_data(self, input_data: str) -> str:
+        self._use_salting(None)
+        return self._get_cached(input_data, self.anonymizer.encode_data)
+
+    def get_salted_encoder(self, salt: str, salt_location: str) -> Callable[[str], str]:
+        """
+        Caches the values of the salted encoder of the wrapped anonymizer, so keyed anonymizers keep their
+        own salting. Values cached with a different salt are dropped.
+        """
+        salted_encoder = self.anonymizer.get_salted_encoder(salt, salt_location)
+        self._use_salting((salt, salt_location))
+
+        def encode(value: str) -> str:
+            return self._get_cached(value, salted_encoder)
+        return encode
+
+    def _use_salting(self, salting: Optional[Tuple[str, str]]) -> None:
+        if salting != self._salting:
+            self._cache.clear()
+            self.memory = 0
+            self._salting = salting
+
+    def _get_cached(self, input_data: str, encoder: Callable[[str], str]) -> str:
+        result = self._cache.get(input_data)
+        if result is not None:
+            self._cache.move_to_end(input_data)
+            self.stats.hits += 1
+            return result
+
+        self.stats.misses += 1
+        result = encoder(input_data)
+        self._add_cached(input_data, result)
+        return result
+
+    def _add_cached(self, input_data: str, result: str) -> None:
+        self._cache[input_data] = result
+        self.memory += sys.getsizeof(input_data) + sys.getsizeof(result) + ENTRY_OVERHEAD
+        while self.memory > self.max_memory and self._cache:
+            evicted_key, evicted_value = self._cache.popitem(last=False)
+            self.memory -= sys.getsizeof(evicted_key) + sys.getsizeof(evicted_value) + ENTRY_OVERHEAD
+            self.stats.evictions += 1
+
+    def flush(self) -> None:
+        self.anonymizer.flush()
+
+    def reset_stats(self) -> CacheStats:
+        """
+        Returns the counters collected since the last reset and starts new ones, the cached values are kept.
+        """
+        stats, self.stats = self.stats, CacheStats()
+        return stats
@@ -0,0 +1,72 @@
+from typing import Callable
+
+from .base_anonymizer import Anonymizer, AnonymizerException, SALT_LOCATIONS, SALT_PREPEND
+
+
+class HashlibAnonymizer(Anonymizer):
+    """
+    Base of anonymizers producing the hex digest of a hashlib hash, the hash constructor is chosen once.
+    """
+
+    def __init__(self, hash_constructor: Callable) -> None:
+        self.hash_constructor = hash_constructor
+
+    def encode_data(self, input_data: str) -> str:
+        return self.hash_constructor(input_data.encode()).hexdigest()
+
+    def get_salted_encoder(self, salt: str, salt_location: str) -> Callable[[str], str]:
+        """
+        For "prepend" the salt is fed to the hash once and the hash state is copied for every value,
+        for "append" the salt bytes are fed after the value, so no salted string is built per value.
+        """
+        hash_constructor = self.hash_constructor
+        salt_bytes = salt.encode()
+
+        if salt_location not in SALT_LOCATIONS:
+            raise AnonymizerException(f"{salt_location} salt location is not supported, "
+                                      f"use one of {SALT_LOCATIONS}")
+
+        if not salt_bytes:
+            def encode(value: str) -> str:
+                return hash_constructor(value.encode()).hexdigest()
+        elif salt_location == SALT_PREPEND:
+            salted_state = hash_constructor(salt_bytes)
+
+            def encode(value: str) -> str:
+                value_hash = salted_state.copy()
+                value_hash.update(value.encode())
+                return value_hash.hexdigest()
+        else:
+            def encode(value: str) -> str:
+                value_hash = hash_constructor(value.encode())
+                value_hash.update(salt_bytes)
+                return value_hash.hexdigest()
+        return encode
+
+    def get_salted_bytes_encoder(self, salt: str, salt_location: str) -> Callable[[bytes], bytes]:
+        """
+        Same as get_salted_encoder, but the raw bytes of the value are hashed and the hex digest is returned as bytes.
+        """
+        hash_constructor = self.hash_constructor
+        salt_bytes = salt.encode()
+
+        if salt_location not in SALT_LOCATIONS:
+            raise AnonymizerException(f"{salt_location} salt location is not supported, "
+                                      f"use one of {SALT_LOCATIONS}")
+
+        if not salt_bytes:
+            def encode_bytes(value: bytes) -> bytes:
+                return hash_constructor(value).hexdigest().encode()
+        elif salt_location == SALT_PREPEND:
+            salted_state = hash_constructor(salt_bytes)
+
+            def encode_bytes(value: bytes) -> bytes:
+                value_hash = salted_state.copy()
+                value_hash.update(value)
+                return value_hash.hexdigest().encode()
+        else:
+            def encode_bytes(value: bytes) -> bytes:
+                value_hash = hash_constructor(value)
+                value_hash.update(salt_bytes)
+                return value_hash.hexdigest().encode()
+        return encode_bytes
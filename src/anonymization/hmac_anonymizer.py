@@ -0,0 +1,44 @@
+import hashlib
+import hmac
+from typing import Callable
+
+from .base_anonymizer import Anonymizer, AnonymizerException, SALT_LOCATIONS
+
+
+class HMACAnonymizer(Anonymizer):
+    """
+    HMAC-SHA256 hex digest keyed by the salt, the salt location has no effect. Without a salt the key is empty.
+    """
+
+    def __init__(self, digest=hashlib.sha256) -> None:
+        self.digest = digest
+
+    def encode_data(self, input_data: str) -> str:
+        return hmac.new(b"", input_data.encode(), self.digest).hexdigest()
+
+    def get_salted_encoder(self, salt: str, salt_location: str) -> Callable[[str], str]:
+        """
+        The key is processed once, every value only copies the prepared inner and outer hash states.
+        """
+        keyed_state = self.get_keyed_state(salt, salt_location)
+
+        def encode(value: str) -> str:
+            value_hash = keyed_state.copy()
+            value_hash.update(value.encode())
+            return value_hash.hexdigest()
+        return encode
+
+    def get_salted_bytes_encoder(self, salt: str, salt_location: str) -> Callable[[bytes], bytes]:
+        keyed_state = self.get_keyed_state(salt, salt_location)
+
+        def encode_bytes(value: bytes) -> bytes:
+            value_hash = keyed_state.copy()
+            value_hash.update(value)
+            return value_hash.hexdigest().encode()
+        return encode_bytes
+
+    def get_keyed_state(self, salt: str, salt_location: str) -> hmac.HMAC:
+        if salt_location not in SALT_LOCATIONS:
+            raise AnonymizerException(f"{salt_location} salt location is not supported, "
+                                      f"use one of {SALT_LOCATIONS}")
+        return hmac.new(salt.encode(), digestmod=self.digest)
@@ -1,12 +1,7 @@
-from .base_anonymizer import Anonymizer
+from .hashlib_anonymizer import HashlibAnonymizer
 import hashlib
 
 
-class MD5Anonymizer(Anonymizer):
+class MD5Anonymizer(HashlibAnonymizer):
     def __init__(self) -> None:
-        pass
-
-    def encode_data(self, input_data: str) -> str:
-        encoded = input_data.encode()
-        result = hashlib.md5(encoded).hexdigest()
-        return result
+        super().__init__(hashlib.md5)
@@ -0,0 +1,172 @@
+import csv
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING, Union
+
+from .base_anonymizer import Anonymizer
+from .cached_anonymizer import CachedAnonymizer
+
+if TYPE_CHECKING:
+    import sqlite3
+
+# new pseudonyms are inserted in batches of this size
+STORE_BATCH_SIZE = 10000
+DEFAULT_MAX_ENTRIES = 50000000
+# memory budget of the recently used pseudonyms held in memory, unless cache_size_mb is set
+DEFAULT_STORE_CACHE_SIZE = 64 * 1024 * 1024
+# seconds a connection waits for other processes writing to the store
+STORE_TIMEOUT = 600
+# values looked up by a single query, below the SQLite limit of query parameters
+LOOKUP_BATCH_SIZE = 500
+
+# connections opened by the current process keyed by the process id and the store path, so a worker process
+# opens one connection and reuses it for all its tasks, forked processes do not use the connection of the parent
+_connections: Dict[Tuple[int, str], "sqlite3.Connection"] = {}
+
+
+class PseudonymStore:
+    """
+    SQLite file mapping original values to their pseudonyms. Pseudonyms of different methods and salts are kept
+    apart by a namespace, a digest of the anonymization settings. The store is shared by worker processes,
+    every process opens a single connection.
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.path = path
+        self.max_entries = max_entries
+
+    @property
+    def connection(self) -> "sqlite3.Connection":
+        key = (os.getpid(), self.path)
+        connection = _connections.get(key)
+        if connection is None:
+            # sqlite3 is imported only when a store is used
+            import sqlite3
+
+            connection = sqlite3.connect(self.path, timeout=STORE_TIMEOUT)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # the primary key is the index used for lookups
+            connection.execute("CREATE TABLE IF NOT EXISTS pseudonyms (namespace TEXT NOT NULL, "
+                               "value TEXT NOT NULL, pseudonym TEXT NOT NULL, "
+                               "PRIMARY KEY (namespace, value)) WITHOUT ROWID")
+            _connections[key] = connection
+        return connection
+
+    def get(self, namespace: str, value: str) -> Optional[str]:
+        row = self.connection.execute("SELECT pseudonym FROM pseudonyms WHERE namespace = ? AND value = ?",
+                                      (namespace, value)).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, namespace: str, values: List[str]) -> Dict[str, str]:
+        """
+        Returns the pseudonyms of the stored values, looked up by queries of up to LOOKUP_BATCH_SIZE values.
+        """
+        pseudonyms = {}
+        for start in range(0, len(values), LOOKUP_BATCH_SIZE):
+            batch = values[start:start + LOOKUP_BATCH_SIZE]
+            placeholders = ", ".join("?" * len(batch))
+            pseudonyms.update(self.connection.execute(
+                f"SELECT value, pseudonym FROM pseudonyms WHERE namespace = ? AND value IN ({placeholders})",
+                [namespace, *batch]))
+        return pseudonyms
+
+    def count(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM pseudonyms").fetchone()[0]
+
+    def add_many(self, namespace: str, pseudonyms: List[Tuple[str, str]]) -> int:
+        """
+        Inserts new pseudonyms until the store holds max_entries of them, returns the number of inserted rows.
+        The write lock is taken before counting, so worker processes adding at the same time cannot exceed the limit.
+        """
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            free_entries = max(self.max_entries - self.count(), 0)
+            cursor = self.connection.executemany(
+                "INSERT OR IGNORE INTO pseudonyms (namespace, value, pseudonym) VALUES (?, ?, ?)",
+                ((namespace, value, pseudonym) for value, pseudonym in pseudonyms[:free_entries]))
+        return cursor.rowcount
+
+    def export_csv(self, namespace: str, csv_path: str) -> None:
+        cursor = self.connection.execute("SELECT value, pseudonym FROM pseudonyms WHERE namespace = ? "
+                                         "ORDER BY value", (namespace,))
+        with open(csv_path, "w", newline="") as csv_file:
+            csv.writer(csv_file).writerows(cursor)
+
+    def close(self) -> None:
+        connection = _connections.pop((os.getpid(), self.path), None)
+        if connection is not None:
+            connection.close()
+
+
+class StoredAnonymizer(CachedAnonymizer):
+    """
+    Looks up pseudonyms of salted values in a PseudonymStore before hashing them, new pseudonyms are added
+    to the store in batches. Recently used pseudonyms are kept in the least recently used cache bounded
+    by max_memory, other values are looked up by the primary key of the store, at once for the values
+    of a batch passed to prefetch. The statistics count reused (hits) and new (misses) pseudonyms.
+    """
+
+    def __init__(self, anonymizer: Anonymizer, store: PseudonymStore, namespace: str,
+                 max_memory: int = DEFAULT_STORE_CACHE_SIZE) -> None:
+        super().__init__(anonymizer, max_memory)
+        self.store = store
+        self.namespace = namespace
+        # new pseudonyms not yet inserted into the store
+        self._pending: Dict[str, str] = {}
+        # values of the current batch looked up in the store, None for values that are not stored
+        self._prefetched: Dict[str, Optional[str]] = {}
+
+    def encode_data(self, input_data: str) -> str:
+        return self.anonymizer.encode_data(input_data)
+
+    def get_salted_encoder(self, salt: str, salt_location: str) -> Callable[[str], str]:
+        salted_encoder = self.anonymizer.get_salted_encoder(salt, salt_location)
+        self._use_salting((salt, salt_location))
+        cache = self._cache
+        pending = self._pending
+        prefetched = self._prefetched
+
+        def encode(value: str) -> str:
+            pseudonym = cache.get(value)
+            if pseudonym is not None:
+                cache.move_to_end(value)
+                self.stats.hits += 1
+                return pseudonym
+            pseudonym = pending.get(value)
+            if pseudonym is None:
+                if value in prefetched:
+                    pseudonym = prefetched.pop(value)
+                else:
+                    pseudonym = self.store.get(self.namespace, value)
+            if pseudonym is not None:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+                pseudonym = salted_encoder(value)
+                pending[value] = pseudonym
+                if len(pending) >= STORE_BATCH_SIZE:
+                    self.flush()
+            self._add_cached(value, pseudonym)
+            return pseudonym
+        return encode
+
+    def prefetch(self, values: Iterable[Union[str, bytes]]) -> None:
+        """
+        Looks up the values of a batch that are not in memory by a few queries, instead of a query per value
+        when they are encoded. Values of the bytes engine are UTF-8 encoded.
+        """
+        cache = self._cache
+        pending = self._pending
+        missing = set()
+        for value in values:
+            if isinstance(value, bytes):
+                value = value.decode()
+            if value not in cache and value not in pending:
+                missing.add(value)
+        stored = self.store.get_many(self.namespace, list(missing)) if missing else {}
+        self._prefetched.clear()
+        self._prefetched.update((value, stored.get(value)) for value in missing)
+
+    def flush(self) -> None:
+        if self._pending:
+            self.store.add_many(self.namespace, list(self._pending.items()))
+            self._pending.clear()
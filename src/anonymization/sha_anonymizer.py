@@ -1,17 +1,16 @@
-from .base_anonymizer import Anonymizer, AnonymizerException
+from .base_anonymizer import AnonymizerException
+from .hashlib_anonymizer import HashlibAnonymizer
 import hashlib
 
+SHA_VERSIONS = {
+    "512": hashlib.sha512,
+    "256": hashlib.sha256
+}
 
-class SHAAnonymizer(Anonymizer):
+
+class SHAAnonymizer(HashlibAnonymizer):
     def __init__(self, sha_ver: str = "512") -> None:
+        if sha_ver not in SHA_VERSIONS:
+            raise AnonymizerException(f"{sha_ver} is not supported by SHAAnonymizer")
         self.sha_ver = sha_ver
-
-    def encode_data(self, input_data: str) -> str:
-        encoded = input_data.encode()
-        if self.sha_ver == "512":
-            result = hashlib.sha512(encoded).hexdigest()
-        elif self.sha_ver == "256":
-            result = hashlib.sha256(encoded).hexdigest()
-        else:
-            raise AnonymizerException(f"{self.sha_ver} is not supported by SHAAnonymizer")
-        return result
+        super().__init__(SHA_VERSIONS[sha_ver])
@@ -8,29 +8,127 @@ import os.path as pt
 import os
 import tempfile
 import glob
+from concurrent.futures import Executor, as_completed
+from functools import partial
 from os import listdir, makedirs
 from os.path import isfile, join
-from anonymization import SHAAnonymizer, MD5Anonymizer, Anonymizer
+from anonymization import SHAAnonymizer, MD5Anonymizer, BLAKE2Anonymizer, HMACAnonymizer, Anonymizer, \
+    AnonymizerException, CachedAnonymizer, CacheStats, ENTRY_OVERHEAD, SALT_LOCATIONS
 
-from typing import List, Dict
+from typing import List, Dict, Tuple, TYPE_CHECKING
 
-from keboola.component.base import ComponentBase
+from keboola.component.base import ComponentBase, sync_action
 from keboola.component.exceptions import UserException
 from keboola.component.dao import TableDefinition, DataType, SupportedDataTypes
+from keboola.component.interface import Configuration
 from typing import Any
 from typing import Optional
-from decompress import Decompressor, DecompressorException
-import fnmatch
+from typing import Callable
+from pattern_matching import PatternMatcher
+from incremental import SliceState, IncrementalStateException, config_fingerprint
+from instrumentation import PerformanceReport, StageMetrics, measure, profile_call
+from csv_tools import read_header, open_table_file, is_gzip_file, split_byte_ranges, OutputSlicing, GZIP_EXTENSION, \
+    DEFAULT_COMPRESSION_LEVEL
+
+# the archive extraction, the engines other than csv, the pseudonym store, passthrough, table scheduling and
+# profiling are imported by the code using them, so that the component starts without importing unused features
+if TYPE_CHECKING:
+    from anonymization import PseudonymStore
+    from decompress import ArchiveMetrics
+    from engines import PipelineSettings, PipelineStats
+    from scheduling import TableTask
 
 # type of anonymization/encryption : SHA, MD5, AES
 KEY_ENCRYPT_METHOD = "method"
 KEY_SALT = "#salt"
 KEY_SALT_LOCATION = "salt_location"  # prepend, append
+# digest size in bytes of the BLAKE2b and BLAKE2s methods, the maximum (64 and 32) by default
+KEY_DIGEST_SIZE = "digest_size"
 
 KEBOOLA_ZIPPED_EXTENSIONS: List[str] = [".gz"]
 DEFAULT_SALT_LOCATION = "prepend"
 
 KEY_TABLES = "tables_to_encrypt"
+# instead of the list of columns to anonymize a table can be configured as {"columns": [...], "drop": [...]}
+# or {"columns": [...], "keep": [...]}, the projection is applied in the same pass as the anonymization
+KEY_TABLE_COLUMNS = "columns"
+KEY_TABLE_DROP = "drop"
+KEY_TABLE_KEEP = "keep"
+
+# number of worker processes used to anonymize slices of a sliced table, 0 means one per CPU
+KEY_MAX_WORKERS = "max_workers"
+DEFAULT_MAX_WORKERS = 1
+
+# single uncompressed files larger than chunk_size_mb are split into byte ranges at record boundaries, which are
+# anonymized in parallel and written as slices of a sliced output table or concatenated into a single file
+KEY_CHUNK_SIZE_MB = "chunk_size_mb"
+DEFAULT_CHUNK_SIZE_MB = 0
+KEY_CHUNK_OUTPUT = "chunk_output"
+CHUNK_OUTPUT_SINGLE = "single"
+CHUNK_OUTPUT_SLICED = "sliced"
+CHUNK_OUTPUT_MODES = [CHUNK_OUTPUT_SINGLE, CHUNK_OUTPUT_SLICED]
+# buffer size used when concatenating anonymized chunks
+CONCATENATE_BUFFER_SIZE = 16 * 1024 * 1024
+# single file tables are written as sliced tables with a new slice started after N rows or N MB of uncompressed data
+KEY_OUTPUT_SLICE_ROWS = "output_slice_rows"
+KEY_OUTPUT_SLICE_MB = "output_slice_mb"
+
+# number of tables processed at the same time, 0 means one per CPU. The files of the tables are then anonymized
+# in one pool of max(table_workers, max_workers) worker processes shared by all tables
+KEY_TABLE_WORKERS = "table_workers"
+DEFAULT_TABLE_WORKERS = 1
+
+# write slices of sliced tables gzip compressed, with the given gzip compression level (1-9)
+KEY_COMPRESS_OUTPUT = "compress_output"
+KEY_COMPRESSION_LEVEL = "compression_level"
+
+# how tables and files that need no anonymization are moved to the output: link, move or copy
+KEY_PASSTHROUGH_MODE = "passthrough_mode"
+DEFAULT_PASSTHROUGH_MODE = "copy"
+
+# engine anonymizing the csv files: csv (python csv module), arrow (pyarrow record batches, optional dependency),
+# bytes (values split and hashed as bytes) or pipelined (bytes engine with reads and writes in separate threads)
+KEY_ENGINE = "engine"
+DEFAULT_ENGINE = "csv"
+# block and buffer sizes and the bounded queue length of the pipelined engine
+KEY_READ_BUFFER_MB = "read_buffer_mb"
+KEY_WRITE_BUFFER_MB = "write_buffer_mb"
+KEY_PIPELINE_QUEUE_SIZE = "pipeline_queue_size"
+
+# memory budget in MB of the cache of already anonymized values, 0 disables the cache
+KEY_CACHE_SIZE_MB = "cache_size_mb"
+DEFAULT_CACHE_SIZE_MB = 0
+
+# skip slices of sliced tables that did not change since the previous run, their fingerprints (size and checksum,
+# or size and mtime) are kept in the state file
+KEY_INCREMENTAL_SLICES = "incremental_slices"
+KEY_INCREMENTAL_FINGERPRINT = "incremental_fingerprint"
+DEFAULT_INCREMENTAL_FINGERPRINT = "checksum"
+STATE_KEY_SLICES = "slices"
+
+# SQLite pseudonym store carried between runs as a file of this name in in/files and out/files, its size limit
+# in entries and an optional output table with the pseudonyms of the current settings for audit joins
+KEY_PSEUDONYM_STORE = "pseudonym_store"
+KEY_PSEUDONYM_STORE_MAX_ENTRIES = "pseudonym_store_max_entries"
+KEY_PSEUDONYM_STORE_EXPORT = "pseudonym_store_export"
+
+# paths relative to the data folder of the JSON performance report and of the folder for cProfile dumps
+KEY_PERFORMANCE_REPORT = "performance_report"
+KEY_PROFILE_DIR = "profile_dir"
+
+# number of rows sampled from each table by the profile sync action and by auto_tune
+KEY_PROFILE_SAMPLE_ROWS = "profile_sample_rows"
+# profile the tables before the run and apply the recommended settings which are not set in the config
+KEY_AUTO_TUNE = "auto_tune"
+
+STAGE_ANONYMIZE_TABLE = "anonymize_table"
+STAGE_DECOMPRESS = "decompress"
+STAGE_ANONYMIZE_COLUMNS = "anonymize_columns"
+STAGE_PASSTHROUGH = "passthrough"
+STAGE_MOVE_FILES = "move_files"
+
+# number of anonymized rows buffered before they are written to the output file
+WRITE_BATCH_SIZE = 10000
 
 REQUIRED_PARAMETERS = [KEY_ENCRYPT_METHOD]
 REQUIRED_IMAGE_PARS = []
@@ -43,8 +141,33 @@ class Component(ComponentBase):
 
     def __init__(self) -> None:
         super().__init__()
+        self._input_tables_index: Optional[Dict[str, TableDefinition]] = None
+        self.performance_report = PerformanceReport()
+        self.slice_state: Optional[SliceState] = None
+        # pool of worker processes shared by all tables when tables are processed in parallel
+        self.file_executor: Optional[Executor] = None
+        self.pseudonym_store: Optional["PseudonymStore"] = None
+        self.pseudonym_stats: List[CacheStats] = []
+        from passthrough import Passthrough, PassthroughException
+
+        passthrough_mode = self.configuration.parameters.get(KEY_PASSTHROUGH_MODE, DEFAULT_PASSTHROUGH_MODE)
+        try:
+            self.passthrough = Passthrough(passthrough_mode)
+        except PassthroughException as passthrough_exc:
+            raise UserException(passthrough_exc) from passthrough_exc
+
+    @property
+    def configuration(self) -> Configuration:
+        """
+        The configuration is read only once, so that the settings applied by auto_tune hold for the whole run.
+        """
+        if self.__dict__.get("_configuration") is None:
+            self._configuration = super().configuration
+        return self._configuration
 
     def run(self) -> None:
+        from scheduling import TableTask, get_path_size
+
         self.validate_configuration_parameters(REQUIRED_PARAMETERS)
         self.validate_image_parameters(REQUIRED_IMAGE_PARS)
         params = self.configuration.parameters
@@ -58,22 +181,134 @@ class Component(ComponentBase):
         self.check_for_files()
         # Move files from data/in/files to data/out/files
         self.move_files()
+        self.open_pseudonym_store()
+        if params.get(KEY_AUTO_TUNE):
+            self.apply_recommended_settings(self.profile_tables()["recommended_settings"])
+
+        pattern_matcher = PatternMatcher(tables_to_anonymize.keys())
+        state = {}
+        if params.get(KEY_INCREMENTAL_SLICES):
+            state = self.get_state_file()
+            self.slice_state = self.get_slice_state(state)
 
-        for table in self.get_input_tables_definitions():
-            anonymize = [pattern for pattern in tables_to_anonymize.keys() if fnmatch.fnmatch(table.name, pattern)]
+        table_tasks = []
+        for table in self.get_input_tables_index().values():
+            anonymize = pattern_matcher.match(table.name)
 
             if len(anonymize) > 1:
                 raise UserException(f"Multiple patterns found for table {table.name} in the configuration")
             elif anonymize:
-                columns_to_anonymize = tables_to_anonymize.get(anonymize[0])
-                self.anonymize_table(table.name, columns_to_anonymize, salt, salt_location)
+                columns_to_anonymize, projection = self.parse_table_rule(tables_to_anonymize.get(anonymize[0]))
+                action = partial(self.anonymize_table, table.name, columns_to_anonymize, salt, salt_location,
+                                 projection)
             else:
-                logging.info(f"Table '{table.name}' not specified in configuration, moving to output non-anonymized")
-                out_table = self.create_out_table_definition(table.name)
-                self.move_table_to_out(table, out_table)
+                action = partial(self.pass_table_through, table)
+            table_tasks.append(TableTask(table.name, get_path_size(table.full_path), action))
+
+        self.run_table_tasks(table_tasks)
+        self.close_pseudonym_store()
+
+        if self.slice_state:
+            self.write_state_file({**state, STATE_KEY_SLICES: self.slice_state.to_dict()})
+
+        self.passthrough.log_summary()
+        self.performance_report.log_summary()
+        if params.get(KEY_PERFORMANCE_REPORT):
+            self.performance_report.write(pt.join(self.data_folder_path, params.get(KEY_PERFORMANCE_REPORT)))
+
+    @sync_action("profile")
+    def profile(self) -> Dict[str, Any]:
+        """
+        Samples the tables to anonymize and returns their size estimates, the distinct value ratios of the columns,
+        the hash throughput of the configured method and the recommended settings.
+        """
+        self.validate_configuration_parameters(REQUIRED_PARAMETERS)
+        return self.profile_tables()
+
+    def profile_tables(self) -> Dict[str, Any]:
+        from profiling import sample_table, measure_hash_throughput, estimate_seconds, recommend_settings, \
+            DEFAULT_SAMPLE_ROWS
+
+        params = self.configuration.parameters
+        sample_rows = params.get(KEY_PROFILE_SAMPLE_ROWS, DEFAULT_SAMPLE_ROWS)
+        if not isinstance(sample_rows, int) or isinstance(sample_rows, bool) or sample_rows < 1:
+            raise UserException(f"The {KEY_PROFILE_SAMPLE_ROWS} config parameter must be a positive integer, "
+                                f"not {sample_rows}")
+        tables_to_anonymize = params.get(KEY_TABLES) or {}
+        pattern_matcher = PatternMatcher(tables_to_anonymize.keys())
+
+        profiles = []
+        for table in self.get_input_tables_index().values():
+            patterns = pattern_matcher.match(table.name)
+            if len(patterns) != 1:
+                continue
+            if self.is_zipped_sliced_table(table) and not self.has_only_gzip_slices(table):
+                logging.warning(f"Table '{table.name}' is an archive of slices, it is not profiled")
+                continue
+            columns, _ = self.parse_table_rule(tables_to_anonymize.get(patterns[0]))
+            table_columns = self.get_table_columns(table)
+            columns = self.validate_columns_to_anonymize(columns, table_columns, table.name)
+            if self.is_sliced_table(table):
+                file_paths = [pt.join(table.full_path, f) for f in sorted(self.get_sliced_files(table))]
+            else:
+                file_paths = [table.full_path]
+            profiles.append(sample_table(table.name, file_paths, table_columns, columns, table.delimiter,
+                                         table.enclosure, self.table_has_headers(table), sample_rows))
+
+        salt_location = params.get(KEY_SALT_LOCATION, DEFAULT_SALT_LOCATION)
+        if salt_location not in SALT_LOCATIONS:
+            salt_location = DEFAULT_SALT_LOCATION
+        encode = self._get_method_anonymizer().get_salted_encoder(params.get(KEY_SALT, ""), salt_location)
+        hash_throughput = measure_hash_throughput(encode, [value for profile in profiles for value in profile.values])
+        recommended = recommend_settings(profiles, hash_throughput, os.cpu_count() or 1, ENTRY_OVERHEAD)
+        return {"method": params.get(KEY_ENCRYPT_METHOD),
+                "tables": [profile.to_dict() for profile in profiles],
+                "hash_throughput": hash_throughput,
+                "estimated_seconds": sum(estimate_seconds(profile, hash_throughput["values_per_second"])
+                                         for profile in profiles),
+                "recommended_settings": recommended}
+
+    def apply_recommended_settings(self, recommended: Dict[str, Any]) -> None:
+        """
+        Sets the recommended config parameters, the parameters set in the config are kept.
+        """
+        params = self.configuration.parameters
+        applied = {key: value for key, value in recommended.items() if key not in params}
+        params.update(applied)
+        kept = sorted(set(recommended) - set(applied))
+        logging.info(f"Auto-tune applied settings {applied}" + (f", configured {kept} kept" if kept else ""))
+
+    def run_table_tasks(self, table_tasks: List["TableTask"]) -> None:
+        from scheduling import TableScheduler
+
+        table_workers = self.get_worker_count(KEY_TABLE_WORKERS, DEFAULT_TABLE_WORKERS)
+        if table_workers <= 1 or len(table_tasks) <= 1:
+            TableScheduler().run(table_tasks)
+            return
+
+        with self.create_process_pool(max(table_workers, self.get_max_workers())) as file_executor:
+            # the worker processes are forked now, before the table threads are started
+            file_executor.submit(int).result()
+            self.file_executor = file_executor
+            try:
+                TableScheduler(table_workers).run(table_tasks)
+            finally:
+                self.file_executor = None
+
+    def pass_table_through(self, table: TableDefinition) -> None:
+        logging.info(f"Table '{table.name}' not specified in configuration, moving to output non-anonymized")
+        out_table = self.create_out_table_definition(table.name)
+        self.move_table_to_out(table, out_table)
 
     def anonymize_table(self, table_name: str, columns_to_anonymize: List, salt: str = "",
-                        salt_location: str = ""):
+                        salt_location: str = "", projection: Optional[Dict[str, List[str]]] = None):
+        with self.performance_report.stage(table_name, STAGE_ANONYMIZE_TABLE) as table_metrics:
+            self._anonymize_input_table(table_name, columns_to_anonymize, salt, salt_location, projection)
+        self.performance_report.add_counters(table_metrics, STAGE_ANONYMIZE_COLUMNS)
+        logging.info(f"Table '{table_name}' anonymized: {table_metrics}")
+
+    def _anonymize_input_table(self, table_name: str, columns_to_anonymize: List, salt: str,
+                               salt_location: str, projection: Optional[Dict[str, List[str]]] = None) -> None:
         self.validate_column_params(columns_to_anonymize)
         in_table = self.get_input_table(table_name)
 
@@ -85,20 +320,26 @@ class Component(ComponentBase):
         write_columns_to_manifest = self.check_for_columns_in_manifest(in_table_manifest)
         table_has_headers = self.table_has_headers(in_table)
 
-        if self.is_zipped_sliced_table(in_table):
+        if self.is_zipped_sliced_table(in_table) and not self.has_only_gzip_slices(in_table):
+            # gzip slices are streamed directly, other archives are extracted to a temporary folder first
             temp_file = self._unzip_sliced_table(in_table)
             in_table.full_path = temp_file
-            self._anonymize_sliced_table(in_table,
-                                         columns_to_anonymize,
-                                         salt,
-                                         salt_location,
-                                         table_has_headers)
+            try:
+                self._anonymize_sliced_table(in_table,
+                                             columns_to_anonymize,
+                                             salt,
+                                             salt_location,
+                                             table_has_headers,
+                                             projection)
+            finally:
+                shutil.rmtree(pt.dirname(temp_file), ignore_errors=True)
         elif self.is_sliced_table(in_table):
             self._anonymize_sliced_table(in_table,
                                          columns_to_anonymize,
                                          salt,
                                          salt_location,
-                                         table_has_headers)
+                                         table_has_headers,
+                                         projection)
         else:
             self._anonymize_table(in_table,
                                   in_table.name,
@@ -106,7 +347,8 @@ class Component(ComponentBase):
                                   salt,
                                   salt_location,
                                   write_columns_to_manifest=write_columns_to_manifest,
-                                  table_has_headers=table_has_headers)
+                                  table_has_headers=table_has_headers,
+                                  projection=projection)
 
     def get_table_columns(self, table: TableDefinition) -> List[str]:
         table_columns = table.column_names
@@ -142,6 +384,9 @@ class Component(ComponentBase):
                     return True
         return False
 
+    def has_only_gzip_slices(self, table: TableDefinition) -> bool:
+        return all(is_gzip_file(sliced_file) for sliced_file in self.get_sliced_files(table))
+
     @staticmethod
     def get_table_manifest(table: TableDefinition) -> Optional[Dict[str, Any]]:
         manifest_path = "".join([table.full_path, ".manifest"])
@@ -156,12 +401,59 @@ class Component(ComponentBase):
             raise UserException(f"The tables_to_encrypt config parameter must be key value pairs where the values"
                                 f" are lists of columns not {type(columns)}")
 
+    @staticmethod
+    def parse_table_rule(table_rule: Any) -> Tuple[List[str], Dict[str, List[str]]]:
+        """
+        Returns the columns to anonymize and the projection of a tables_to_encrypt value. The value is either
+        the list of columns to anonymize, or an object with the columns and a list of columns to drop or to keep.
+        The projection is {"drop": [...]} or {"keep": [...]}, empty when all columns are written.
+        """
+        if not isinstance(table_rule, dict):
+            Component.validate_column_params(table_rule)
+            return table_rule, {}
+        unknown_keys = sorted(set(table_rule) - {KEY_TABLE_COLUMNS, KEY_TABLE_DROP, KEY_TABLE_KEEP})
+        if unknown_keys:
+            raise UserException(f"Unknown keys {unknown_keys} in the tables_to_encrypt config parameter, "
+                                f"the supported keys are {[KEY_TABLE_COLUMNS, KEY_TABLE_DROP, KEY_TABLE_KEEP]}")
+        if KEY_TABLE_DROP in table_rule and KEY_TABLE_KEEP in table_rule:
+            raise UserException(f"Only one of {KEY_TABLE_DROP} and {KEY_TABLE_KEEP} can be set for a table "
+                                f"in the tables_to_encrypt config parameter")
+        columns = table_rule.get(KEY_TABLE_COLUMNS, [])
+        Component.validate_column_params(columns)
+        projection = {key: table_rule[key] for key in [KEY_TABLE_DROP, KEY_TABLE_KEEP] if key in table_rule}
+        for projected_columns in projection.values():
+            Component.validate_column_params(projected_columns)
+        return columns, projection
+
+    @staticmethod
+    def get_output_columns(projection: Optional[Dict[str, List[str]]], table_columns: List[str],
+                           in_table_name: str) -> Optional[List[str]]:
+        """
+        Returns the columns written to the output in the table order, None when all columns are written.
+        """
+        if not projection:
+            return None
+        key, projected_columns = next(iter(projection.items()))
+        for column in projected_columns:
+            if column not in table_columns:
+                logging.warning(f"Column : '{column}' to {key} is not in the table {in_table_name}. "
+                                f"Make sure all columns to {key} are within the list : {table_columns}")
+        if key == KEY_TABLE_DROP:
+            output_columns = [column for column in table_columns if column not in projected_columns]
+        else:
+            output_columns = [column for column in table_columns if column in projected_columns]
+        if not output_columns:
+            raise UserException(f"No column of the table {in_table_name} would be written to the output, "
+                                f"check the {key} columns in the tables_to_encrypt config parameter")
+        return output_columns if output_columns != table_columns else None
+
     def _anonymize_sliced_table(self,
                                 in_table: TableDefinition,
                                 columns_to_anonymize: List[str],
                                 salt: str,
                                 salt_location: str,
-                                table_has_headers: bool) -> None:
+                                table_has_headers: bool,
+                                projection: Optional[Dict[str, List[str]]] = None) -> None:
 
         out_table = self.create_out_table_definition_from_in_table(in_table,
                                                                    schema=in_table.schema)
@@ -169,25 +461,281 @@ class Component(ComponentBase):
         if not pt.exists(out_table.full_path):
             makedirs(out_table.full_path)
 
-        sliced_files = self.get_sliced_files(in_table)
-        for table_file in sliced_files:
-            in_table_path = pt.join(in_table.full_path, table_file)
-            out_table_path = pt.join(out_table.full_path, table_file)
-            self._anonymize_table(in_table,
-                                  table_file,
-                                  columns_to_anonymize,
-                                  salt,
-                                  salt_location,
-                                  write_manifest=False,
-                                  in_table_path=in_table_path,
-                                  out_table_path=out_table_path,
-                                  table_has_headers=table_has_headers)
+        in_table_columns = self.get_table_columns(in_table)
+        columns_to_anonymize = self.validate_columns_to_anonymize(columns_to_anonymize, in_table_columns,
+                                                                  in_table.name)
+        output_columns = self.get_output_columns(projection, in_table_columns, in_table.name)
+        if output_columns is not None:
+            # dropped columns are not anonymized
+            columns_to_anonymize = [column for column in columns_to_anonymize if column in output_columns]
+        anonymizer = self.get_anonymizer()
+        compress_output, compression_level = self.get_output_compression()
+        engine = self.get_engine()
 
-        self.update_schema(out_table, columns_to_anonymize)
+        slice_jobs = {}
+        for table_file in self.get_sliced_files(in_table):
+            in_table_path = pt.join(in_table.full_path, table_file)
+            out_table_path = pt.join(out_table.full_path, self.get_out_slice_name(table_file, compress_output))
+            slice_jobs[table_file] = dict(table_path=in_table_path,
+                                          out_table_path=out_table_path,
+                                          table_columns=in_table_columns,
+                                          salt=salt,
+                                          salt_location=salt_location,
+                                          columns_to_anonymize=columns_to_anonymize,
+                                          anonymizer=anonymizer,
+                                          delimiter=in_table.delimiter,
+                                          enclosure=in_table.enclosure,
+                                          table_has_headers=table_has_headers,
+                                          write_columns_to_manifest=True,
+                                          compression_level=compression_level,
+                                          engine=engine,
+                                          pipeline=self.get_pipeline_settings(),
+                                          output_columns=output_columns)
+
+        if self.slice_state:
+            slice_jobs = self.skip_unchanged_slices(in_table, slice_jobs, columns_to_anonymize, salt, salt_location,
+                                                    compress_output, compression_level, output_columns)
+
+        self._anonymize_slices(in_table.name, slice_jobs, anonymizer)
+        self.log_cache_stats(in_table.name, anonymizer)
+
+        self.update_schema(out_table, columns_to_anonymize, output_columns)
 
         self.write_manifest(out_table)
 
-    def update_schema(self, out_table: TableDefinition, columns_to_anonymize: List[str]) -> None:
+    def skip_unchanged_slices(self, in_table: TableDefinition, slice_jobs: Dict[str, Dict[str, Any]],
+                              columns_to_anonymize: List[str], salt: str, salt_location: str, compress_output: bool,
+                              compression_level: int,
+                              output_columns: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns only the jobs of slices that are new or changed since the previous run. Any change of the settings
+        affecting the output invalidates the fingerprints of all slices of the table. Slices are only skipped when
+        the table is loaded incrementally with a primary key, a full load would remove the skipped slices from
+        Storage and an incremental load without a primary key would duplicate the rows of the changed slices.
+        The fingerprints are recorded in any case.
+        """
+        config = config_fingerprint(method=self.configuration.parameters.get(KEY_ENCRYPT_METHOD),
+                                    salt=salt,
+                                    salt_location=salt_location,
+                                    digest_size=self.configuration.parameters.get(KEY_DIGEST_SIZE),
+                                    columns=columns_to_anonymize,
+                                    delimiter=in_table.delimiter,
+                                    compress_output=compress_output,
+                                    compression_level=compression_level,
+                                    # only set with a projection, so that the existing fingerprints stay valid
+                                    **({"output_columns": output_columns} if output_columns is not None else {}))
+        slice_paths = {slice_name: job_kwargs["table_path"] for slice_name, job_kwargs in slice_jobs.items()}
+        removed_slices = self.slice_state.get_removed_slices(in_table.name, config, slice_paths)
+        changed_slices = self.slice_state.get_changed_slices(in_table.name, config, slice_paths)
+        if not in_table.incremental or not in_table.primary_key:
+            logging.info(f"Table '{in_table.name}' is not loaded incrementally with a primary key, "
+                         f"all {len(slice_jobs)} slices are processed")
+            return slice_jobs
+        if removed_slices:
+            logging.warning(f"Table '{in_table.name}': slices {removed_slices} were removed since the previous run, "
+                            f"all slices are processed, the rows of the removed slices are not deleted from Storage "
+                            f"by the incremental load")
+            return slice_jobs
+        logging.info(f"Table '{in_table.name}': {len(changed_slices)} of {len(slice_jobs)} slices are new or changed, "
+                     f"unchanged slices are skipped")
+        return {slice_name: slice_jobs[slice_name] for slice_name in changed_slices}
+
+    def get_slice_state(self, state: Dict[str, Any]) -> SliceState:
+        fingerprint_mode = self.configuration.parameters.get(KEY_INCREMENTAL_FINGERPRINT,
+                                                             DEFAULT_INCREMENTAL_FINGERPRINT)
+        try:
+            return SliceState(state.get(STATE_KEY_SLICES, {}), fingerprint_mode)
+        except IncrementalStateException as state_exc:
+            raise UserException(state_exc) from state_exc
+
+    def _anonymize_slices(self, table_name: str, slice_jobs: Dict[str, Dict[str, Any]],
+                          anonymizer: Anonymizer) -> None:
+        """
+        Runs anonymize_columns for every slice of a table, in a pool of worker processes if max_workers allows it.
+        Each slice is written to its own output file, so the output does not depend on the order of completion.
+        Args:
+            table_name: Name of the sliced table, used in error messages.
+            slice_jobs: Keyword arguments of anonymize_columns keyed by the slice file name.
+            anonymizer: Anonymizer of the table, cache statistics of the workers are merged into it.
+
+        Raises:
+            UserException: when the anonymization of any slice fails, remaining slices are cancelled.
+        """
+        if self.file_executor:
+            self._run_file_jobs(self.file_executor, table_name, slice_jobs, anonymizer)
+            return
+
+        max_workers = min(self.get_max_workers(), len(slice_jobs))
+
+        if max_workers <= 1:
+            for slice_name, job_kwargs in slice_jobs.items():
+                try:
+                    metrics, _ = self._anonymize_file(job_kwargs, self.get_profile_path(table_name, slice_name))
+                except Exception as exc:
+                    raise UserException(f"Failed to anonymize slice '{slice_name}' of table '{table_name}': {exc}"
+                                        ) from exc
+                self.add_file_metrics(metrics, table_name, slice_name)
+            return
+
+        logging.info(f"Anonymizing {len(slice_jobs)} slices of table '{table_name}' using {max_workers} workers")
+        with self.create_process_pool(max_workers) as executor:
+            self._run_file_jobs(executor, table_name, slice_jobs, anonymizer)
+
+    @staticmethod
+    def create_process_pool(max_workers: int) -> Executor:
+        # multiprocessing takes a large part of the startup time, it is imported only when worker processes are used
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor(max_workers=max_workers)
+
+    def _run_file_jobs(self, executor: Executor, table_name: str, file_jobs: Dict[str, Dict[str, Any]],
+                       anonymizer: Anonymizer) -> None:
+        """
+        Submits the files to the worker processes and collects their metrics and cache statistics.
+        The executor may be shared with other tables, so only the futures of this table are cancelled on failure.
+        """
+        futures = {executor.submit(self._anonymize_file, job_kwargs,
+                                   self.get_profile_path(table_name, file_name)): file_name
+                   for file_name, job_kwargs in file_jobs.items()}
+        for future in as_completed(futures):
+            file_name = futures[future]
+            try:
+                metrics, cache_stats = future.result()
+            except Exception as exc:
+                for pending_future in futures:
+                    pending_future.cancel()
+                raise UserException(f"Failed to anonymize slice '{file_name}' of table '{table_name}': {exc}"
+                                    ) from exc
+            self.add_file_metrics(metrics, table_name, file_name)
+            if cache_stats:
+                anonymizer.stats.merge(cache_stats)
+
+    @staticmethod
+    def _anonymize_file(job_kwargs: Dict[str, Any],
+                        profile_path: Optional[str] = None) -> Tuple[StageMetrics, Optional[CacheStats]]:
+        """
+        Runs and measures anonymize_columns of one file, optionally under cProfile. It is also the entry point
+        of the worker processes, so it returns the cache statistics collected by the worker's copy of the anonymizer.
+        """
+        from engines import PipelineStats, ENGINE_PIPELINED
+        from scheduling import get_path_size
+
+        metrics = StageMetrics(stage=STAGE_ANONYMIZE_COLUMNS)
+        pipeline_stats = PipelineStats() if job_kwargs.get("engine") == ENGINE_PIPELINED else None
+        with measure(metrics):
+            metrics.rows = profile_call(profile_path, Component.anonymize_columns, pipeline_stats=pipeline_stats,
+                                        **job_kwargs)
+        if pipeline_stats:
+            metrics.queue_wait = pipeline_stats.to_dict()
+        metrics.cells = metrics.rows * len(job_kwargs["columns_to_anonymize"])
+        byte_range = job_kwargs.get("byte_range")
+        metrics.bytes_in = byte_range[1] - byte_range[0] if byte_range else pt.getsize(job_kwargs["table_path"])
+        metrics.bytes_out = get_path_size(job_kwargs["out_table_path"])
+
+        anonymizer = job_kwargs["anonymizer"]
+        if isinstance(anonymizer, CachedAnonymizer):
+            return metrics, anonymizer.stats
+        return metrics, None
+
+    def add_file_metrics(self, metrics: StageMetrics, table_name: str, file_name: str) -> None:
+        metrics.table = table_name
+        metrics.file = file_name
+        self.performance_report.add(metrics)
+        if metrics.queue_wait:
+            from engines import PipelineStats
+            logging.info(f"Pipeline of '{file_name}' of table '{table_name}': {PipelineStats(**metrics.queue_wait)}")
+
+    def get_profile_path(self, table_name: str, file_name: str) -> Optional[str]:
+        profile_dir = self.configuration.parameters.get(KEY_PROFILE_DIR)
+        if not profile_dir:
+            return None
+        return pt.join(self.data_folder_path, profile_dir, f"{table_name}.{file_name}.prof")
+
+    def log_cache_stats(self, table_name: str, anonymizer: Anonymizer) -> None:
+        from anonymization import StoredAnonymizer
+
+        if isinstance(anonymizer, StoredAnonymizer):
+            stats = anonymizer.reset_stats()
+            self.pseudonym_stats.append(stats)
+            logging.info(f"Pseudonym store of table '{table_name}': {stats.hits} pseudonyms reused, "
+                         f"{stats.misses} new, reuse ratio {stats.hit_ratio:.1%}")
+        elif isinstance(anonymizer, CachedAnonymizer):
+            logging.info(f"Anonymization cache of table '{table_name}': {anonymizer.reset_stats()}")
+
+    @staticmethod
+    def get_out_slice_name(slice_name: str, compress_output: bool) -> str:
+        """
+        Gzipped input slices are written uncompressed unless compress_output is set, then every slice is gzipped.
+        """
+        if is_gzip_file(slice_name):
+            slice_name = slice_name[:-len(GZIP_EXTENSION)]
+        if compress_output:
+            slice_name = "".join([slice_name, GZIP_EXTENSION])
+        return slice_name
+
+    def get_output_compression(self) -> Tuple[bool, int]:
+        params = self.configuration.parameters
+        compress_output = bool(params.get(KEY_COMPRESS_OUTPUT, False))
+        compression_level = params.get(KEY_COMPRESSION_LEVEL, DEFAULT_COMPRESSION_LEVEL)
+        if not isinstance(compression_level, int) or isinstance(compression_level, bool) \
+                or not 1 <= compression_level <= 9:
+            raise UserException(f"The {KEY_COMPRESSION_LEVEL} config parameter must be an integer from 1 to 9, "
+                                f"not {compression_level}")
+        return compress_output, compression_level
+
+    def get_engine(self) -> str:
+        from engines import import_pyarrow, ArrowEngineException, ENGINES, ENGINE_ARROW
+
+        engine = self.configuration.parameters.get(KEY_ENGINE, DEFAULT_ENGINE)
+        if engine not in ENGINES:
+            raise UserException(f"{engine} engine is not supported, use one of {ENGINES}")
+        if engine == ENGINE_ARROW:
+            try:
+                import_pyarrow()
+            except ArrowEngineException as arrow_exc:
+                raise UserException(arrow_exc) from arrow_exc
+        return engine
+
+    def get_pipeline_settings(self) -> Optional["PipelineSettings"]:
+        """
+        Returns the settings of the pipelined engine, None for the other engines.
+        """
+        from engines import PipelineSettings, ENGINE_PIPELINED, DEFAULT_QUEUE_SIZE, DEFAULT_READ_BUFFER_SIZE, \
+            DEFAULT_WRITE_BUFFER_SIZE
+
+        if self.get_engine() != ENGINE_PIPELINED:
+            return None
+        params = self.configuration.parameters
+        buffer_sizes = []
+        for key, default in [(KEY_READ_BUFFER_MB, DEFAULT_READ_BUFFER_SIZE),
+                             (KEY_WRITE_BUFFER_MB, DEFAULT_WRITE_BUFFER_SIZE)]:
+            buffer_mb = params.get(key, default / 1024 / 1024)
+            if not isinstance(buffer_mb, (int, float)) or isinstance(buffer_mb, bool) or buffer_mb <= 0:
+                raise UserException(f"The {key} config parameter must be a positive number, not {buffer_mb}")
+            buffer_sizes.append(max(int(buffer_mb * 1024 * 1024), 1))
+        queue_size = params.get(KEY_PIPELINE_QUEUE_SIZE, DEFAULT_QUEUE_SIZE)
+        if not isinstance(queue_size, int) or isinstance(queue_size, bool) or queue_size < 1:
+            raise UserException(f"The {KEY_PIPELINE_QUEUE_SIZE} config parameter must be a positive integer, "
+                                f"not {queue_size}")
+        return PipelineSettings(*buffer_sizes, queue_size)
+
+    def get_max_workers(self) -> int:
+        return self.get_worker_count(KEY_MAX_WORKERS, DEFAULT_MAX_WORKERS)
+
+    def get_worker_count(self, key: str, default: int) -> int:
+        workers = self.configuration.parameters.get(key, default)
+        if not isinstance(workers, int) or isinstance(workers, bool) or workers < 0:
+            raise UserException(f"The {key} config parameter must be a non-negative integer, not {workers}")
+        if workers == 0:
+            workers = os.cpu_count() or 1
+        return workers
+
+    def update_schema(self, out_table: TableDefinition, columns_to_anonymize: List[str],
+                      output_columns: Optional[List[str]] = None) -> None:
+        """
+        Anonymized columns become strings, the columns which are not in output_columns are removed.
+        """
+        if output_columns is not None:
+            out_table.delete_columns([column for column in out_table.column_names if column not in output_columns])
         for column in columns_to_anonymize:
             if column in out_table.schema:
                 old_datatype = out_table.schema.get(column).data_types.get("base")
@@ -206,21 +754,28 @@ class Component(ComponentBase):
                          out_table_path: str = "",
                          write_columns_to_manifest: bool = True,
                          write_manifest: bool = True,
-                         table_has_headers: bool = True) -> None:
+                         table_has_headers: bool = True,
+                         projection: Optional[Dict[str, List[str]]] = None) -> None:
 
         if in_table.column_names:
             in_table_columns = in_table.column_names
         else:
             in_table_columns = self.get_table_columns(in_table)
 
-        out_table = self.create_out_table_definition(file_name, schema=in_table.schema or in_table_columns)
+        if not in_table_path:
+            in_table_path = in_table.full_path
+
+        byte_ranges = self.get_byte_ranges(in_table_path, in_table.enclosure)
+        output_slicing = self.get_output_slicing()
+        sliced_output = bool(output_slicing) or (len(byte_ranges) > 1 and
+                                                 self.get_chunk_output() == CHUNK_OUTPUT_SLICED)
+
+        out_table = self.create_out_table_definition(file_name, is_sliced=sliced_output,
+                                                     schema=in_table.schema or in_table_columns)
 
         if in_table.destination:
             out_table.destination = in_table.destination
 
-        if not in_table_path:
-            in_table_path = in_table.full_path
-
         if not out_table_path:
             out_table_path = out_table.full_path
 
@@ -230,16 +785,131 @@ class Component(ComponentBase):
         anonymizer = self.get_anonymizer()
 
         columns_to_anonymize = self.validate_columns_to_anonymize(columns_to_anonymize, in_table_columns, file_name)
+        output_columns = self.get_output_columns(projection, in_table_columns, file_name)
+        if output_columns is not None:
+            columns_to_anonymize = [column for column in columns_to_anonymize if column in output_columns]
+
+        job_kwargs = dict(table_path=in_table_path,
+                          out_table_path=out_table_path,
+                          table_columns=in_table_columns,
+                          salt=salt,
+                          salt_location=salt_location,
+                          columns_to_anonymize=columns_to_anonymize,
+                          anonymizer=anonymizer,
+                          delimiter=in_table.delimiter,
+                          enclosure=in_table.enclosure,
+                          table_has_headers=table_has_headers,
+                          write_columns_to_manifest=write_columns_to_manifest or bool(output_slicing),
+                          engine=self.get_engine(),
+                          pipeline=self.get_pipeline_settings(),
+                          output_columns=output_columns)
+        if output_slicing:
+            job_kwargs.update(output_slicing=output_slicing, compression_level=self.get_output_compression()[1])
+        if len(byte_ranges) > 1:
+            self._anonymize_chunks(in_table.name, job_kwargs, byte_ranges, anonymizer, sliced_output)
+        elif self.file_executor:
+            future = self.file_executor.submit(self._anonymize_file, job_kwargs,
+                                               self.get_profile_path(in_table.name, file_name))
+            metrics, cache_stats = future.result()
+            if cache_stats:
+                anonymizer.stats.merge(cache_stats)
+            self.add_file_metrics(metrics, in_table.name, file_name)
+        else:
+            metrics, _ = self._anonymize_file(job_kwargs, self.get_profile_path(in_table.name, file_name))
+            self.add_file_metrics(metrics, in_table.name, file_name)
+        self.log_cache_stats(file_name, anonymizer)
 
-        self.anonymize_columns(in_table_path, out_table_path, in_table_columns, salt, salt_location,
-                               columns_to_anonymize, anonymizer, in_table.delimiter, table_has_headers,
-                               write_columns_to_manifest)
-
-        self.update_schema(out_table, columns_to_anonymize)
+        self.update_schema(out_table, columns_to_anonymize, output_columns)
 
         if write_manifest:
             self.write_manifest(out_table)
 
+    def _anonymize_chunks(self, table_name: str, job_kwargs: Dict[str, Any], byte_ranges: List[Tuple[int, int]],
+                          anonymizer: Anonymizer, sliced_output: bool) -> None:
+        """
+        Anonymizes byte ranges of a single file in parallel like the slices of a sliced table. The header can only
+        be in the first range. The anonymized ranges either are the slices of the output table, or they are written
+        to a temporary folder and concatenated in order, which gives the same file as the sequential processing.
+        With output slicing every range is written as its own numbered slices, prefixed by the number of the range.
+        """
+        compress_output, compression_level = self.get_output_compression()
+        out_table_path = job_kwargs["out_table_path"]
+        chunk_dir = out_table_path if sliced_output else tempfile.mkdtemp()
+        makedirs(chunk_dir, exist_ok=True)
+
+        header_in_manifest = sliced_output or job_kwargs["write_columns_to_manifest"]
+        chunk_jobs = {}
+        for index, byte_range in enumerate(byte_ranges):
+            chunk_name = f"part_{index:05d}.csv"
+            chunk_path = pt.join(chunk_dir, chunk_name)
+            chunk_kwargs = {}
+            if job_kwargs.get("output_slicing"):
+                chunk_path = chunk_dir
+                chunk_kwargs["output_slicing"] = job_kwargs["output_slicing"].with_prefix(f"part_{index:05d}_")
+            elif sliced_output:
+                chunk_name = self.get_out_slice_name(chunk_name, compress_output)
+                chunk_path = pt.join(chunk_dir, chunk_name)
+            chunk_jobs[chunk_name] = dict(job_kwargs,
+                                          **chunk_kwargs,
+                                          out_table_path=chunk_path,
+                                          byte_range=byte_range,
+                                          table_has_headers=job_kwargs["table_has_headers"] and index == 0,
+                                          write_columns_to_manifest=header_in_manifest,
+                                          compression_level=compression_level)
+        logging.info(f"Table '{table_name}' split into {len(chunk_jobs)} chunks")
+
+        try:
+            self._anonymize_slices(table_name, chunk_jobs, anonymizer)
+            if not sliced_output:
+                with open(out_table_path, "wb") as out_file:
+                    for chunk_job in chunk_jobs.values():
+                        with open(chunk_job["out_table_path"], "rb") as chunk_file:
+                            shutil.copyfileobj(chunk_file, out_file, CONCATENATE_BUFFER_SIZE)
+        finally:
+            if not sliced_output:
+                shutil.rmtree(chunk_dir, ignore_errors=True)
+
+    def get_byte_ranges(self, table_path: str, enclosure: str) -> List[Tuple[int, int]]:
+        """
+        Returns byte ranges of a single uncompressed file larger than the configured chunk size,
+        an empty list when the file is processed in one piece.
+        """
+        chunk_size_mb = self.configuration.parameters.get(KEY_CHUNK_SIZE_MB, DEFAULT_CHUNK_SIZE_MB)
+        if not isinstance(chunk_size_mb, (int, float)) or isinstance(chunk_size_mb, bool) or chunk_size_mb < 0:
+            raise UserException(f"The {KEY_CHUNK_SIZE_MB} config parameter must be a non-negative number, "
+                                f"not {chunk_size_mb}")
+        chunk_size = int(chunk_size_mb * 1024 * 1024)
+        if not chunk_size or is_gzip_file(table_path) or pt.getsize(table_path) <= chunk_size:
+            return []
+        return split_byte_ranges(table_path, chunk_size, enclosure or '"')
+
+    def get_output_slicing(self) -> Optional[OutputSlicing]:
+        """
+        Returns the slicing of single file output tables, None when neither output_slice_rows
+        nor output_slice_mb is set.
+        """
+        params = self.configuration.parameters
+        limits = {}
+        for key in [KEY_OUTPUT_SLICE_ROWS, KEY_OUTPUT_SLICE_MB]:
+            limit = params.get(key, 0)
+            if not isinstance(limit, (int, float)) or isinstance(limit, bool) or limit < 0 \
+                    or (key == KEY_OUTPUT_SLICE_ROWS and limit != int(limit)):
+                raise UserException(f"The {key} config parameter must be a non-negative "
+                                    f"{'integer' if key == KEY_OUTPUT_SLICE_ROWS else 'number'}, not {limit}")
+            limits[key] = limit
+        max_rows = int(limits[KEY_OUTPUT_SLICE_ROWS])
+        max_bytes = int(limits[KEY_OUTPUT_SLICE_MB] * 1024 * 1024)
+        if not max_rows and not max_bytes:
+            return None
+        return OutputSlicing(max_rows, max_bytes, compress=self.get_output_compression()[0])
+
+    def get_chunk_output(self) -> str:
+        chunk_output = self.configuration.parameters.get(KEY_CHUNK_OUTPUT, CHUNK_OUTPUT_SINGLE)
+        if chunk_output not in CHUNK_OUTPUT_MODES:
+            raise UserException(f"The {KEY_CHUNK_OUTPUT} config parameter must be one of {CHUNK_OUTPUT_MODES}, "
+                                f"not {chunk_output}")
+        return chunk_output
+
     def create_out_table_definition_from_in_table(self,
                                                   in_table: TableDefinition,
                                                   schema) -> TableDefinition:
@@ -260,15 +930,16 @@ class Component(ComponentBase):
     def get_sliced_files(table: TableDefinition) -> List[str]:
         return [f for f in listdir(table.full_path) if isfile(join(table.full_path, f))]
 
-    def get_input_table(self, in_table_name: str) -> TableDefinition:
-        in_tables = self.get_input_tables_definitions()
-        return self.get_input_table_by_name(in_tables, in_table_name)
+    def get_input_table(self, in_table_name: str) -> Optional[TableDefinition]:
+        return self.get_input_tables_index().get(in_table_name)
 
-    @staticmethod
-    def get_input_table_by_name(in_tables: List[TableDefinition], name: str) -> TableDefinition:
-        for table in in_tables:
-            if table.name == name:
-                return table
+    def get_input_tables_index(self) -> Dict[str, TableDefinition]:
+        """
+        Returns the input table definitions keyed by table name, the manifests are read only once per run.
+        """
+        if self._input_tables_index is None:
+            self._input_tables_index = {table.name: table for table in self.get_input_tables_definitions()}
+        return self._input_tables_index
 
     @staticmethod
     def validate_columns_to_anonymize(columns: List[str], table_columns: List[str], in_table_name: str) -> List[str]:
@@ -291,34 +962,204 @@ class Component(ComponentBase):
                           anonymizer: Anonymizer,
                           delimiter: str,
                           table_has_headers: bool,
-                          write_columns_to_manifest: bool) -> None:
-
-        with open(table_path, "r") as in_file, open(out_table_path, "w") as out_file:
-            csv_reader = csv.DictReader(in_file, fieldnames=table_columns, delimiter=delimiter)
-            csv_writer = csv.DictWriter(out_file, fieldnames=table_columns, delimiter=delimiter)
-            for i, row in enumerate(csv_reader):
-                annonymized_row = row
-                if table_has_headers and i == 0 and not write_columns_to_manifest:
-                    csv_writer.writerow(annonymized_row)
-                    continue
-                if write_columns_to_manifest and table_has_headers and i == 0:
-                    continue
-                for column in columns_to_anonymize:
-                    if salt_location == "prepend":
-                        annonymized_row[column] = anonymizer.encode_data("".join([salt, row[column]]))
-                    elif salt_location == "append":
-                        annonymized_row[column] = anonymizer.encode_data("".join([row[column], salt]))
-                csv_writer.writerow(annonymized_row)
+                          write_columns_to_manifest: bool,
+                          compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+                          engine: str = DEFAULT_ENGINE,
+                          byte_range: Optional[Tuple[int, int]] = None,
+                          enclosure: str = '"',
+                          pipeline: Optional["PipelineSettings"] = None,
+                          pipeline_stats: Optional["PipelineStats"] = None,
+                          output_slicing: Optional[OutputSlicing] = None,
+                          output_columns: Optional[List[str]] = None) -> int:
+        """
+        Anonymizes the columns of a single csv file, gzipped input and output files (.gz suffix) are streamed.
+        With byte_range only that (start, end) byte range of an uncompressed input file is processed.
+        The pipelined engine runs with the pipeline settings and adds its queue waits to pipeline_stats.
+        With output_slicing the output is written as slices of the out_table_path folder by the bytes engine.
+        Only the output_columns are written, in the table order, all columns when it is None.
+        The values of a pseudonym store anonymizer are looked up for a batch of rows at once.
+        Returns the number of data rows written, the header is not counted.
+        """
+        from anonymization import StoredAnonymizer
+        from engines import anonymize_columns_arrow, anonymize_columns_bytes, anonymize_columns_pipelined, \
+            ENGINE_ARROW, ENGINE_BYTES, ENGINE_PIPELINED
+
+        enclosure = enclosure or '"'
+        anonymize = None
+        if salt_location in SALT_LOCATIONS:
+            anonymize = anonymizer.get_salted_encoder(salt, salt_location)
+        else:
+            columns_to_anonymize = []
+        prefetch = anonymizer.prefetch if isinstance(anonymizer, StoredAnonymizer) else None
+
+        if engine in (ENGINE_BYTES, ENGINE_PIPELINED) or output_slicing:
+            anonymize_bytes = anonymizer.get_salted_bytes_encoder(salt, salt_location) if anonymize else None
+            if engine == ENGINE_PIPELINED and not output_slicing:
+                row_count = anonymize_columns_pipelined(table_path, out_table_path, table_columns, anonymize,
+                                                        anonymize_bytes, columns_to_anonymize, delimiter, enclosure,
+                                                        table_has_headers, write_columns_to_manifest,
+                                                        compression_level, byte_range, pipeline, pipeline_stats,
+                                                        output_columns, prefetch)
+            else:
+                row_count = anonymize_columns_bytes(table_path, out_table_path, table_columns, anonymize,
+                                                    anonymize_bytes, columns_to_anonymize, delimiter, enclosure,
+                                                    table_has_headers, write_columns_to_manifest, compression_level,
+                                                    byte_range, output_slicing, output_columns, prefetch)
+            anonymizer.flush()
+            return row_count
+
+        # the arrow engine serializes values with the default enclosure only
+        if engine == ENGINE_ARROW and enclosure == '"':
+            row_count = anonymize_columns_arrow(table_path, out_table_path, table_columns, anonymize,
+                                                columns_to_anonymize, delimiter, table_has_headers,
+                                                write_columns_to_manifest, compression_level, byte_range,
+                                                output_columns, prefetch)
+            if row_count is not None:
+                anonymizer.flush()
+                return row_count
+            logging.warning(f"The arrow engine cannot parse the file {pt.basename(table_path)}, "
+                            f"it is processed by the csv engine")
+
+        column_indexes = [table_columns.index(column) for column in columns_to_anonymize]
+        column_count = len(table_columns)
+        output_indexes = None
+        if output_columns is not None:
+            output_indexes = [table_columns.index(column) for column in output_columns]
+
+        with open_table_file(table_path, "r", byte_range=byte_range) as in_file, \
+                open_table_file(out_table_path, "w", compression_level=compression_level) as out_file:
+            # blank lines are skipped the same way csv.DictReader skips them
+            csv_reader = filter(None, csv.reader(in_file, delimiter=delimiter, quotechar=enclosure))
+            csv_writer = csv.writer(out_file, delimiter=delimiter, quotechar=enclosure)
+
+            if table_has_headers:
+                header = next(csv_reader, None)
+                if header is not None and not write_columns_to_manifest:
+                    header = Component._fit_row(header, column_count, 1)
+                    if output_indexes is not None:
+                        header = [header[index] for index in output_indexes]
+                    csv_writer.writerow(header)
+
+            batch = []
+            row_count = 0
+            for row_number, row in enumerate(csv_reader, start=2 if table_has_headers else 1):
+                if len(row) != column_count:
+                    row = Component._fit_row(row, column_count, row_number)
+                batch.append(row)
+                if len(batch) >= WRITE_BATCH_SIZE:
+                    csv_writer.writerows(Component._anonymize_rows(batch, column_indexes, anonymize, output_indexes,
+                                                                   prefetch))
+                    row_count += len(batch)
+                    batch = []
+            csv_writer.writerows(Component._anonymize_rows(batch, column_indexes, anonymize, output_indexes, prefetch))
+            row_count += len(batch)
+        anonymizer.flush()
+        return row_count
+
+    @staticmethod
+    def _anonymize_rows(rows: List[List[str]], column_indexes: List[int], anonymize: Callable[[str], str],
+                        output_indexes: Optional[List[int]],
+                        prefetch: Optional[Callable[[List[str]], None]]) -> List[List[str]]:
+        """
+        Anonymizes the columns of a batch of rows and keeps only the output columns, when they are given.
+        """
+        if prefetch and column_indexes:
+            prefetch([row[index] for row in rows for index in column_indexes])
+        for row in rows:
+            for index in column_indexes:
+                row[index] = anonymize(row[index])
+        if output_indexes is not None:
+            rows = [[row[index] for index in output_indexes] for row in rows]
+        return rows
+
+    @staticmethod
+    def _fit_row(row: List[str], column_count: int, row_number: int) -> List[str]:
+        """
+        Pads short rows with empty values, rows with more values than columns are invalid.
+        """
+        if len(row) > column_count:
+            raise ValueError(f"Row {row_number} contains {len(row)} values, but the table has {column_count} columns")
+        return row + [""] * (column_count - len(row))
 
     @staticmethod
     def _get_table_columns(table: TableDefinition, delimiter: str) -> List[str]:
-        with open(table.full_path) as csv_file:
-            csv_reader = csv.DictReader(csv_file, delimiter=delimiter)
-            dict_from_csv = dict(list(csv_reader)[0])
-            list_of_column_names = list(dict_from_csv.keys())
-        return list_of_column_names
+        return read_header(table.full_path, delimiter=delimiter, enclosure=table.enclosure)
 
     def get_anonymizer(self) -> Anonymizer:
+        anonymizer = self._get_method_anonymizer()
+        cache_size_mb = self.configuration.parameters.get(KEY_CACHE_SIZE_MB, DEFAULT_CACHE_SIZE_MB)
+        if not isinstance(cache_size_mb, (int, float)) or isinstance(cache_size_mb, bool) or cache_size_mb < 0:
+            raise UserException(f"The {KEY_CACHE_SIZE_MB} config parameter must be a non-negative number, "
+                                f"not {cache_size_mb}")
+        if self.pseudonym_store:
+            # the store keeps its recently used pseudonyms in its own cache, bounded by cache_size_mb when set
+            from anonymization import StoredAnonymizer, DEFAULT_STORE_CACHE_SIZE
+
+            max_memory = int(cache_size_mb * 1024 * 1024) if cache_size_mb else DEFAULT_STORE_CACHE_SIZE
+            anonymizer = StoredAnonymizer(anonymizer, self.pseudonym_store, self.get_pseudonym_namespace(),
+                                          max_memory=max_memory)
+        elif cache_size_mb:
+            anonymizer = CachedAnonymizer(anonymizer, max_memory=int(cache_size_mb * 1024 * 1024))
+        return anonymizer
+
+    def get_pseudonym_namespace(self) -> str:
+        params = self.configuration.parameters
+        return config_fingerprint(method=params.get(KEY_ENCRYPT_METHOD),
+                                  digest_size=params.get(KEY_DIGEST_SIZE),
+                                  salt=params.get(KEY_SALT, ""),
+                                  salt_location=params.get(KEY_SALT_LOCATION, DEFAULT_SALT_LOCATION))
+
+    def open_pseudonym_store(self) -> None:
+        """
+        Opens a working copy of the pseudonym store from the input files, or a new store if there is none.
+        """
+        params = self.configuration.parameters
+        store_name = params.get(KEY_PSEUDONYM_STORE)
+        if not store_name:
+            return
+        from anonymization import PseudonymStore, DEFAULT_MAX_ENTRIES
+
+        max_entries = params.get(KEY_PSEUDONYM_STORE_MAX_ENTRIES, DEFAULT_MAX_ENTRIES)
+        if not isinstance(max_entries, int) or isinstance(max_entries, bool) or max_entries < 1:
+            raise UserException(f"The {KEY_PSEUDONYM_STORE_MAX_ENTRIES} config parameter must be a positive "
+                                f"integer, not {max_entries}")
+
+        store_path = pt.join(tempfile.mkdtemp(), store_name)
+        in_stores = [file for file in self.get_input_files_definitions(only_latest_files=True)
+                     if file.name == store_name]
+        if in_stores:
+            shutil.copy(in_stores[0].full_path, store_path)
+            logging.info(f"Using the pseudonym store {store_name} from input files")
+        else:
+            logging.info(f"Pseudonym store {store_name} not found in input files, a new store is created")
+        self.pseudonym_store = PseudonymStore(store_path, max_entries)
+
+    def close_pseudonym_store(self) -> None:
+        """
+        Logs the reuse of pseudonyms in this run, exports the pseudonyms of the current settings if configured
+        and writes the store to the output files.
+        """
+        if not self.pseudonym_store:
+            return
+        params = self.configuration.parameters
+        run_stats = CacheStats()
+        for stats in self.pseudonym_stats:
+            run_stats.merge(stats)
+        logging.info(f"Pseudonym store: {run_stats.hits} pseudonyms reused, {run_stats.misses} new, "
+                     f"reuse ratio {run_stats.hit_ratio:.1%}, {self.pseudonym_store.count()} entries stored")
+
+        if params.get(KEY_PSEUDONYM_STORE_EXPORT):
+            out_table = self.create_out_table_definition(params.get(KEY_PSEUDONYM_STORE_EXPORT),
+                                                         schema=["value", "pseudonym"])
+            self.pseudonym_store.export_csv(self.get_pseudonym_namespace(), out_table.full_path)
+            self.write_manifest(out_table)
+
+        self.pseudonym_store.close()
+        out_file = self.create_out_file_definition(params.get(KEY_PSEUDONYM_STORE))
+        shutil.move(self.pseudonym_store.path, out_file.full_path)
+        shutil.rmtree(pt.dirname(self.pseudonym_store.path), ignore_errors=True)
+
+    def _get_method_anonymizer(self) -> Anonymizer:
         params = self.configuration.parameters
         method = params.get(KEY_ENCRYPT_METHOD)
         if method in ["SHA", "SHA512"]:
@@ -327,12 +1168,20 @@ class Component(ComponentBase):
             return SHAAnonymizer(sha_ver="256")
         elif method == "MD5":
             return MD5Anonymizer()
+        elif method in ["BLAKE2b", "BLAKE2s"]:
+            try:
+                return BLAKE2Anonymizer(variant=method[-1], digest_size=params.get(KEY_DIGEST_SIZE))
+            except (AnonymizerException, TypeError) as anonymizer_exc:
+                raise UserException(f"Invalid {KEY_DIGEST_SIZE} config parameter: {anonymizer_exc}") from anonymizer_exc
+        elif method == "HMAC-SHA256":
+            return HMACAnonymizer()
         else:
             raise UserException(f"{method} method of anonymization/encryption is not supported, enter "
-                                f"one from the list :  'SHA256', 'SHA512', 'MD5' ")
+                                f"one from the list :  'SHA256', 'SHA512', 'MD5', 'BLAKE2b', 'BLAKE2s', "
+                                f"'HMAC-SHA256' ")
 
     def get_tables_not_in_list(self, list_of_tables: List[str]) -> List:
-        input_tables = self.get_input_tables_definitions()
+        input_tables = self.get_input_tables_index().values()
         tables_not_in_list = []
         for input_table in input_tables:
             if input_table.name not in list_of_tables:
@@ -340,7 +1189,8 @@ class Component(ComponentBase):
         return tables_not_in_list
 
     def check_for_files(self) -> None:
-        in_files = self.get_input_files_definitions(only_latest_files=True)
+        in_files = [file for file in self.get_input_files_definitions(only_latest_files=True)
+                    if file.name != self.configuration.parameters.get(KEY_PSEUDONYM_STORE)]
         if in_files:
             logging.warning("Files found instead of tables, if you want them processed, "
                             "please first use the move files processor to move the files to tables. "
@@ -349,36 +1199,58 @@ class Component(ComponentBase):
     def move_files(self) -> None:
         files = self.get_input_files_definitions()
         for file in files:
+            if file.name == self.configuration.parameters.get(KEY_PSEUDONYM_STORE):
+                # the updated store is written to the output when the tables are anonymized
+                continue
             new_file = self.create_out_file_definition(file.name)
-            if pt.isfile(file.full_path):
-                shutil.copy(file.full_path, new_file.full_path)
-            elif pt.isdir(file.full_path):
-                shutil.copytree(file.full_path, new_file.full_path, dirs_exist_ok=True)
+            if pt.exists(file.full_path):
+                with self.performance_report.stage(file.name, STAGE_MOVE_FILES) as metrics:
+                    metrics.bytes_in = metrics.bytes_out = self.passthrough.transfer(file.full_path,
+                                                                                     new_file.full_path)
 
     def move_table_to_out(self, source, destination):
-        if pt.isfile(source.full_path):
-            shutil.copy(source.full_path, destination.full_path)
-        elif pt.isdir(source.full_path):
-            shutil.copytree(source.full_path, destination.full_path, dirs_exist_ok=True)
+        if pt.exists(source.full_path):
+            with self.performance_report.stage(source.name, STAGE_PASSTHROUGH) as metrics:
+                metrics.bytes_in = metrics.bytes_out = self.passthrough.transfer(source.full_path,
+                                                                                 destination.full_path)
         if Path(f'{source.full_path}.manifest').exists():
             shutil.copy(f'{source.full_path}.manifest', f'{destination.full_path}.manifest')
         else:
             self.write_manifest(destination)
 
-    def _unzip_sliced_table(self, table: TableDefinition):
-        d = Decompressor()
-        temp_dir = tempfile.mkdtemp()
-        sliced_files = self._get_in_files(table.full_path)
-        for sliced_file in sliced_files:
-            sliced_file_out = self._get_out_path(sliced_file, temp_dir)
-            try:
-                d.decompress(sliced_file, sliced_file_out)
-            except DecompressorException as decompress_exc:
-                raise UserException(decompress_exc) from decompress_exc
+    def _unzip_sliced_table(self, table: TableDefinition) -> str:
+        """
+        Extracts the archives of the sliced table to a temporary folder, max_workers archives at the same time,
+        and records the extraction metrics of every archive.
+        """
+        from decompress import Decompressor, DecompressorException
 
+        temp_dir = tempfile.mkdtemp()
+        archives = [(sliced_file, self._get_out_path(sliced_file, temp_dir))
+                    for sliced_file in self._get_in_files(table.full_path)]
+        try:
+            archive_metrics = Decompressor(self.get_max_workers()).decompress_all(archives)
+        except DecompressorException as decompress_exc:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise UserException(decompress_exc) from decompress_exc
+        except BaseException:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+
+        for metrics in archive_metrics:
+            self.add_archive_metrics(table.name, metrics)
         temp_file_loc = os.path.join(temp_dir, table.name)
         return temp_file_loc
 
+    def add_archive_metrics(self, table_name: str, archive_metrics: "ArchiveMetrics") -> None:
+        archive_name = pt.basename(archive_metrics.archive)
+        self.performance_report.add(StageMetrics(table_name, STAGE_DECOMPRESS, archive_name,
+                                                 bytes_in=archive_metrics.bytes_in,
+                                                 bytes_out=archive_metrics.bytes_out,
+                                                 wall_time=archive_metrics.wall_time,
+                                                 cpu_time=archive_metrics.cpu_time))
+        logging.info(f"Archive '{archive_name}' of table '{table_name}' extracted: {archive_metrics}")
+
     @staticmethod
     def _get_in_files(table_path) -> list:
         files = glob.glob(os.path.join(table_path, "**/*"), recursive=True)
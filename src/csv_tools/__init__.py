@@ -0,0 +1,4 @@
+from .header import open_table_file, is_gzip_file, get_first_slice, read_header, sniff_dialect  # noqa
+from .header import GZIP_EXTENSION, DEFAULT_COMPRESSION_LEVEL  # noqa
+from .chunking import split_byte_ranges, ByteRangeReader  # noqa
+from .sliced_writer import OutputSlicing, SlicedTableWriter  # noqa
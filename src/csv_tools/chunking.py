@@ -0,0 +1,77 @@
+import io
+import os
+from typing import List, Tuple
+
+# bytes read at once while looking for record boundaries
+SCAN_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def _quote_parity(block: bytes, quote: bytes, start: int, end: int) -> int:
+    return block.count(quote, start, end) & 1 if quote else 0
+
+
+def split_byte_ranges(file_path: str, chunk_size: int, enclosure: str = '"') -> List[Tuple[int, int]]:
+    """
+    Splits an uncompressed csv file into byte ranges of at least chunk_size bytes which end at record boundaries.
+    A newline only ends a record when it is not enclosed, which is decided by the parity of the enclosure
+    characters before it, doubled (escaped) enclosures do not change the parity. The file is scanned once.
+    Args:
+        file_path: Path of the csv file.
+        chunk_size: Minimal size of a range in bytes, the last range may be smaller.
+        enclosure: CSV enclosure (quote character), empty if values are never enclosed.
+
+    Returns:
+        List of (start, end) byte offsets covering the whole file, end is exclusive.
+    """
+    file_size = os.path.getsize(file_path)
+    quote = enclosure.encode()
+    boundaries = [0]
+    next_boundary = chunk_size
+    in_quotes = 0
+    block_offset = 0
+    with open(file_path, "rb") as csv_file:
+        while next_boundary < file_size:
+            block = csv_file.read(SCAN_BLOCK_SIZE)
+            if not block:
+                break
+            position = 0
+            while position < len(block) and next_boundary < file_size:
+                if block_offset + len(block) <= next_boundary:
+                    in_quotes ^= _quote_parity(block, quote, position, len(block))
+                    break
+                newline = block.find(b"\n", max(position, next_boundary - block_offset))
+                end = newline + 1 if newline != -1 else len(block)
+                in_quotes ^= _quote_parity(block, quote, position, end)
+                position = end
+                if newline != -1 and not in_quotes:
+                    boundaries.append(block_offset + position)
+                    next_boundary = block_offset + position + chunk_size
+            block_offset += len(block)
+    boundaries.append(file_size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+class ByteRangeReader(io.RawIOBase):
+    """
+    Raw binary reader of the [start, end) byte range of a file.
+    """
+
+    def __init__(self, file_path: str, start: int, end: int) -> None:
+        self._file = open(file_path, "rb")
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        read = self._file.readinto(memoryview(buffer)[:size])
+        self._remaining -= read
+        return read
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
@@ -0,0 +1,104 @@
+import csv
+import gzip
+import io
+import os
+from typing import IO, List, Optional, Tuple, Type
+
+from .chunking import ByteRangeReader
+
+GZIP_EXTENSION = ".gz"
+DEFAULT_SNIFF_SIZE = 64 * 1024
+DEFAULT_COMPRESSION_LEVEL = 6
+
+
+def is_gzip_file(file_path: str) -> bool:
+    return file_path.lower().endswith(GZIP_EXTENSION)
+
+
+def open_table_file(file_path: str, mode: str = "r", compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+                    byte_range: Optional[Tuple[int, int]] = None, **kwargs) -> IO:
+    """
+    Opens a table file, transparently (de)compressing it when its name ends with .gz.
+    Args:
+        file_path: Path of the csv or csv.gz file.
+        mode: "r"/"w" for text or "rb"/"wb" for binary access.
+        compression_level: gzip compression level used when writing a .gz file.
+        byte_range: Read only the (start, end) byte range of an uncompressed file.
+        **kwargs: passed to open, gzip.open or io.TextIOWrapper, e.g. newline.
+
+    Returns:
+        File object.
+    """
+    if byte_range is not None:
+        if is_gzip_file(file_path) or "r" not in mode:
+            raise ValueError("Byte ranges can only be read from uncompressed files")
+        range_file = io.BufferedReader(ByteRangeReader(file_path, *byte_range))
+        return range_file if "b" in mode else io.TextIOWrapper(range_file, **kwargs)
+    if not is_gzip_file(file_path):
+        return open(file_path, mode, **kwargs)
+    if "r" in mode:
+        return gzip.open(file_path, "rb" if "b" in mode else "rt", **kwargs)
+    # mtime is fixed, so that the same data always produce the same compressed bytes
+    gzip_file = gzip.GzipFile(file_path, "wb", compresslevel=compression_level, mtime=0)
+    if "b" in mode:
+        return gzip_file
+    return io.TextIOWrapper(gzip_file, **kwargs)
+
+
+def get_first_slice(table_path: str) -> Optional[str]:
+    """
+    Returns the path of the first slice (in name order) of a sliced table, or the path itself for a single file.
+    Args:
+        table_path: Path of the table file or the sliced table folder.
+
+    Returns:
+        Path to a file, None if the sliced table folder contains no files.
+    """
+    if not os.path.isdir(table_path):
+        return table_path
+    slices = sorted(f for f in os.listdir(table_path) if os.path.isfile(os.path.join(table_path, f)))
+    if not slices:
+        return None
+    return os.path.join(table_path, slices[0])
+
+
+def read_header(table_path: str, delimiter: str = ",", enclosure: str = '"') -> List[str]:
+    """
+    Reads only the first record of a table, works for single files, sliced tables and gzipped slices.
+    Args:
+        table_path: Path of the table file or the sliced table folder.
+        delimiter: CSV delimiter.
+        enclosure: CSV enclosure (quote character).
+
+    Returns:
+        List of column names, empty if the table is empty.
+    """
+    file_path = get_first_slice(table_path)
+    if not file_path:
+        return []
+    with open_table_file(file_path, newline="") as csv_file:
+        csv_reader = csv.reader(csv_file, delimiter=delimiter, quotechar=enclosure or '"')
+        return next(csv_reader, [])
+
+
+def sniff_dialect(table_path: str, sample_size: int = DEFAULT_SNIFF_SIZE,
+                  delimiters: Optional[str] = None) -> Type[csv.Dialect]:
+    """
+    Guesses the CSV dialect of a table from a sample of its first file.
+    Args:
+        table_path: Path of the table file or the sliced table folder.
+        sample_size: Number of characters to inspect.
+        delimiters: Optional string of allowed delimiter characters.
+
+    Returns:
+        csv.Dialect subclass, csv.excel if the table is empty or the dialect cannot be determined.
+    """
+    file_path = get_first_slice(table_path)
+    if not file_path:
+        return csv.excel
+    with open_table_file(file_path, newline="") as csv_file:
+        sample = csv_file.read(sample_size)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=delimiters)
+    except csv.Error:
+        return csv.excel
@@ -0,0 +1,95 @@
+import os
+from typing import IO, List, Optional
+
+from .header import open_table_file, DEFAULT_COMPRESSION_LEVEL, GZIP_EXTENSION
+
+DEFAULT_SLICE_PREFIX = "part_"
+
+
+class OutputSlicing:
+    def __init__(self, max_rows: int = 0, max_bytes: int = 0, compress: bool = False,
+                 prefix: str = DEFAULT_SLICE_PREFIX) -> None:
+        """
+        Args:
+            max_rows: Maximum number of rows of a slice, 0 means no limit.
+            max_bytes: Maximum uncompressed size of a slice in bytes, 0 means no limit. A single row larger
+                than the limit makes a slice of its own.
+            compress: Write the slices gzip compressed.
+            prefix: Name prefix of the slices, they are numbered from 0.
+        """
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.prefix = prefix
+
+    def with_prefix(self, prefix: str) -> "OutputSlicing":
+        return OutputSlicing(self.max_rows, self.max_bytes, self.compress, prefix)
+
+
+class SlicedTableWriter:
+    """
+    Writes serialized rows into numbered slices of a sliced table folder. A new slice is started after
+    max_rows rows, or before a row which would make the slice larger than max_bytes.
+    """
+
+    def __init__(self, out_dir: str, slicing: OutputSlicing,
+                 compression_level: int = DEFAULT_COMPRESSION_LEVEL) -> None:
+        self.out_dir = out_dir
+        self.slicing = slicing
+        self.compression_level = compression_level
+        self.slice_names: List[str] = []
+        self.slice_file: Optional[IO[bytes]] = None
+        self.slice_rows = 0
+        self.slice_bytes = 0
+        os.makedirs(out_dir, exist_ok=True)
+
+    def write_rows(self, rows: List[bytes]) -> None:
+        """
+        Writes complete serialized rows, each item is one row including its line end.
+        """
+        max_rows, max_bytes = self.slicing.max_rows, self.slicing.max_bytes
+        start = 0
+        while start < len(rows):
+            if self.slice_file is None:
+                self._open_slice()
+            end = len(rows)
+            if max_rows:
+                end = min(end, start + max_rows - self.slice_rows)
+            if max_bytes:
+                size = self.slice_bytes
+                for index in range(start, end):
+                    size += len(rows[index])
+                    if size > max_bytes and (index > start or self.slice_rows):
+                        end = index
+                        break
+            data = b"".join(rows[start:end])
+            self.slice_file.write(data)
+            self.slice_rows += end - start
+            self.slice_bytes += len(data)
+            if end < len(rows) or (max_rows and self.slice_rows >= max_rows):
+                self._close_slice()
+            start = end
+
+    def close(self) -> None:
+        self._close_slice()
+
+    def _open_slice(self) -> None:
+        slice_name = f"{self.slicing.prefix}{len(self.slice_names):05d}.csv"
+        if self.slicing.compress:
+            slice_name = "".join([slice_name, GZIP_EXTENSION])
+        self.slice_names.append(slice_name)
+        self.slice_file = open_table_file(os.path.join(self.out_dir, slice_name), "wb",
+                                          compression_level=self.compression_level)
+        self.slice_rows = 0
+        self.slice_bytes = 0
+
+    def _close_slice(self) -> None:
+        if self.slice_file is not None:
+            self.slice_file.close()
+            self.slice_file = None
+
+    def __enter__(self) -> "SlicedTableWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
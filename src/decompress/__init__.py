@@ -1 +1 @@
-from .decompress import Decompressor, DecompressorException  # noqa
+from .decompress import Decompressor, DecompressorException, ArchiveMetrics  # noqa
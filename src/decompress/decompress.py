@@ -1,44 +1,57 @@
+import gzip
 import os
 import pathlib
 import re
 import shutil
-
-import gzip
-from py7zr import unpack_7zarchive
+import tarfile
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Iterator, List, Optional, Tuple
 
 SUPPORTED_FORMATS = [
     ".7z", ".tar.bz2", ".tbz2", ".gz", ".tar.gz", ".tgz", ".tar", ".tar.xz", ".txz", ".zip"
 ]
+TAR_FORMATS = [".tar", ".tar.bz2", ".tbz2", ".tar.gz", ".tgz", ".tar.xz", ".txz"]
 
+COPY_BUFFER_SIZE = 1024 * 1024
+# errors of corrupt or truncated archives, raised when an archive is opened and when its members are read
+ARCHIVE_ERRORS = (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError, zlib.error)
 
-def gunzip(gzipped_file_name, work_dir) -> None:
-    """gunzip the given gzipped file"""
 
-    filename = os.path.split(gzipped_file_name)[-1]
-    filename = re.sub(r"\.gz$", "", filename, flags=re.IGNORECASE)
+class DecompressorException(Exception):
+    pass
 
-    if not os.path.exists(work_dir):
-        os.makedirs(work_dir)
 
-    with gzip.open(gzipped_file_name, 'rb') as f_in:
-        with open(os.path.join(work_dir, filename), 'wb') as f_out:
-            shutil.copyfileobj(f_in, f_out)
+class ArchiveMetrics:
+    """
+    Members, bytes and time of the extraction of one archive.
+    """
 
+    def __init__(self, archive: str, members: int = 0, bytes_in: int = 0, bytes_out: int = 0,
+                 wall_time: float = 0.0, cpu_time: float = 0.0) -> None:
+        self.archive = archive
+        self.members = members
+        self.bytes_in = bytes_in
+        self.bytes_out = bytes_out
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
 
-class DecompressorException(Exception):
-    pass
+    def __str__(self) -> str:
+        return (f"{self.members} members, {self.bytes_in} bytes in, {self.bytes_out} bytes extracted "
+                f"in {self.wall_time:.3f}s wall, {self.cpu_time:.3f}s CPU")
 
 
 class Decompressor:
-    def __init__(self):
-        shutil.register_unpack_format("7zip",
-                                      [".7z"],
-                                      unpack_7zarchive,
-                                      description="7zip archive")
-
-        shutil.register_unpack_format("gz", [".gz", ], gunzip)
+    def __init__(self, workers: int = 1):
+        """
+        Args:
+            workers: Number of archives extracted at the same time by decompress_all.
+        """
+        self.workers = workers
 
-    def decompress(self, file_path, file_out_path) -> None:
+    def decompress(self, file_path, file_out_path) -> ArchiveMetrics:
         """
         If the file in file_path is of supported type, unzips the file into file_out_path.
         Args:
@@ -46,13 +59,99 @@ class Decompressor:
             file_out_path: Path where file/files will be unzipped to.
 
         Returns:
-            None
+            ArchiveMetrics of the extraction.
         """
+        if not self._is_supported_filetype(file_path):
+            raise DecompressorException(f"File {file_path} cannot be processed: unsupported file type.")
+
+        metrics = ArchiveMetrics(file_path, bytes_in=os.path.getsize(file_path))
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        for member_name, member_stream in self.iter_members(file_path):
+            member_path = self._get_member_path(file_out_path, member_name)
+            os.makedirs(os.path.dirname(member_path), exist_ok=True)
+            try:
+                with open(member_path, "wb") as member_file:
+                    shutil.copyfileobj(member_stream, member_file, COPY_BUFFER_SIZE)
+                    metrics.bytes_out += member_file.tell()
+            except ARCHIVE_ERRORS as archive_exc:
+                raise DecompressorException(f"File {file_path} cannot be processed, member {member_name} "
+                                            f"failed: {archive_exc}") from archive_exc
+            metrics.members += 1
+        metrics.wall_time = time.perf_counter() - wall_start
+        metrics.cpu_time = time.thread_time() - cpu_start
+        return metrics
+
+    def decompress_all(self, archives: List[Tuple[str, str]]) -> List[ArchiveMetrics]:
+        """
+        Extracts independent archives, up to workers of them at the same time. Decompression and file writes
+        release the GIL, so threads are used.
+        Args:
+            archives: (archive path, output path) pairs.
 
-        if self._is_supported_filetype(file_path):
-            shutil.unpack_archive(file_path, file_out_path)
-        else:
+        Returns:
+            ArchiveMetrics of the archives in the given order.
+        """
+        if self.workers <= 1 or len(archives) <= 1:
+            return [self.decompress(file_path, file_out_path) for file_path, file_out_path in archives]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self.decompress, file_path, file_out_path)
+                       for file_path, file_out_path in archives]
+            try:
+                return [future.result() for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    @staticmethod
+    def iter_members(file_path) -> Iterator[Tuple[str, IO[bytes]]]:
+        """
+        Yields (name, readable binary stream) of the files in the archive, decompress writes them to the output
+        folder. A gzipped file has a single member named without the .gz suffix. The stream is only valid until
+        the next member is requested, errors of reading it are raised by the stream itself.
+        """
+        archive_format = Decompressor._get_archive_format(file_path)
+        if archive_format is None:
             raise DecompressorException(f"File {file_path} cannot be processed: unsupported file type.")
+        try:
+            if archive_format == ".zip":
+                with zipfile.ZipFile(file_path) as zip_file:
+                    for info in zip_file.infolist():
+                        if not info.is_dir():
+                            with zip_file.open(info) as member_stream:
+                                yield info.filename, member_stream
+            elif archive_format in TAR_FORMATS:
+                # stream mode reads the archive sequentially, without seeking back for every member
+                with tarfile.open(file_path, "r|*") as tar_file:
+                    for member in tar_file:
+                        if member.isfile():
+                            yield member.name, tar_file.extractfile(member)
+            elif archive_format == ".7z":
+                from .seven_zip import iter_7z_members
+                yield from iter_7z_members(file_path)
+            else:
+                with gzip.open(file_path, "rb") as member_stream:
+                    yield re.sub(r"\.gz$", "", os.path.basename(file_path), flags=re.IGNORECASE), member_stream
+        except ARCHIVE_ERRORS as archive_exc:
+            raise DecompressorException(f"File {file_path} cannot be processed: {archive_exc}") from archive_exc
+
+    @staticmethod
+    def _get_member_path(file_out_path: str, member_name: str) -> str:
+        out_dir = os.path.join(os.path.normpath(file_out_path), "")
+        member_path = os.path.normpath(os.path.join(out_dir, member_name))
+        if os.path.isabs(member_name) or not member_path.startswith(out_dir):
+            raise DecompressorException(f"Archive member {member_name} would be extracted outside of "
+                                        f"{file_out_path}")
+        return member_path
+
+    @staticmethod
+    def _get_archive_format(file_path) -> Optional[str]:
+        suffixes = pathlib.Path(file_path).suffixes
+        # .tar.gz must not be taken for a gzipped file
+        for extension in ["".join(suffixes[-2:]), "".join(suffixes[-1:])]:
+            if extension in SUPPORTED_FORMATS:
+                return extension
+        return None
 
     @staticmethod
     def _is_supported_filetype(file_path) -> bool:
@@ -72,13 +171,3 @@ class Decompressor:
             if extension not in SUPPORTED_FORMATS:
                 return False
         return True
-
-    @staticmethod
-    def unregister_formats() -> None:
-        """
-        Unregisters formats that register_formats method registered.
-        This exists for easier test writing because shutil returns RegistryError
-        when trying to register already registered format.
-        """
-        shutil.unregister_unpack_format("7zip")
-        shutil.unregister_unpack_format("gz")
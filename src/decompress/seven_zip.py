@@ -0,0 +1,166 @@
+"""
+Streaming extraction of 7z archives. It is imported only when a 7z archive is extracted, because py7zr
+is the slowest import of the component.
+"""
+import io
+import queue
+import threading
+from typing import IO, Iterator, List, Optional, Tuple
+
+from py7zr import SevenZipFile
+from py7zr.io import Py7zIO, WriterFactory
+
+from .decompress import DecompressorException, COPY_BUFFER_SIZE
+
+# decompressed chunks of a 7z member buffered ahead of the reader
+SEVEN_ZIP_QUEUE_SIZE = 16
+# how often the 7z extraction thread checks whether the reader stopped reading
+POLL_INTERVAL = 0.1
+
+
+class _ExtractionStopped(Exception):
+    pass
+
+
+class _MemberPipe(Py7zIO):
+    """
+    Passes the chunks py7zr decompresses for one member to the reading thread through a bounded queue.
+    """
+
+    def __init__(self, stopped: threading.Event) -> None:
+        self.chunks = queue.Queue(maxsize=SEVEN_ZIP_QUEUE_SIZE)
+        self.stopped = stopped
+        self.written = 0
+        self.closed = False
+
+    def write(self, s: bytes) -> int:
+        self._put(bytes(s))
+        self.written += len(s)
+        return len(s)
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self._put(b"")
+
+    def _put(self, chunk: bytes) -> None:
+        while True:
+            if self.stopped.is_set():
+                raise _ExtractionStopped()
+            try:
+                self.chunks.put(chunk, timeout=POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    def read(self, size: Optional[int] = None) -> bytes:
+        return b""
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self.written
+
+    def flush(self) -> None:
+        pass
+
+    def size(self) -> int:
+        return self.written
+
+
+class _MemberStream(io.RawIOBase):
+    """
+    Readable stream of a 7z member, fed by the extraction thread through a _MemberPipe.
+    """
+
+    def __init__(self, pipe: _MemberPipe, finished: threading.Event, errors: List[BaseException]) -> None:
+        super().__init__()
+        self.pipe = pipe
+        self.finished = finished
+        self.errors = errors
+        self.pending = memoryview(b"")
+        self.eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self.pending:
+            if self.eof:
+                return 0
+            try:
+                chunk = self.pipe.chunks.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if self.finished.is_set() and self.pipe.chunks.empty():
+                    if self.errors:
+                        raise DecompressorException(f"7z extraction failed: {self.errors[0]}") from self.errors[0]
+                    self.eof = True
+                continue
+            if not chunk:
+                self.eof = True
+                return 0
+            self.pending = memoryview(chunk)
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+
+class _PipeFactory(WriterFactory):
+    def __init__(self, members: queue.Queue, stopped: threading.Event) -> None:
+        self.members = members
+        self.stopped = stopped
+        self.last: Optional[_MemberPipe] = None
+
+    def create(self, filename: str) -> Py7zIO:
+        # older py7zr versions do not close the writers, a new member ends the previous one
+        self.close_last()
+        self.last = _MemberPipe(self.stopped)
+        self.members.put((filename, self.last))
+        return self.last
+
+    def close_last(self) -> None:
+        if self.last is not None:
+            self.last.close()
+
+
+def iter_7z_members(file_path: str) -> Iterator[Tuple[str, IO[bytes]]]:
+    """
+    Extracts the 7z archive in a thread and yields its members as streams. py7zr pushes the decompressed data
+    to writers, the bounded queues of the pipes keep at most a few chunks of the member in memory.
+    """
+    members = queue.Queue()
+    stopped = threading.Event()
+    finished = threading.Event()
+    errors: List[BaseException] = []
+    factory = _PipeFactory(members, stopped)
+
+    def extract() -> None:
+        try:
+            with SevenZipFile(file_path) as archive:
+                archive.extract(factory=factory)
+            factory.close_last()
+        except _ExtractionStopped:
+            pass
+        except BaseException as exc:
+            errors.append(exc)
+        finally:
+            finished.set()
+            members.put(None)
+
+    thread = threading.Thread(target=extract, daemon=True)
+    thread.start()
+    try:
+        while True:
+            member = members.get()
+            if member is None:
+                break
+            member_name, pipe = member
+            member_stream = io.BufferedReader(_MemberStream(pipe, finished, errors), COPY_BUFFER_SIZE)
+            yield member_name, member_stream
+            # the members are extracted one after another, so the rest of this one has to be read first
+            while member_stream.read(COPY_BUFFER_SIZE):
+                pass
+    finally:
+        stopped.set()
+        thread.join()
+    if errors:
+        raise DecompressorException(f"7z extraction failed: {errors[0]}") from errors[0]
@@ -0,0 +1,10 @@
+from .arrow_engine import anonymize_columns_arrow, import_pyarrow, ArrowEngineException  # noqa
+from .bytes_engine import anonymize_columns_bytes  # noqa
+from .pipeline_engine import anonymize_columns_pipelined, PipelineSettings, PipelineStats, \
+    DEFAULT_READ_BUFFER_SIZE, DEFAULT_WRITE_BUFFER_SIZE, DEFAULT_QUEUE_SIZE  # noqa
+
+ENGINE_CSV = "csv"
+ENGINE_ARROW = "arrow"
+ENGINE_BYTES = "bytes"
+ENGINE_PIPELINED = "pipelined"
+ENGINES = [ENGINE_CSV, ENGINE_ARROW, ENGINE_BYTES, ENGINE_PIPELINED]
@@ -0,0 +1,158 @@
+"""
+Columnar anonymization engine. The csv is parsed by pyarrow in record batches and every anonymized column is
+dictionary encoded, so each distinct value of a batch is hashed only once. Batches are serialized with pyarrow
+compute functions following the csv.writer quoting rules, so the output is byte-identical to the csv engine.
+pyarrow is an optional dependency, it is imported only when the engine is used.
+"""
+import csv
+import io
+import re
+from typing import Callable, List, Optional, Tuple
+
+from csv_tools import open_table_file
+
+# size of the blocks pyarrow parses at once, one block becomes one record batch
+BLOCK_SIZE = 16 * 1024 * 1024
+
+
+class ArrowEngineException(Exception):
+    pass
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.csv
+    except ImportError as import_exc:
+        raise ArrowEngineException("The arrow engine requires the pyarrow package to be installed") from import_exc
+    return pyarrow
+
+
+def anonymize_columns_arrow(table_path: str,
+                            out_table_path: str,
+                            table_columns: List[str],
+                            anonymize: Callable[[str], str],
+                            columns_to_anonymize: List[str],
+                            delimiter: str,
+                            table_has_headers: bool,
+                            write_columns_to_manifest: bool,
+                            compression_level: int,
+                            byte_range: Optional[Tuple[int, int]] = None,
+                            output_columns: Optional[List[str]] = None,
+                            prefetch: Optional[Callable[[List[str]], None]] = None) -> Optional[int]:
+    """
+    Anonymizes the columns of a single csv file batch by batch.
+    Args:
+        table_path: Path of the input csv (or csv.gz) file.
+        out_table_path: Path of the output csv (or csv.gz) file.
+        table_columns: Names of all columns of the table.
+        anonymize: Salted encoder of the anonymizer.
+        columns_to_anonymize: Names of the columns to anonymize.
+        delimiter: CSV delimiter.
+        table_has_headers: The first record of the file is the header.
+        write_columns_to_manifest: The header is stored in the manifest, so it is not written to the output.
+        compression_level: gzip compression level of a .gz output file.
+        byte_range: Process only the (start, end) byte range of an uncompressed input file.
+        output_columns: Names of the columns written to the output, in the table order. None writes all columns.
+        prefetch: Called with the distinct values of every anonymized column of a batch before they are anonymized.
+
+    Returns:
+        Number of data rows written, the header is not counted. None if pyarrow cannot parse the file
+        (e.g. rows with a different number of values than columns), the output is then incomplete and the caller
+        should process the file with the csv engine.
+    """
+    pa = import_pyarrow()
+    column_indexes = [table_columns.index(column) for column in columns_to_anonymize]
+    output_indexes = list(range(len(table_columns)))
+    if output_columns is not None:
+        output_indexes = [table_columns.index(column) for column in output_columns]
+        column_indexes = [index for index in column_indexes if index in output_indexes]
+
+    read_options = pa.csv.ReadOptions(column_names=[f"c{i}" for i in range(len(table_columns))],
+                                      block_size=BLOCK_SIZE)
+    parse_options = pa.csv.ParseOptions(delimiter=delimiter, quote_char='"', double_quote=True,
+                                        newlines_in_values=True, ignore_empty_lines=True)
+    convert_options = pa.csv.ConvertOptions(column_types={f"c{i}": pa.string() for i in range(len(table_columns))},
+                                            strings_can_be_null=False)
+
+    with open_table_file(table_path, "rb", byte_range=byte_range) as in_file, \
+            open_table_file(out_table_path, "wb", compression_level=compression_level) as out_file:
+        try:
+            reader = pa.csv.open_csv(in_file, read_options=read_options, parse_options=parse_options,
+                                     convert_options=convert_options)
+            header_pending = table_has_headers
+            row_count = 0
+            for batch in reader:
+                # the dropped columns are not normalized, anonymized nor serialized
+                columns = {index: _normalize_newlines(pa, batch.column(index)) for index in output_indexes}
+                if header_pending and batch.num_rows:
+                    if not write_columns_to_manifest:
+                        out_file.write(_serialize_header([columns[index][0].as_py() for index in output_indexes],
+                                                         delimiter))
+                    columns = {index: column.slice(1) for index, column in columns.items()}
+                    header_pending = False
+                for index in column_indexes:
+                    columns[index] = _anonymize_column(pa, columns[index], anonymize, prefetch)
+                columns = [columns[index] for index in output_indexes]
+                out_file.write(_serialize_batch(pa, columns, delimiter))
+                row_count += len(columns[0]) if columns else 0
+            # the text mode writer of the csv engine flushes on close, which matters for gzip output bytes
+            out_file.flush()
+        except pa.ArrowInvalid:
+            return None
+    return row_count
+
+
+def _anonymize_column(pa, column, anonymize: Callable[[str], str],
+                      prefetch: Optional[Callable[[List[str]], None]] = None):
+    encoded = column.dictionary_encode()
+    values = encoded.dictionary.to_pylist()
+    if prefetch:
+        prefetch(values)
+    anonymized_values = pa.array([anonymize(value) for value in values], pa.string())
+    return anonymized_values.take(encoded.indices)
+
+
+def _serialize_header(header: List[str], delimiter: str) -> bytes:
+    header_buffer = io.StringIO()
+    csv.writer(header_buffer, delimiter=delimiter).writerow(header)
+    return header_buffer.getvalue().encode()
+
+
+def _serialize_batch(pa, columns, delimiter: str) -> bytes:
+    """
+    Serializes the columns the same way csv.writer with QUOTE_MINIMAL does: values containing the delimiter,
+    the quote character or a newline are quoted with doubled quotes, an empty value of a single column row is "".
+    """
+    pc = pa.compute
+    if not len(columns[0]):
+        return b""
+    special_characters = f'[{re.escape(delimiter)}"\r\n]'
+    serialized_columns = []
+    for column in columns:
+        needs_quotes = pc.match_substring_regex(column, special_characters)
+        if pc.any(needs_quotes).as_py():
+            quoted = pc.binary_join_element_wise('"', pc.replace_substring(column, '"', '""'), '"', "")
+            column = pc.if_else(needs_quotes, quoted, column)
+        serialized_columns.append(column)
+    if len(serialized_columns) == 1:
+        rows = pc.if_else(pc.equal(serialized_columns[0], ""), '""', serialized_columns[0])
+    else:
+        rows = pc.binary_join_element_wise(*serialized_columns, delimiter)
+    lines = pc.binary_join_element_wise(rows, "\r\n", "")
+    lines = lines.combine_chunks() if isinstance(lines, pa.ChunkedArray) else lines
+    # the values of a string array are stored one after another in its data buffer
+    _, offsets_buffer, data_buffer = lines.buffers()
+    offsets = memoryview(offsets_buffer).cast("i")
+    return data_buffer[offsets[lines.offset]:offsets[lines.offset + len(lines)]].to_pybytes()
+
+
+def _normalize_newlines(pa, column):
+    """
+    The csv engine reads files in text mode with universal newlines, so "\\r\\n" and "\\r" inside quoted values
+    become "\\n", the same is done here to keep the output identical.
+    """
+    if pa.compute.any(pa.compute.match_substring(column, "\r")).as_py():
+        return pa.compute.replace_substring_regex(column, "\r\n?", "\n")
+    return column
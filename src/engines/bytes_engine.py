@@ -0,0 +1,259 @@
+"""
+Bytes-native anonymization engine. Records are split on the delimiter as bytes, only the anonymized values
+are hashed from their raw bytes and all other values are copied to the output without being decoded.
+Records containing the enclosure or a carriage return are parsed and written by the csv module reading the lines
+the way the csv engine does, so the output is byte-identical to the csv engine for UTF-8 input, malformed records
+included. Such records are limited to MAX_RECORD_SIZE characters, so that an unclosed enclosure raises an error
+instead of buffering the rest of the file.
+"""
+import csv
+import io
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from csv_tools import open_table_file, OutputSlicing, SlicedTableWriter
+
+# number of output lines joined into a single write
+WRITE_BATCH_SIZE = 10000
+# longest record parsed by the csv module, so that a stray enclosure does not buffer the rest of the file
+MAX_RECORD_SIZE = 128 * 1024 * 1024
+ENCODING = "utf-8"
+
+Row = Union[List[bytes], List[str]]
+
+
+def anonymize_columns_bytes(table_path: str,
+                            out_table_path: str,
+                            table_columns: List[str],
+                            anonymize: Callable[[str], str],
+                            anonymize_bytes: Callable[[bytes], bytes],
+                            columns_to_anonymize: List[str],
+                            delimiter: str,
+                            enclosure: str,
+                            table_has_headers: bool,
+                            write_columns_to_manifest: bool,
+                            compression_level: int,
+                            byte_range: Optional[Tuple[int, int]] = None,
+                            output_slicing: Optional[OutputSlicing] = None,
+                            output_columns: Optional[List[str]] = None,
+                            prefetch: Optional[Callable[[List[Union[str, bytes]]], None]] = None) -> int:
+    """
+    Anonymizes the columns of a single csv file without decoding the values that are not anonymized.
+    Args:
+        table_path: Path of the input csv (or csv.gz) file.
+        out_table_path: Path of the output csv (or csv.gz) file.
+        table_columns: Names of all columns of the table.
+        anonymize: Salted encoder of the anonymizer, used for records parsed by the csv module.
+        anonymize_bytes: Salted bytes encoder of the anonymizer.
+        columns_to_anonymize: Names of the columns to anonymize.
+        delimiter: CSV delimiter.
+        enclosure: CSV enclosure (quote character).
+        table_has_headers: The first record of the file is the header.
+        write_columns_to_manifest: The header is stored in the manifest, so it is not written to the output.
+        compression_level: gzip compression level of a .gz output file.
+        byte_range: Process only the (start, end) byte range of an uncompressed input file.
+        output_slicing: Write the output as slices of the out_table_path folder.
+        output_columns: Names of the columns written to the output, in the table order. None writes all columns.
+        prefetch: Called with the values of every batch of rows before they are anonymized.
+
+    Returns:
+        Number of data rows written, the header is not counted.
+    """
+    if output_slicing:
+        with open_table_file(table_path, "rb", byte_range=byte_range) as in_file, \
+                SlicedTableWriter(out_table_path, output_slicing, compression_level) as writer:
+            row_count = 0
+            for rows, data_rows in iter_row_batches(in_file, table_columns, anonymize, anonymize_bytes,
+                                                    columns_to_anonymize, delimiter, enclosure, table_has_headers,
+                                                    write_columns_to_manifest, output_columns, prefetch=prefetch):
+                writer.write_rows(rows)
+                row_count += data_rows
+        return row_count
+
+    with open_table_file(table_path, "rb", byte_range=byte_range) as in_file, \
+            open_table_file(out_table_path, "wb", compression_level=compression_level) as out_file:
+        row_count = 0
+        for data, rows in iter_output_batches(in_file, table_columns, anonymize, anonymize_bytes, columns_to_anonymize,
+                                              delimiter, enclosure, table_has_headers, write_columns_to_manifest,
+                                              output_columns, prefetch=prefetch):
+            out_file.write(data)
+            row_count += rows
+        # the text mode writer of the csv engine flushes on close, which matters for gzip output bytes
+        out_file.flush()
+    return row_count
+
+
+def iter_output_batches(lines: Iterable[bytes],
+                        table_columns: List[str],
+                        anonymize: Callable[[str], str],
+                        anonymize_bytes: Callable[[bytes], bytes],
+                        columns_to_anonymize: List[str],
+                        delimiter: str,
+                        enclosure: str,
+                        table_has_headers: bool,
+                        write_columns_to_manifest: bool,
+                        output_columns: Optional[List[str]] = None,
+                        batch_size: int = WRITE_BATCH_SIZE,
+                        prefetch: Optional[Callable[[List[Union[str, bytes]]], None]] = None
+                        ) -> Iterator[Tuple[bytes, int]]:
+    """
+    Anonymizes the lines of a csv file and yields the output in batches of up to batch_size rows,
+    as (serialized rows, number of data rows) tuples. The header is yielded with zero rows.
+    Only the output_columns are written, all columns when it is None. The values to anonymize of every batch
+    are passed to prefetch first, if it is given.
+    """
+    for rows, data_rows in iter_row_batches(lines, table_columns, anonymize, anonymize_bytes, columns_to_anonymize,
+                                            delimiter, enclosure, table_has_headers, write_columns_to_manifest,
+                                            output_columns, batch_size, prefetch):
+        yield b"".join(rows), data_rows
+
+
+def iter_row_batches(lines: Iterable[bytes],
+                     table_columns: List[str],
+                     anonymize: Callable[[str], str],
+                     anonymize_bytes: Callable[[bytes], bytes],
+                     columns_to_anonymize: List[str],
+                     delimiter: str,
+                     enclosure: str,
+                     table_has_headers: bool,
+                     write_columns_to_manifest: bool,
+                     output_columns: Optional[List[str]] = None,
+                     batch_size: int = WRITE_BATCH_SIZE,
+                     prefetch: Optional[Callable[[List[Union[str, bytes]]], None]] = None
+                     ) -> Iterator[Tuple[List[bytes], int]]:
+    """
+    Like iter_output_batches, with every row of a batch serialized separately.
+    """
+    column_indexes = [table_columns.index(column) for column in columns_to_anonymize]
+    column_count = len(table_columns)
+    output_indexes = None
+    if output_columns is not None:
+        output_indexes = [table_columns.index(column) for column in output_columns]
+    delimiter_bytes = delimiter.encode(ENCODING)
+    enclosure = enclosure or '"'
+    text_buffer = io.StringIO()
+    text_writer = csv.writer(text_buffer, delimiter=delimiter, quotechar=enclosure)
+
+    def serialize_text_row(text_row: List[str]) -> bytes:
+        text_writer.writerow(text_row)
+        line = text_buffer.getvalue().encode(ENCODING)
+        text_buffer.seek(0)
+        text_buffer.truncate()
+        return line
+
+    rows = _iter_rows(lines, delimiter, enclosure)
+    row_number = 0
+    if table_has_headers:
+        header = next(rows, None)
+        row_number += 1
+        if header is not None and not write_columns_to_manifest:
+            header = [value.decode(ENCODING) if isinstance(value, bytes) else value for value in header]
+            header = _fit_row(header, column_count, row_number, "")
+            if output_indexes is not None:
+                header = [header[index] for index in output_indexes]
+            yield [serialize_text_row(header)], 0
+
+    def serialize_batch(batch: List[Row]) -> List[bytes]:
+        if prefetch and column_indexes:
+            prefetch([row[index] for row in batch for index in column_indexes])
+        lines = []
+        for row in batch:
+            if isinstance(row[0], bytes):
+                for index in column_indexes:
+                    row[index] = anonymize_bytes(row[index])
+                if output_indexes is not None:
+                    row = [row[index] for index in output_indexes]
+                    # csv.writer encloses the empty value of a single column row, so that it is not a blank line
+                    if row == [b""]:
+                        row = [enclosure.encode(ENCODING) * 2]
+                lines.append(delimiter_bytes.join(row) + b"\r\n")
+            else:
+                for index in column_indexes:
+                    row[index] = anonymize(row[index])
+                if output_indexes is not None:
+                    row = [row[index] for index in output_indexes]
+                lines.append(serialize_text_row(row))
+        return lines
+
+    batch = []
+    for row in rows:
+        row_number += 1
+        if len(row) != column_count:
+            row = _fit_row(row, column_count, row_number, b"" if isinstance(row[0], bytes) else "")
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield serialize_batch(batch), len(batch)
+            batch = []
+    if batch:
+        yield serialize_batch(batch), len(batch)
+
+
+def _iter_rows(lines: Iterable[bytes], delimiter: str, enclosure: str) -> Iterator[Row]:
+    """
+    Yields the rows of the file, as lists of bytes for plain records and as lists of str for records
+    which need the csv module. A line containing the enclosure or a carriage return starts a record parsed by
+    the csv module, which takes as many following lines as the record needs, exactly like the csv engine does.
+    Blank lines are skipped like csv.DictReader skips them.
+    """
+    delimiter_bytes = delimiter.encode(ENCODING)
+    enclosure_bytes = enclosure.encode(ENCODING)
+    max_record_size = min(csv.field_size_limit(), MAX_RECORD_SIZE)
+    lines = iter(lines)
+    # text lines of the last line read for the csv module, not parsed yet
+    pending: List[str] = []
+    record_size = 0
+
+    def text_lines() -> Iterator[str]:
+        nonlocal record_size
+        while True:
+            if not pending:
+                line = next(lines, None)
+                if line is None:
+                    return
+                pending.extend(_split_text_lines(line))
+            text_line = pending.pop(0)
+            record_size += len(text_line)
+            if record_size > max_record_size:
+                raise ValueError(f"A record is longer than {max_record_size} characters, "
+                                 f"the file probably contains an unclosed enclosure ({enclosure})")
+            yield text_line
+
+    text_reader = csv.reader(text_lines(), delimiter=delimiter, quotechar=enclosure)
+    for line in lines:
+        if line.endswith(b"\r\n"):
+            content = line[:-2]
+        elif line.endswith(b"\n"):
+            content = line[:-1]
+        else:
+            content = line
+        if enclosure_bytes not in content and b"\r" not in content:
+            if content:
+                yield content.split(delimiter_bytes)
+            continue
+
+        pending.extend(_split_text_lines(line))
+        # the csv module parses records until the text lines of the line are used up
+        while pending:
+            record_size = 0
+            row = next(text_reader, None)
+            if row:
+                yield row
+
+
+def _split_text_lines(line: bytes) -> List[str]:
+    """
+    Decodes the line and splits it with universal newlines, the way the csv engine reads the file in text mode.
+    """
+    text = line.decode(ENCODING).replace("\r\n", "\n").replace("\r", "\n")
+    text_lines = [text_line + "\n" for text_line in text.split("\n")]
+    # the newline added to the last part, which is empty for a line ending with a newline
+    text_lines[-1] = text_lines[-1][:-1]
+    return [text_line for text_line in text_lines if text_line]
+
+
+def _fit_row(row: Row, column_count: int, row_number: int, empty_value) -> Row:
+    """
+    Pads short rows with empty values, rows with more values than columns are invalid.
+    """
+    if len(row) > column_count:
+        raise ValueError(f"Row {row_number} contains {len(row)} values, but the table has {column_count} columns")
+    return row + [empty_value] * (column_count - len(row))
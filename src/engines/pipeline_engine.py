@@ -0,0 +1,238 @@
+"""
+Pipelined anonymization engine. A reader thread reads large blocks of the input file, the calling thread parses
+and anonymizes them with the bytes engine and a writer thread writes large output buffers. The stages are
+connected by bounded queues, so reads, (de)compression and writes overlap with hashing and at most
+queue_size blocks and buffers are held in memory.
+"""
+import io
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Tuple, Union
+
+from csv_tools import open_table_file
+from .bytes_engine import iter_output_batches
+
+DEFAULT_READ_BUFFER_SIZE = 4 * 1024 * 1024
+DEFAULT_WRITE_BUFFER_SIZE = 4 * 1024 * 1024
+DEFAULT_QUEUE_SIZE = 4
+# how often a blocked stage checks whether another stage has failed
+POLL_INTERVAL = 0.1
+
+_END = None
+
+
+class PipelineSettings:
+    def __init__(self, read_buffer_size: int = DEFAULT_READ_BUFFER_SIZE,
+                 write_buffer_size: int = DEFAULT_WRITE_BUFFER_SIZE, queue_size: int = DEFAULT_QUEUE_SIZE) -> None:
+        self.read_buffer_size = read_buffer_size
+        self.write_buffer_size = write_buffer_size
+        self.queue_size = queue_size
+
+
+class PipelineStats:
+    """
+    Seconds each stage spent waiting on the queues. A stage waiting for input is starved by the previous stage,
+    a stage waiting for free space is blocked by the next one.
+    """
+
+    def __init__(self, reader_blocked: float = 0.0, compute_starved: float = 0.0, compute_blocked: float = 0.0,
+                 writer_starved: float = 0.0) -> None:
+        self.reader_blocked = reader_blocked
+        self.compute_starved = compute_starved
+        self.compute_blocked = compute_blocked
+        self.writer_starved = writer_starved
+
+    @property
+    def bottleneck(self) -> str:
+        """
+        The slowest stage: the reader when the compute stage waits for blocks, the writer when it waits
+        for free output buffers, otherwise the compute stage which keeps the reader waiting.
+        """
+        waits = {"read": self.compute_starved, "write": self.compute_blocked, "compute": self.reader_blocked}
+        return max(waits, key=waits.get)
+
+    def merge(self, other: "PipelineStats") -> None:
+        self.reader_blocked += other.reader_blocked
+        self.compute_starved += other.compute_starved
+        self.compute_blocked += other.compute_blocked
+        self.writer_starved += other.writer_starved
+
+    def to_dict(self) -> Dict[str, float]:
+        return dict(self.__dict__)
+
+    def __str__(self) -> str:
+        return (f"queue waits: reader blocked {self.reader_blocked:.3f}s, compute starved {self.compute_starved:.3f}s, "
+                f"compute blocked {self.compute_blocked:.3f}s, writer starved {self.writer_starved:.3f}s, "
+                f"bottleneck {self.bottleneck}")
+
+
+class _PipelineFailed(Exception):
+    """
+    Stops a stage after another stage has failed, the error of the failed stage is raised instead.
+    """
+
+
+class _Stage(threading.Thread):
+    """
+    Runs one stage of the pipeline in a thread and keeps its exception for the calling thread.
+    """
+
+    def __init__(self, target: Callable[[], None], failed: threading.Event) -> None:
+        super().__init__(daemon=True)
+        self.target = target
+        self.failed = failed
+        self.error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        try:
+            self.target()
+        except BaseException as exc:
+            self.error = exc
+            self.failed.set()
+
+
+def anonymize_columns_pipelined(table_path: str,
+                                out_table_path: str,
+                                table_columns: List[str],
+                                anonymize: Callable[[str], str],
+                                anonymize_bytes: Callable[[bytes], bytes],
+                                columns_to_anonymize: List[str],
+                                delimiter: str,
+                                enclosure: str,
+                                table_has_headers: bool,
+                                write_columns_to_manifest: bool,
+                                compression_level: int,
+                                byte_range: Optional[Tuple[int, int]] = None,
+                                settings: Optional[PipelineSettings] = None,
+                                stats: Optional[PipelineStats] = None,
+                                output_columns: Optional[List[str]] = None,
+                                prefetch: Optional[Callable[[List[Union[str, bytes]]], None]] = None) -> int:
+    """
+    Anonymizes the columns of a single csv file like anonymize_columns_bytes, with reads and writes running
+    in their own threads. The queue waits are added to stats if it is given. Only the output_columns
+    are written, all columns when it is None. The values of every batch of rows are passed to prefetch
+    before they are anonymized, if it is given.
+
+    Returns:
+        Number of data rows written, the header is not counted.
+    """
+    settings = settings or PipelineSettings()
+    stats = stats if stats is not None else PipelineStats()
+    blocks = queue.Queue(maxsize=settings.queue_size)
+    buffers = queue.Queue(maxsize=settings.queue_size)
+    failed = threading.Event()
+
+    with open_table_file(table_path, "rb", byte_range=byte_range) as in_file, \
+            open_table_file(out_table_path, "wb", compression_level=compression_level) as out_file:
+        waits = {}
+        reader = _Stage(lambda: _read_blocks(in_file, settings.read_buffer_size, blocks, failed, waits), failed)
+        writer = _Stage(lambda: _write_buffers(out_file, buffers, failed, waits), failed)
+        reader.start()
+        writer.start()
+        row_count = 0
+        try:
+            lines = _iter_block_lines(blocks, failed, waits)
+            pending, pending_size = [], 0
+            for data, rows in iter_output_batches(lines, table_columns, anonymize, anonymize_bytes,
+                                                  columns_to_anonymize, delimiter, enclosure, table_has_headers,
+                                                  write_columns_to_manifest, output_columns, prefetch=prefetch):
+                pending.append(data)
+                pending_size += len(data)
+                row_count += rows
+                if pending_size >= settings.write_buffer_size:
+                    _put(buffers, b"".join(pending), failed, waits, "compute_blocked")
+                    pending, pending_size = [], 0
+            if pending:
+                _put(buffers, b"".join(pending), failed, waits, "compute_blocked")
+            _put(buffers, _END, failed, waits, "compute_blocked")
+        except _PipelineFailed:
+            # the error of the failed stage is raised below
+            pass
+        except BaseException:
+            failed.set()
+            raise
+        finally:
+            reader.join()
+            writer.join()
+            stats.merge(PipelineStats(**waits))
+        for stage in (reader, writer):
+            if stage.error is not None:
+                raise stage.error
+        # the text mode writer of the csv engine flushes on close, which matters for gzip output bytes
+        out_file.flush()
+    return row_count
+
+
+def _put(target: queue.Queue, item: Any, failed: threading.Event, waits: Dict[str, float], wait_key: str) -> None:
+    start = time.perf_counter()
+    try:
+        while True:
+            if failed.is_set():
+                raise _PipelineFailed()
+            try:
+                target.put(item, timeout=POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+    finally:
+        waits[wait_key] = waits.get(wait_key, 0.0) + time.perf_counter() - start
+
+
+def _get(source: queue.Queue, failed: threading.Event, waits: Dict[str, float], wait_key: str) -> Any:
+    start = time.perf_counter()
+    try:
+        while True:
+            if failed.is_set():
+                raise _PipelineFailed()
+            try:
+                return source.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+    finally:
+        waits[wait_key] = waits.get(wait_key, 0.0) + time.perf_counter() - start
+
+
+def _read_blocks(in_file: IO[bytes], block_size: int, blocks: queue.Queue, failed: threading.Event,
+                 waits: Dict[str, float]) -> None:
+    """
+    Reads the file in blocks ending at a line end, so that no line is split between two blocks.
+    """
+    remainder = b""
+    try:
+        while True:
+            block = in_file.read(block_size)
+            if not block:
+                break
+            if remainder:
+                block = remainder + block
+            cut = block.rfind(b"\n") + 1
+            remainder = block[cut:]
+            if cut:
+                _put(blocks, block[:cut], failed, waits, "reader_blocked")
+        if remainder:
+            _put(blocks, remainder, failed, waits, "reader_blocked")
+        _put(blocks, _END, failed, waits, "reader_blocked")
+    except _PipelineFailed:
+        return
+
+
+def _iter_block_lines(blocks: queue.Queue, failed: threading.Event, waits: Dict[str, float]) -> Iterator[bytes]:
+    while True:
+        block = _get(blocks, failed, waits, "compute_starved")
+        if block is _END:
+            return
+        # BytesIO splits the lines on \n only, the same way the binary file object does
+        yield from io.BytesIO(block)
+
+
+def _write_buffers(out_file: IO[bytes], buffers: queue.Queue, failed: threading.Event,
+                   waits: Dict[str, float]) -> None:
+    try:
+        while True:
+            data = _get(buffers, failed, waits, "writer_starved")
+            if data is _END:
+                return
+            out_file.write(data)
+    except _PipelineFailed:
+        return
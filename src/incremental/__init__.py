@@ -0,0 +1 @@
+from .slice_state import SliceState, IncrementalStateException, config_fingerprint, FINGERPRINT_MODES  # noqa
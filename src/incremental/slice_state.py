@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List
+
+# size and modification time of the slice, or a checksum of its content
+FINGERPRINT_STAT = "stat"
+FINGERPRINT_CHECKSUM = "checksum"
+FINGERPRINT_MODES = [FINGERPRINT_STAT, FINGERPRINT_CHECKSUM]
+
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+
+
+class IncrementalStateException(Exception):
+    pass
+
+
+def config_fingerprint(**settings: Any) -> str:
+    """
+    Returns a digest of the settings that change the output of a slice, e.g. method, salt and columns.
+    Only the digest is stored in the state, so the salt does not leak into it.
+    """
+    serialized = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class SliceState:
+    """
+    Fingerprints of the slices of sliced tables anonymized by previous runs, stored in the component state.
+
+    The state of a table is {"config": <config fingerprint>, "slices": {<slice name>: <slice fingerprint>}},
+    a different config fingerprint invalidates all slices of the table.
+    """
+
+    def __init__(self, state: Dict[str, Any], mode: str = FINGERPRINT_CHECKSUM) -> None:
+        if mode not in FINGERPRINT_MODES:
+            raise IncrementalStateException(f"Fingerprint mode must be one of {FINGERPRINT_MODES}, not '{mode}'")
+        self.mode = mode
+        self.previous_state = state or {}
+        self.state: Dict[str, Any] = {}
+
+    def get_changed_slices(self, table_name: str, config: str, slice_paths: Dict[str, str]) -> List[str]:
+        """
+        Records the fingerprints of the current slices of the table and returns names of the slices which are new
+        or changed since the previous run. Slices missing in the input are dropped from the state.
+        Args:
+            table_name: Name of the sliced table.
+            config: Fingerprint of the settings the table is anonymized with.
+            slice_paths: Paths of the input slices keyed by slice name.
+        """
+        previous = self.previous_state.get(table_name, {})
+        previous_slices = previous.get("slices", {}) if previous.get("config") == config else {}
+
+        slices = {name: self.fingerprint(slice_paths[name]) for name in sorted(slice_paths)}
+        self.state[table_name] = {"config": config, "slices": slices}
+        return [name for name, fingerprint in slices.items() if previous_slices.get(name) != fingerprint]
+
+    def get_removed_slices(self, table_name: str, config: str, slice_paths: Dict[str, str]) -> List[str]:
+        """
+        Returns names of the slices recorded by the previous run with the same config which are missing in the input.
+        """
+        previous = self.previous_state.get(table_name, {})
+        if previous.get("config") != config:
+            return []
+        return sorted(name for name in previous.get("slices", {}) if name not in slice_paths)
+
+    def fingerprint(self, path: str) -> str:
+        if self.mode == FINGERPRINT_STAT:
+            stat = os.stat(path)
+            return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+        checksum = hashlib.blake2b(digest_size=20)
+        with open(path, "rb") as slice_file:
+            for chunk in iter(lambda: slice_file.read(CHECKSUM_CHUNK_SIZE), b""):
+                checksum.update(chunk)
+        return f"{os.path.getsize(path)}:{checksum.hexdigest()}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the state to store, tables not anonymized in this run keep their previous state.
+        """
+        return {**self.previous_state, **self.state}
@@ -0,0 +1 @@
+from .performance_report import PerformanceReport, StageMetrics, measure, profile_call  # noqa
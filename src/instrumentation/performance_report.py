@@ -0,0 +1,125 @@
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+class StageMetrics:
+    """
+    Counters and times of one stage (e.g. anonymize_columns) run for one table or slice.
+    """
+
+    def __init__(self, table: str = "", stage: str = "", file: str = "", rows: int = 0, cells: int = 0,
+                 bytes_in: int = 0, bytes_out: int = 0, wall_time: float = 0.0, cpu_time: float = 0.0,
+                 queue_wait: Optional[Dict[str, float]] = None) -> None:
+        self.table = table
+        self.stage = stage
+        self.file = file
+        self.rows = rows
+        self.cells = cells
+        self.bytes_in = bytes_in
+        self.bytes_out = bytes_out
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+        # seconds the stages of a pipelined engine waited on their queues
+        self.queue_wait = queue_wait or {}
+
+    def merge(self, other: "StageMetrics", times: bool = True) -> None:
+        self.rows += other.rows
+        self.cells += other.cells
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+        if times:
+            self.wall_time += other.wall_time
+            self.cpu_time += other.cpu_time
+            for name, seconds in other.queue_wait.items():
+                self.queue_wait[name] = self.queue_wait.get(name, 0.0) + seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        metrics = dict(self.__dict__)
+        metrics["queue_wait"] = dict(self.queue_wait)
+        return metrics
+
+    def __str__(self) -> str:
+        rows_per_second = self.rows / self.wall_time if self.wall_time else 0
+        text = (f"{self.wall_time:.3f}s wall, {self.cpu_time:.3f}s CPU, {self.rows} rows ({rows_per_second:,.0f}/s), "
+                f"{self.cells} cells hashed, {self.bytes_in} bytes in, {self.bytes_out} bytes out")
+        if self.queue_wait:
+            waits = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.queue_wait.items())
+            text = f"{text}, queue waits: {waits}"
+        return text
+
+
+@contextmanager
+def measure(metrics: StageMetrics) -> Iterator[StageMetrics]:
+    """
+    Adds the wall and CPU time of the block to the metrics, CPU time is the time of the current process.
+    """
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield metrics
+    finally:
+        metrics.wall_time += time.perf_counter() - wall_start
+        metrics.cpu_time += time.process_time() - cpu_start
+
+
+def profile_call(profile_path: Optional[str], function: Callable, *args, **kwargs) -> Any:
+    """
+    Calls the function, under cProfile with the stats dumped to profile_path if it is set.
+    """
+    if not profile_path:
+        return function(*args, **kwargs)
+    import cProfile
+
+    os.makedirs(os.path.dirname(profile_path) or ".", exist_ok=True)
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function, *args, **kwargs)
+    finally:
+        profiler.dump_stats(profile_path)
+
+
+class PerformanceReport:
+    """
+    Collects StageMetrics of the run, logs a summary per stage and writes them as a JSON report.
+    """
+
+    def __init__(self) -> None:
+        self.records: List[StageMetrics] = []
+
+    @contextmanager
+    def stage(self, table: str, stage: str) -> Iterator[StageMetrics]:
+        metrics = StageMetrics(table, stage)
+        with measure(metrics):
+            yield metrics
+        self.records.append(metrics)
+
+    def add(self, metrics: StageMetrics) -> None:
+        self.records.append(metrics)
+
+    def add_counters(self, metrics: StageMetrics, stage: str) -> None:
+        """
+        Adds rows, cells and bytes of the records of the given stage of the same table to the metrics.
+        """
+        for record in self.records:
+            if record.stage == stage and record.table == metrics.table:
+                metrics.merge(record, times=False)
+
+    def summary(self) -> Dict[str, StageMetrics]:
+        stages = {}
+        for record in self.records:
+            stages.setdefault(record.stage, StageMetrics(stage=record.stage)).merge(record)
+        return stages
+
+    def log_summary(self) -> None:
+        for stage, metrics in self.summary().items():
+            logging.info(f"Stage {stage}: {metrics}")
+
+    def write(self, report_path: str) -> None:
+        report = {"stages": {stage: metrics.to_dict() for stage, metrics in self.summary().items()},
+                  "records": [record.to_dict() for record in self.records]}
+        os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+        with open(report_path, "w") as report_file:
+            json.dump(report, report_file, indent=2)
@@ -0,0 +1 @@
+from .passthrough import Passthrough, PassthroughException, PassthroughStats, PASSTHROUGH_MODES  # noqa
@@ -0,0 +1,136 @@
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Callable, Dict, List
+
+STRATEGY_HARDLINK = "hardlink"
+STRATEGY_RENAME = "rename"
+STRATEGY_COPY_FILE_RANGE = "copy_file_range"
+STRATEGY_COPY = "copy"
+
+# strategies are tried in order until one succeeds, the last one is never skipped
+PASSTHROUGH_MODES = {
+    "link": [STRATEGY_HARDLINK, STRATEGY_COPY_FILE_RANGE, STRATEGY_COPY],
+    "move": [STRATEGY_RENAME, STRATEGY_COPY_FILE_RANGE, STRATEGY_COPY],
+    "copy": [STRATEGY_COPY]
+}
+
+
+class PassthroughException(Exception):
+    pass
+
+
+class PassthroughStats:
+    def __init__(self) -> None:
+        self.files = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def add(self, size: int, seconds: float) -> None:
+        self.files += 1
+        self.bytes += size
+        self.seconds += seconds
+
+    def __str__(self) -> str:
+        return f"{self.files} files, {self.bytes} bytes in {self.seconds:.3f}s"
+
+
+def _hardlink(source: str, destination: str) -> None:
+    os.link(source, destination)
+
+
+def _rename(source: str, destination: str) -> None:
+    os.rename(source, destination)
+
+
+def _copy_file_range(source: str, destination: str) -> None:
+    """
+    Copies the file inside the kernel, filesystems supporting it (e.g. btrfs, XFS) create a reflink.
+    """
+    if not hasattr(os, "copy_file_range"):
+        raise OSError("copy_file_range is not supported on this platform")
+    try:
+        with open(source, "rb") as in_file, open(destination, "wb") as out_file:
+            while os.copy_file_range(in_file.fileno(), out_file.fileno(), 1024 * 1024 * 1024):
+                pass
+        shutil.copymode(source, destination)
+    except OSError:
+        if os.path.exists(destination):
+            os.remove(destination)
+        raise
+
+
+def _copy(source: str, destination: str) -> None:
+    shutil.copy(source, destination)
+
+
+STRATEGY_FUNCTIONS: Dict[str, Callable[[str, str], None]] = {
+    STRATEGY_HARDLINK: _hardlink,
+    STRATEGY_RENAME: _rename,
+    STRATEGY_COPY_FILE_RANGE: _copy_file_range,
+    STRATEGY_COPY: _copy
+}
+
+
+class Passthrough:
+    """
+    Moves files and folders that need no anonymization to the output with the cheapest strategy available.
+    Modes:
+        link: hardlink, falls back to copy_file_range and copy, the input stays untouched.
+        move: rename, falls back to copy_file_range and copy, the input file is removed.
+        copy: plain copy.
+    """
+
+    def __init__(self, mode: str = "copy") -> None:
+        if mode not in PASSTHROUGH_MODES:
+            raise PassthroughException(f"{mode} passthrough mode is not supported, "
+                                       f"use one of {list(PASSTHROUGH_MODES)}")
+        self.strategies: List[str] = PASSTHROUGH_MODES[mode]
+        self.stats: Dict[str, PassthroughStats] = {}
+        # tables may be passed through from several threads
+        self._stats_lock = threading.Lock()
+
+    def transfer(self, source: str, destination: str) -> int:
+        """
+        Transfers a file, or all files of a folder recursively, to the destination path.
+        Args:
+            source: Path of the input file or folder.
+            destination: Path of the output file or folder, existing files are replaced.
+
+        Returns:
+            Number of bytes transferred.
+        """
+        if not os.path.isdir(source):
+            return self._transfer_file(source, destination)
+
+        transferred = 0
+        for root, _, files in os.walk(source):
+            out_root = os.path.join(destination, os.path.relpath(root, source))
+            os.makedirs(out_root, exist_ok=True)
+            for file_name in files:
+                transferred += self._transfer_file(os.path.join(root, file_name), os.path.join(out_root, file_name))
+        return transferred
+
+    def _transfer_file(self, source: str, destination: str) -> int:
+        size = os.path.getsize(source)
+        if os.path.lexists(destination):
+            os.remove(destination)
+
+        for strategy in self.strategies:
+            start = time.perf_counter()
+            try:
+                STRATEGY_FUNCTIONS[strategy](source, destination)
+            except OSError as exc:
+                if strategy == self.strategies[-1]:
+                    raise
+                logging.debug(f"Passthrough strategy {strategy} failed for {source}: {exc}")
+                continue
+            with self._stats_lock:
+                self.stats.setdefault(strategy, PassthroughStats()).add(size, time.perf_counter() - start)
+            return size
+
+    def log_summary(self) -> None:
+        for strategy, stats in self.stats.items():
+            logging.info(f"Passthrough using {strategy}: {stats}")
@@ -0,0 +1 @@
+from .pattern_matcher import PatternMatcher  # noqa
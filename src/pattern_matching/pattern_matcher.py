@@ -0,0 +1,37 @@
+import fnmatch
+import re
+from typing import Iterable, List
+
+WILDCARD_CHARACTERS = "*?["
+
+
+class PatternMatcher:
+    """
+    Matches names against many fnmatch patterns at once. Patterns without wildcards are looked up in a set,
+    wildcard patterns are compiled into one combined regex, so names matching no pattern are rejected in one call.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns = list(dict.fromkeys(patterns))
+        self._positions = {pattern: position for position, pattern in enumerate(self.patterns)}
+        self._exact_patterns = set()
+        self._wildcard_patterns = []
+        for pattern in self.patterns:
+            if any(character in pattern for character in WILDCARD_CHARACTERS):
+                self._wildcard_patterns.append((pattern, re.compile(fnmatch.translate(pattern))))
+            else:
+                self._exact_patterns.add(pattern)
+        self._combined = None
+        if self._wildcard_patterns:
+            self._combined = re.compile("|".join(fnmatch.translate(pattern) for pattern, _ in self._wildcard_patterns))
+
+    def match(self, name: str) -> List[str]:
+        """
+        Returns all patterns matching the name, in the order they were defined.
+        """
+        matches = set()
+        if name in self._exact_patterns:
+            matches.add(name)
+        if self._combined and self._combined.match(name):
+            matches.update(pattern for pattern, regex in self._wildcard_patterns if regex.match(name))
+        return sorted(matches, key=self._positions.get)
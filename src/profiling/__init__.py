@@ -0,0 +1,2 @@
+from .table_profiler import ColumnProfile, TableProfile, sample_table, measure_hash_throughput, estimate_seconds, \
+    recommend_settings, DEFAULT_SAMPLE_ROWS  # noqa
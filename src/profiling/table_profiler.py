@@ -0,0 +1,225 @@
+import csv
+import gzip
+import math
+import os
+import time
+from typing import Any, Callable, Dict, IO, Iterator, List
+
+from csv_tools import is_gzip_file
+
+DEFAULT_SAMPLE_ROWS = 10000
+# minimum time the hash throughput is measured for
+MIN_BENCHMARK_TIME = 0.2
+# columns with at most this ratio of distinct values in the sample are worth caching
+CACHE_DISTINCT_RATIO = 0.5
+MAX_RECOMMENDED_CACHE_MB = 1024
+# runs estimated to be shorter are not worth starting worker processes for
+MIN_PARALLEL_SECONDS = 10
+# single uncompressed files larger than this are recommended to be anonymized in chunks
+LARGE_FILE_SIZE = 256 * 1024 * 1024
+MIN_CHUNK_SIZE_MB = 64
+
+
+class ColumnProfile:
+    def __init__(self, name: str, distinct_values: int = 0, sampled_values: int = 0,
+                 average_length: float = 0.0) -> None:
+        self.name = name
+        self.distinct_values = distinct_values
+        self.sampled_values = sampled_values
+        self.average_length = average_length
+
+    @property
+    def distinct_ratio(self) -> float:
+        return self.distinct_values / self.sampled_values if self.sampled_values else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "distinct_values": self.distinct_values, "distinct_ratio": self.distinct_ratio,
+                "average_length": self.average_length}
+
+
+class TableProfile:
+    """
+    Sample of the first rows of a table and the size estimates of the whole table extrapolated from it.
+    """
+
+    def __init__(self, table: str, files: int, size: int) -> None:
+        self.table = table
+        self.files = files
+        self.size = size
+        self.sampled_rows = 0
+        self.sampled_bytes = 0
+        # bytes of the input files (compressed for gzip files) the sample was read from
+        self.consumed_bytes = 0
+        self.parse_time = 0.0
+        self.exact = False
+        self.columns: List[ColumnProfile] = []
+        self.values: List[str] = []
+
+    @property
+    def estimated_rows(self) -> int:
+        if self.exact or not self.consumed_bytes:
+            return self.sampled_rows
+        return int(self.sampled_rows * self.size / self.consumed_bytes)
+
+    @property
+    def estimated_bytes(self) -> int:
+        """
+        Estimated uncompressed size of the table.
+        """
+        if self.exact or not self.consumed_bytes:
+            return self.sampled_bytes
+        return int(self.sampled_bytes * self.size / self.consumed_bytes)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.sampled_rows / self.parse_time if self.parse_time else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"table": self.table, "files": self.files, "size": self.size, "sampled_rows": self.sampled_rows,
+                "exact": self.exact, "estimated_rows": self.estimated_rows, "estimated_bytes": self.estimated_bytes,
+                "columns": [column.to_dict() for column in self.columns]}
+
+
+def sample_table(table_name: str,
+                 file_paths: List[str],
+                 table_columns: List[str],
+                 columns_to_anonymize: List[str],
+                 delimiter: str,
+                 enclosure: str,
+                 table_has_headers: bool,
+                 sample_rows: int = DEFAULT_SAMPLE_ROWS) -> TableProfile:
+    """
+    Reads up to sample_rows rows from the files of the table in order and profiles the columns to anonymize.
+    Args:
+        table_name: Name of the table.
+        file_paths: Paths of the table file or of the slices of a sliced table, csv or csv.gz.
+        table_columns: Names of all columns of the table.
+        columns_to_anonymize: Names of the profiled columns.
+        delimiter: CSV delimiter.
+        enclosure: CSV enclosure.
+        table_has_headers: Every file starts with a header.
+        sample_rows: Maximum number of sampled data rows.
+
+    Returns:
+        TableProfile with the sampled values of the columns to anonymize.
+    """
+    profile = TableProfile(table_name, len(file_paths), sum(os.path.getsize(path) for path in file_paths))
+    column_indexes = [table_columns.index(column) for column in columns_to_anonymize]
+    column_values = [[] for _ in column_indexes]
+    start = time.perf_counter()
+    profile.exact = True
+    for file_path in file_paths:
+        if profile.sampled_rows >= sample_rows:
+            profile.exact = False
+            break
+        with open(file_path, "rb") as raw_file:
+            stream = gzip.GzipFile(fileobj=raw_file) if is_gzip_file(file_path) else raw_file
+            read_bytes = [0]
+            reader = filter(None, csv.reader(_iter_text_lines(stream, read_bytes), delimiter=delimiter,
+                                             quotechar=enclosure or '"'))
+            if table_has_headers:
+                next(reader, None)
+            for row in reader:
+                profile.sampled_rows += 1
+                for values, index in zip(column_values, column_indexes):
+                    values.append(row[index] if index < len(row) else "")
+                if profile.sampled_rows >= sample_rows:
+                    break
+            # the sample may end inside the file, then the sampled part is extrapolated
+            if profile.sampled_rows >= sample_rows and next(reader, None) is not None:
+                profile.exact = False
+                # the position in a gzip file includes the read ahead of the decompressor, so it is approximate
+                profile.consumed_bytes += raw_file.tell() if stream is not raw_file else read_bytes[0]
+            else:
+                profile.consumed_bytes += os.path.getsize(file_path)
+            profile.sampled_bytes += read_bytes[0]
+    profile.parse_time = time.perf_counter() - start
+
+    for column, values in zip(columns_to_anonymize, column_values):
+        average_length = sum(map(len, values)) / len(values) if values else 0.0
+        profile.columns.append(ColumnProfile(column, len(set(values)), len(values), average_length))
+        profile.values.extend(values)
+    return profile
+
+
+def _iter_text_lines(stream: IO[bytes], read_bytes: List[int]) -> Iterator[str]:
+    for line in stream:
+        read_bytes[0] += len(line)
+        yield line.decode("utf-8", errors="replace")
+
+
+def measure_hash_throughput(encode: Callable[[str], str], values: List[str],
+                            min_time: float = MIN_BENCHMARK_TIME) -> Dict[str, float]:
+    """
+    Hashes the values repeatedly for at least min_time seconds and returns values and bytes hashed per second,
+    and the length of the hashes.
+    """
+    values = values or ["sample value"]
+    hashed_values, hashed_bytes, hash_length = 0, 0, 0
+    value_bytes = sum(len(value.encode("utf-8")) for value in values)
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        for value in values:
+            hash_length = len(encode(value))
+        hashed_values += len(values)
+        hashed_bytes += value_bytes
+        elapsed = time.perf_counter() - start
+    return {"values_per_second": hashed_values / elapsed, "bytes_per_second": hashed_bytes / elapsed,
+            "hash_length": hash_length}
+
+
+def estimate_seconds(profile: TableProfile, values_per_second: float) -> float:
+    """
+    Estimated single process anonymization time of the table, parsing at the sampled speed plus hashing.
+    """
+    parse_seconds = profile.estimated_rows / profile.rows_per_second if profile.rows_per_second else 0.0
+    hash_seconds = profile.estimated_rows * len(profile.columns) / values_per_second if values_per_second else 0.0
+    return parse_seconds + hash_seconds
+
+
+def recommend_settings(profiles: List[TableProfile], hash_throughput: Dict[str, float], cpu_count: int,
+                       entry_overhead: int) -> Dict[str, Any]:
+    """
+    Recommends the cache size, chunking and worker counts for the profiled tables.
+    Args:
+        profiles: Profiles of the tables to anonymize.
+        hash_throughput: Result of measure_hash_throughput for the configured method.
+        cpu_count: Number of CPUs available.
+        entry_overhead: Memory taken by a cache entry on top of its value and hash.
+
+    Returns:
+        Recommended config parameters.
+    """
+    recommended: Dict[str, Any] = {}
+
+    cache_bytes = 0
+    for profile in profiles:
+        table_cache_bytes = 0
+        for column in profile.columns:
+            if column.sampled_values and column.distinct_ratio <= CACHE_DISTINCT_RATIO:
+                distinct_values = max(column.distinct_values, column.distinct_ratio * profile.estimated_rows)
+                entry_size = column.average_length + hash_throughput["hash_length"] + entry_overhead
+                table_cache_bytes += distinct_values * entry_size
+        # every table gets its own cache, so the largest one is enough
+        cache_bytes = max(cache_bytes, table_cache_bytes)
+    recommended["cache_size_mb"] = min(math.ceil(cache_bytes / 1024 / 1024), MAX_RECOMMENDED_CACHE_MB)
+
+    total_seconds = sum(estimate_seconds(profile, hash_throughput["values_per_second"]) for profile in profiles)
+    if cpu_count <= 1 or total_seconds < MIN_PARALLEL_SECONDS:
+        recommended.update(max_workers=1, table_workers=1)
+        return recommended
+
+    parallel_units = 1
+    for profile in profiles:
+        if profile.files == 1 and profile.size > LARGE_FILE_SIZE:
+            chunk_size_mb = max(MIN_CHUNK_SIZE_MB, math.ceil(profile.size / 1024 / 1024 / cpu_count))
+            recommended["chunk_size_mb"] = max(recommended.get("chunk_size_mb", 0), chunk_size_mb)
+    for profile in profiles:
+        if profile.files > 1:
+            parallel_units = max(parallel_units, profile.files)
+        elif "chunk_size_mb" in recommended and profile.size > LARGE_FILE_SIZE:
+            parallel_units = max(parallel_units, math.ceil(profile.size / 1024 / 1024 / recommended["chunk_size_mb"]))
+    recommended["max_workers"] = min(cpu_count, parallel_units)
+    recommended["table_workers"] = min(cpu_count, max(len(profiles), 1))
+    return recommended
@@ -0,0 +1 @@
+from .table_scheduler import TableScheduler, TableTask, get_path_size  # noqa
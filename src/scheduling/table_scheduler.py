@@ -0,0 +1,71 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Callable, List
+
+
+def get_path_size(path: str) -> int:
+    """
+    Returns the size in bytes of a file, or of all files of a folder recursively.
+    """
+    if not os.path.isdir(path):
+        return os.path.getsize(path) if os.path.exists(path) else 0
+    return sum(os.path.getsize(os.path.join(root, file_name))
+               for root, _, files in os.walk(path) for file_name in files)
+
+
+class TableTask:
+    def __init__(self, table_name: str, size: int, action: Callable[[], None]) -> None:
+        self.table_name = table_name
+        self.size = size
+        self.action = action
+
+
+class TableScheduler:
+    """
+    Runs the processing of input tables in a pool of threads, the largest tables are started first,
+    so a huge table does not end up running alone after all small ones. With a single worker the tables
+    are processed one after another in their original order.
+    """
+
+    def __init__(self, workers: int = 1) -> None:
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._start = 0.0
+        self._completed = 0
+        self._total = 0
+
+    def run(self, tasks: List[TableTask]) -> None:
+        """
+        Runs all tasks and logs the completion time of every table.
+
+        Raises:
+            Exception: the first exception raised by a task, tasks not started yet are cancelled.
+        """
+        self._start, self._completed, self._total = time.perf_counter(), 0, len(tasks)
+        if self.workers <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                self._run_task(task)
+            return
+
+        tasks = sorted(tasks, key=lambda table_task: table_task.size, reverse=True)
+        logging.info(f"Processing {len(tasks)} tables using {self.workers} workers, largest first")
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="table") as executor:
+            futures = [executor.submit(self._run_task, task) for task in tasks]
+            _, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in not_done:
+                future.cancel()
+        for future in futures:
+            if not future.cancelled() and future.exception():
+                raise future.exception()
+
+    def _run_task(self, task: TableTask) -> None:
+        task_start = time.perf_counter()
+        task.action()
+        finished = time.perf_counter()
+        with self._lock:
+            self._completed += 1
+            logging.info(f"Table '{task.table_name}' ({task.size} bytes) finished in {finished - task_start:.3f}s, "
+                         f"{finished - self._start:.3f}s after start, {self._completed} of {self._total} tables done")
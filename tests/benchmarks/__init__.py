@@ -0,0 +1,14 @@
+"""
+Performance benchmarks, they are not part of the unit test run. Run them from the repository root, e.g.:
+
+    python -m tests.benchmarks.bench_row_pipeline
+
+bench_suite runs the whole component on generated data dirs and compares the timings with baseline.json:
+
+    python -m tests.benchmarks.bench_suite --baseline tests/benchmarks/baseline.json
+
+bench_import_time measures the import time of the component entry point with python -X importtime and fails when
+it exceeds the budget, the unit tests only check that the deferred modules are not imported at startup:
+
+    python -m tests.benchmarks.bench_import_time --budget-ms 500
+"""
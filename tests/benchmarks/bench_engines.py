@@ -0,0 +1,43 @@
+"""
+Compares the csv, arrow and bytes anonymization engines on generated tables and checks their outputs are identical.
+
+    python -m tests.benchmarks.bench_engines --rows 1000000 10000000 50000000
+"""
+import argparse
+import filecmp
+import os
+import tempfile
+
+from anonymization import SHAAnonymizer
+from component import Component
+from engines import ENGINES
+from tests.benchmarks.datadir_generator import DataDirSpec, generate_table, measure
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000000, 10000000, 50000000])
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--cardinality", type=int, default=100000,
+                        help="number of distinct values of the anonymized column")
+    args = parser.parse_args()
+
+    print(f"{'rows':>12}{'engine':>10}{'seconds':>10}{'rows/s':>14}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for rows in args.rows:
+            in_path = os.path.join(temp_dir, f"table_{rows}.csv")
+            table_columns = generate_table(in_path, DataDirSpec(rows, args.columns, 1, args.cardinality))
+            for engine in ENGINES:
+                seconds = measure(Component.anonymize_columns, in_path, os.path.join(temp_dir, f"{engine}.csv"),
+                                  table_columns, "salt", "prepend", table_columns[:1], SHAAnonymizer("256"), ",",
+                                  True, True, engine=engine)
+                print(f"{rows:>12}{engine:>10}{seconds:>10.2f}{rows / seconds:>14,.0f}")
+            reference = os.path.join(temp_dir, f"{ENGINES[0]}.csv")
+            if not all(filecmp.cmp(reference, os.path.join(temp_dir, f"{engine}.csv"), shallow=False)
+                       for engine in ENGINES[1:]):
+                raise AssertionError(f"Outputs of the engines differ for {rows} rows")
+            os.remove(in_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Measures the startup of the component entry point: every run imports the component module in a fresh interpreter
+with python -X importtime and records its cumulative import time and the wall time of the process. The first run
+is a warm-up which writes the bytecode cache, unless PYTHONDONTWRITEBYTECODE is set, then every run compiles the
+sources. The exit code is 1 when the median import time exceeds the budget or when a module that should be imported
+lazily is imported.
+
+    python -m tests.benchmarks.bench_import_time --repeat 10 --budget-ms 500
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "src")
+ENTRY_MODULE = "component"
+# imported only by the features using them: archive extraction, the engines, the pseudonym store, profiling,
+# passthrough, table scheduling and worker processes
+DEFERRED_MODULES = ["py7zr", "pyarrow", "multiprocessing", "concurrent.futures.process", "decompress", "tarfile",
+                    "engines", "sqlite3", "cProfile", "profiling", "passthrough", "scheduling"]
+DEFAULT_BUDGET_MS = 1000
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    Returns (module, nesting depth, cumulative microseconds) of the -X importtime lines in the import order.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            # the header line
+            continue
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        imports.append((name.strip(), depth, int(cumulative)))
+    return imports
+
+
+def import_module(module: str = ENTRY_MODULE) -> Tuple[float, List[Tuple[str, int, int]]]:
+    """
+    Imports the module in a new interpreter and returns the wall time of the process in ms and its import times.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.path.abspath(SRC_DIR), env.get("PYTHONPATH")]))
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], env=env,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    return (time.perf_counter() - start) * 1000, parse_importtime(process.stderr)
+
+
+def measure_import_time(module: str = ENTRY_MODULE, repeat: int = 5) -> Dict[str, Any]:
+    """
+    Returns the medians of the import time of the module and of the process wall time in ms, the import times
+    of its direct imports and the deferred modules which were imported.
+    """
+    import_module(module)
+    runs = [import_module(module) for _ in range(repeat)]
+    import_times = [next(cumulative for name, depth, cumulative in imports if name == module and depth == 0)
+                    for _, imports in runs]
+    imports = runs[-1][1]
+    return {"import_ms": statistics.median(import_times) / 1000,
+            "wall_ms": statistics.median(wall_time for wall_time, _ in runs),
+            "direct_imports": sorted(((name, cumulative / 1000) for name, depth, cumulative in imports if depth == 1),
+                                     key=lambda item: item[1], reverse=True),
+            "deferred_imported": [name for name, _, _ in imports if name in DEFERRED_MODULES]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default=ENTRY_MODULE)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="number of the slowest direct imports printed")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args()
+
+    result = measure_import_time(args.module, args.repeat)
+    print(f"import {args.module}: {result['import_ms']:.1f} ms, process {result['wall_ms']:.1f} ms "
+          f"(median of {args.repeat} runs, budget {args.budget_ms:.0f} ms)")
+    for name, milliseconds in result["direct_imports"][:args.top]:
+        print(f"{milliseconds:>10.1f} ms  {name}")
+
+    failed = False
+    if result["deferred_imported"]:
+        print(f"FAILED modules imported at startup: {result['deferred_imported']}")
+        failed = True
+    if result["import_ms"] > args.budget_ms:
+        print(f"FAILED import time over the budget of {args.budget_ms:.0f} ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Compares the throughput of the anonymization methods with prepared salted encoders,
+in values and input megabytes per second.
+
+    python -m tests.benchmarks.bench_methods --values 1000000 --value-length 64
+"""
+import argparse
+
+from anonymization import BLAKE2Anonymizer, HMACAnonymizer, MD5Anonymizer, SHAAnonymizer, SALT_PREPEND
+from tests.benchmarks.datadir_generator import measure_encoder
+
+METHODS = {
+    "MD5": MD5Anonymizer,
+    "SHA256": lambda: SHAAnonymizer(sha_ver="256"),
+    "SHA512": lambda: SHAAnonymizer(sha_ver="512"),
+    "BLAKE2b": lambda: BLAKE2Anonymizer("b"),
+    "BLAKE2b-16": lambda: BLAKE2Anonymizer("b", digest_size=16),
+    "BLAKE2s": lambda: BLAKE2Anonymizer("s"),
+    "BLAKE2s-16": lambda: BLAKE2Anonymizer("s", digest_size=16),
+    "HMAC-SHA256": HMACAnonymizer
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--values", type=int, default=500000)
+    parser.add_argument("--value-length", type=int, default=32, help="length of the anonymized values")
+    parser.add_argument("--salt", default="a_reasonably_long_salt_string_0123456789")
+    args = parser.parse_args()
+
+    values = [f"{i:0{args.value_length}d}" for i in range(args.values)]
+    megabytes = sum(len(value) for value in values) / 1024 / 1024
+    print(f"{'method':<13}{'values/s':>14}{'MB/s':>10}{'output chars':>14}")
+    for method, anonymizer_factory in METHODS.items():
+        encoder = anonymizer_factory().get_salted_encoder(args.salt, SALT_PREPEND)
+        seconds = measure_encoder(encoder, values)
+        print(f"{method:<13}{args.values / seconds:>14,.0f}{megabytes / seconds:>10.1f}{len(encoder(values[0])):>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compares the rows/s of the positional anonymize_columns pipeline with the former csv.DictReader/DictWriter one
+on a narrow and a wide table.
+
+    python -m tests.benchmarks.bench_row_pipeline --rows 200000
+"""
+import argparse
+import csv
+import filecmp
+import os
+import tempfile
+from typing import List
+
+from anonymization import Anonymizer, SHAAnonymizer
+from component import Component
+from tests.benchmarks.datadir_generator import DataDirSpec, generate_table, measure
+
+
+def dict_anonymize_columns(table_path: str, out_table_path: str, table_columns: List[str], salt: str,
+                           salt_location: str, columns_to_anonymize: List[str], anonymizer: Anonymizer,
+                           delimiter: str, table_has_headers: bool, write_columns_to_manifest: bool) -> None:
+    """The csv.DictReader/DictWriter implementation anonymize_columns used before the positional pipeline."""
+    with open(table_path, "r") as in_file, open(out_table_path, "w") as out_file:
+        csv_reader = csv.DictReader(in_file, fieldnames=table_columns, delimiter=delimiter)
+        csv_writer = csv.DictWriter(out_file, fieldnames=table_columns, delimiter=delimiter)
+        for i, row in enumerate(csv_reader):
+            if table_has_headers and i == 0 and not write_columns_to_manifest:
+                csv_writer.writerow(row)
+                continue
+            if write_columns_to_manifest and table_has_headers and i == 0:
+                continue
+            for column in columns_to_anonymize:
+                if salt_location == "prepend":
+                    row[column] = anonymizer.encode_data("".join([salt, row[column]]))
+                elif salt_location == "append":
+                    row[column] = anonymizer.encode_data("".join([row[column], salt]))
+            csv_writer.writerow(row)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--narrow-columns", type=int, default=5)
+    parser.add_argument("--wide-columns", type=int, default=300)
+    parser.add_argument("--anonymized-columns", type=int, default=3)
+    args = parser.parse_args()
+
+    anonymizer = SHAAnonymizer(sha_ver="256")
+    print(f"{'table':<8}{'columns':>8}{'dict rows/s':>16}{'list rows/s':>16}{'speedup':>10}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, columns in [("narrow", args.narrow_columns), ("wide", args.wide_columns)]:
+            in_path = os.path.join(temp_dir, f"{name}.csv")
+            spec = DataDirSpec(args.rows, columns, args.anonymized_columns, header_in_manifest=True)
+            table_columns = generate_table(in_path, spec)
+            columns_to_anonymize = table_columns[:args.anonymized_columns]
+            results = {}
+            for engine, function in [("dict", dict_anonymize_columns), ("list", Component.anonymize_columns)]:
+                out_path = os.path.join(temp_dir, f"{name}_{engine}.csv")
+                results[engine] = measure(function, in_path, out_path, table_columns, "salt", "prepend",
+                                          columns_to_anonymize, anonymizer, ",", False, True)
+            if not filecmp.cmp(os.path.join(temp_dir, f"{name}_dict.csv"),
+                               os.path.join(temp_dir, f"{name}_list.csv"), shallow=False):
+                raise AssertionError(f"Outputs of the {name} table differ")
+            print(f"{name:<8}{columns:>8}{args.rows / results['dict']:>16,.0f}{args.rows / results['list']:>16,.0f}"
+                  f"{results['dict'] / results['list']:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Measures the time run() spends before anonymizing the first row: reading the input table manifests and matching
+every table against the tables_to_encrypt patterns. Compares the former approach (fnmatch of every pattern per table
+and a full manifest rescan per anonymized table) with the table index and PatternMatcher.
+
+    python -m tests.benchmarks.bench_startup --tables 10000
+"""
+import argparse
+import fnmatch
+import json
+import os
+import tempfile
+import time
+from unittest import mock
+
+from component import Component
+from pattern_matching import PatternMatcher
+
+
+def generate_data_dir(data_dir: str, tables: int, patterns: int) -> str:
+    tables_dir = os.path.join(data_dir, "in", "tables")
+    os.makedirs(tables_dir)
+    os.makedirs(os.path.join(data_dir, "in", "files"))
+    for i in range(tables):
+        table_name = f"in.c-bucket.table_{i}.csv"
+        with open(os.path.join(tables_dir, table_name), "w") as table_file:
+            table_file.write("1,a\n")
+        with open(os.path.join(tables_dir, f"{table_name}.manifest"), "w") as manifest_file:
+            json.dump({"columns": ["id", "name"], "delimiter": ",", "enclosure": '"'}, manifest_file)
+
+    tables_to_encrypt = {f"in.c-bucket.table_{i}.csv": ["name"] for i in range(patterns - 1)}
+    tables_to_encrypt["in.c-other.*.csv"] = ["name"]
+    with open(os.path.join(data_dir, "config.json"), "w") as config_file:
+        json.dump({"parameters": {"method": "MD5", "tables_to_encrypt": tables_to_encrypt}}, config_file)
+    return data_dir
+
+
+def fnmatch_startup(component: Component, patterns) -> int:
+    anonymized = 0
+    for table in component.get_input_tables_definitions():
+        matches = [pattern for pattern in patterns if fnmatch.fnmatch(table.name, pattern)]
+        if matches:
+            # anonymize_table looked the table up by rescanning all input manifests
+            next(in_table for in_table in component.get_input_tables_definitions() if in_table.name == table.name)
+            anonymized += 1
+    return anonymized
+
+
+def indexed_startup(component: Component, patterns) -> int:
+    anonymized = 0
+    component._input_tables_index = None
+    pattern_matcher = PatternMatcher(patterns)
+    for table in component.get_input_tables_index().values():
+        if pattern_matcher.match(table.name):
+            component.get_input_table(table.name)
+            anonymized += 1
+    return anonymized
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tables", type=int, default=10000)
+    parser.add_argument("--patterns", type=int, default=20,
+                        help="number of tables_to_encrypt patterns, each one matching one table")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_dir = generate_data_dir(temp_dir, args.tables, args.patterns)
+        with mock.patch.dict(os.environ, {"KBC_DATADIR": data_dir}):
+            component = Component()
+        patterns = list(component.configuration.parameters["tables_to_encrypt"])
+
+        print(f"{'startup':<10}{'tables':>8}{'patterns':>10}{'anonymized':>12}{'seconds':>10}")
+        for name, startup in [("fnmatch", fnmatch_startup), ("indexed", indexed_startup)]:
+            start = time.perf_counter()
+            anonymized = startup(component, patterns)
+            print(f"{name:<10}{args.tables:>8}{len(patterns):>10}{anonymized:>12}"
+                  f"{time.perf_counter() - start:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
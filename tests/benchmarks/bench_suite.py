@@ -0,0 +1,143 @@
+"""
+Runs Component.run end to end on generated data dirs (see datadir_generator) and records the wall time of the run
+and of every stage of the performance report. Results are written as JSON and compared with a stored baseline,
+the exit code is 1 when a scenario got slower than the tolerance allows.
+
+    python -m tests.benchmarks.bench_suite --rows 200000 --output results.json \
+        --baseline tests/benchmarks/baseline.json
+    python -m tests.benchmarks.bench_suite --rows 200000 --save-baseline tests/benchmarks/baseline.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+from unittest import mock
+
+from component import Component
+from tests.benchmarks.datadir_generator import DataDirSpec, generate_data_dir
+
+REPORT_PATH = "bench/performance.json"
+DEFAULT_TOLERANCE = 0.2
+
+SCENARIOS = {
+    "single": dict(),
+    "single_header_in_manifest": dict(header_in_manifest=True),
+    "single_gzip": dict(gzip=True),
+    "sliced": dict(slices=8, header_in_manifest=True),
+    "sliced_gzip": dict(slices=8, gzip=True, header_in_manifest=True),
+    "sliced_header_in_file": dict(slices=8),
+    "low_cardinality_cached": dict(cardinality=100, parameters={"cache_size_mb": 16}),
+    "wide": dict(columns=50, anonymized_columns=10),
+}
+
+
+def run_component(template_dir: str) -> Dict[str, Any]:
+    """
+    Runs the component on a fresh copy of the data dir and returns the wall time of the run and of its stages.
+    """
+    data_dir = tempfile.mkdtemp()
+    try:
+        shutil.copytree(template_dir, data_dir, dirs_exist_ok=True)
+        with mock.patch.dict(os.environ, {"KBC_DATADIR": data_dir}):
+            component = Component()
+            start = time.perf_counter()
+            component.run()
+            wall_time = time.perf_counter() - start
+        with open(os.path.join(data_dir, REPORT_PATH)) as report_file:
+            report = json.load(report_file)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return {"wall_time": wall_time, "stages": report["stages"]}
+
+
+def run_scenario(spec: DataDirSpec, repeat: int) -> Dict[str, Any]:
+    """
+    Runs the scenario repeat times and returns the medians of the wall times.
+    """
+    template_dir = tempfile.mkdtemp()
+    try:
+        generate_data_dir(template_dir, spec)
+        runs = [run_component(template_dir) for _ in range(repeat)]
+    finally:
+        shutil.rmtree(template_dir, ignore_errors=True)
+
+    wall_time = statistics.median(run["wall_time"] for run in runs)
+    stages = {}
+    for stage, metrics in runs[0]["stages"].items():
+        stages[stage] = {"wall_time": statistics.median(run["stages"][stage]["wall_time"] for run in runs),
+                         "cpu_time": statistics.median(run["stages"][stage]["cpu_time"] for run in runs),
+                         "rows": metrics["rows"], "bytes_in": metrics["bytes_in"], "bytes_out": metrics["bytes_out"]}
+    return {"spec": spec.to_dict(), "wall_time": wall_time, "rows_per_second": spec.rows / wall_time,
+            "stages": stages}
+
+
+def compare_with_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Returns descriptions of the scenarios and stages which are slower than the baseline by more than tolerance.
+    Scenarios run with a different spec than the baseline are not compared.
+    """
+    regressions = []
+    for name, result in results["scenarios"].items():
+        expected = baseline.get("scenarios", {}).get(name)
+        if not expected or expected["spec"] != result["spec"]:
+            continue
+        timings = [("run", result["wall_time"], expected["wall_time"])]
+        timings += [(stage, metrics["wall_time"], expected["stages"][stage]["wall_time"])
+                    for stage, metrics in result["stages"].items() if stage in expected["stages"]]
+        for timing, seconds, expected_seconds in timings:
+            if expected_seconds and seconds > expected_seconds * (1 + tolerance):
+                regressions.append(f"{name} {timing}: {seconds:.3f}s, baseline {expected_seconds:.3f}s "
+                                   f"(+{seconds / expected_seconds - 1:.0%})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--parameters", type=json.loads, default={},
+                        help="config parameters added to every scenario as JSON, e.g. '{\"engine\": \"bytes\"}'")
+    parser.add_argument("--output", help="path of the JSON results")
+    parser.add_argument("--baseline", help="path of the JSON results to compare with")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown against the baseline, 0.2 means 20 %%")
+    parser.add_argument("--save-baseline", help="path to store the results as the new baseline")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    results = {"python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count(),
+               "scenarios": {}}
+    print(f"{'scenario':<28}{'seconds':>10}{'rows/s':>14}  stages")
+    for name in args.scenarios:
+        scenario = dict(SCENARIOS[name])
+        parameters = {**scenario.pop("parameters", {}), **args.parameters, "performance_report": REPORT_PATH}
+        spec = DataDirSpec(rows=args.rows, parameters=parameters, **scenario)
+        result = run_scenario(spec, args.repeat)
+        results["scenarios"][name] = result
+        stages = ", ".join(f"{stage} {metrics['wall_time']:.2f}s" for stage, metrics in result["stages"].items())
+        print(f"{name:<28}{result['wall_time']:>10.2f}{result['rows_per_second']:>14,.0f}  {stages}")
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w") as results_file:
+            json.dump(results, results_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare_with_baseline(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
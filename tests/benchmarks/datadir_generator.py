@@ -0,0 +1,163 @@
+"""
+Generates synthetic Keboola data dirs for the benchmarks: one table with a configurable number of rows and columns,
+single file or sliced, plain or gzipped, with the header in the file or in the manifest. Also holds the table
+generation and timing helpers shared by the benchmark scripts.
+
+    python -m tests.benchmarks.datadir_generator /tmp/bench_data --rows 1000000 --slices 8 --gzip
+"""
+import argparse
+import csv
+import gzip
+import io
+import itertools
+import json
+import os
+import random
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+TABLE_NAME = "in.c-bench.customers.csv"
+# distinct values of the columns which are not anonymized
+FILLER_VALUES = 1000
+
+
+class DataDirSpec:
+    def __init__(self, rows: int = 100000, columns: int = 10, anonymized_columns: int = 2,
+                 cardinality: int = 100000, slices: int = 0, gzip: bool = False, header_in_manifest: bool = False,
+                 method: str = "SHA256", parameters: Optional[Dict[str, Any]] = None, seed: int = 42) -> None:
+        """
+        Args:
+            rows: Number of data rows of the table.
+            columns: Number of columns of the table.
+            anonymized_columns: Number of the first columns which are anonymized.
+            cardinality: Number of distinct values of each anonymized column.
+            slices: Number of slices of a sliced table, 0 writes a single file.
+            gzip: Write the file or the slices gzip compressed.
+            header_in_manifest: Keep the header in the manifest instead of the first row of the file(s).
+            method: Anonymization method of the config.
+            parameters: Additional config parameters.
+            seed: Seed of the generated values.
+        """
+        self.rows = rows
+        self.columns = columns
+        self.anonymized_columns = anonymized_columns
+        self.cardinality = cardinality
+        self.slices = slices
+        self.gzip = gzip
+        self.header_in_manifest = header_in_manifest
+        self.method = method
+        self.parameters = parameters or {}
+        self.seed = seed
+
+    @property
+    def column_names(self) -> List[str]:
+        return ([f"email_{i}" for i in range(self.anonymized_columns)] +
+                [f"attribute_{i}" for i in range(self.columns - self.anonymized_columns)])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+def generate_data_dir(data_dir: str, spec: DataDirSpec) -> str:
+    """
+    Writes config.json, the table and its manifest into data_dir and returns it.
+    """
+    tables_dir = os.path.join(data_dir, "in", "tables")
+    for folder in [tables_dir, os.path.join(data_dir, "in", "files"), os.path.join(data_dir, "out", "tables"),
+                   os.path.join(data_dir, "out", "files")]:
+        os.makedirs(folder, exist_ok=True)
+
+    table_path = os.path.join(tables_dir, TABLE_NAME)
+    if spec.slices:
+        os.makedirs(table_path, exist_ok=True)
+        suffix = ".csv.gz" if spec.gzip else ".csv"
+        rows_per_slice = -(-spec.rows // spec.slices)
+        rows = _generate_rows(spec)
+        for slice_number in range(spec.slices):
+            slice_rows = min(rows_per_slice, spec.rows - slice_number * rows_per_slice)
+            _write_file(os.path.join(table_path, f"part_{slice_number:04d}{suffix}"), spec,
+                        itertools.islice(rows, max(slice_rows, 0)))
+    else:
+        table_path = f"{table_path}.gz" if spec.gzip else table_path
+        generate_table(table_path, spec)
+
+    manifest = {"delimiter": ",", "enclosure": '"'}
+    if spec.header_in_manifest:
+        manifest["columns"] = spec.column_names
+    with open(f"{table_path}.manifest", "w") as manifest_file:
+        json.dump(manifest, manifest_file)
+
+    parameters = {"method": spec.method, "#salt": "benchmark",
+                  "tables_to_encrypt": {os.path.basename(table_path): spec.column_names[:spec.anonymized_columns]},
+                  **spec.parameters}
+    with open(os.path.join(data_dir, "config.json"), "w") as config_file:
+        json.dump({"parameters": parameters}, config_file)
+    return data_dir
+
+
+def generate_table(path: str, spec: DataDirSpec) -> List[str]:
+    """
+    Writes the rows of the spec into a single file and returns the column names.
+    """
+    _write_file(path, spec, itertools.islice(_generate_rows(spec), spec.rows))
+    return spec.column_names
+
+
+def measure(function: Callable, *args, **kwargs) -> float:
+    """
+    Returns the seconds the call of the function took.
+    """
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def measure_encoder(encoder: Callable[[str], str], values: Iterable[str]) -> float:
+    """
+    Returns the seconds the encoder took to encode all values.
+    """
+    start = time.perf_counter()
+    for value in values:
+        encoder(value)
+    return time.perf_counter() - start
+
+
+def _generate_rows(spec: DataDirSpec) -> Iterator[List[str]]:
+    rnd = random.Random(spec.seed)
+    filler = [f"value_{i}" for i in range(FILLER_VALUES)]
+    filler_columns = spec.columns - spec.anonymized_columns
+    while True:
+        yield ([f"customer_{rnd.randrange(spec.cardinality)}@example.com" for _ in range(spec.anonymized_columns)] +
+               [filler[rnd.randrange(FILLER_VALUES)] for _ in range(filler_columns)])
+
+
+def _write_file(path: str, spec: DataDirSpec, rows: Iterable[List[str]]) -> None:
+    opener = gzip.open if spec.gzip else open
+    with opener(path, "wb") as raw_file, io.TextIOWrapper(raw_file, newline="") as table_file:
+        writer = csv.writer(table_file)
+        if not spec.header_in_manifest:
+            writer.writerow(spec.column_names)
+        writer.writerows(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("data_dir")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--anonymized-columns", type=int, default=2)
+    parser.add_argument("--cardinality", type=int, default=100000)
+    parser.add_argument("--slices", type=int, default=0)
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--header-in-manifest", action="store_true")
+    parser.add_argument("--method", default="SHA256")
+    parser.add_argument("--parameters", type=json.loads, default={}, help="additional config parameters as JSON")
+    args = parser.parse_args()
+
+    spec = DataDirSpec(args.rows, args.columns, args.anonymized_columns, args.cardinality, args.slices, args.gzip,
+                       args.header_in_manifest, args.method, args.parameters)
+    print(generate_data_dir(args.data_dir, spec))
+
+
+if __name__ == "__main__":
+    main()
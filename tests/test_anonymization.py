@@ -0,0 +1,143 @@
+import hashlib
+import hmac
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from anonymization import AnonymizerException, BLAKE2Anonymizer, CachedAnonymizer, HMACAnonymizer, MD5Anonymizer, \
+    PseudonymStore, SHAAnonymizer, StoredAnonymizer, SALT_LOCATIONS
+
+
+class TestCachedAnonymizer(unittest.TestCase):
+
+    def test_cached_values_match_wrapped_anonymizer(self):
+        anonymizer = CachedAnonymizer(MD5Anonymizer(), max_memory=1024 * 1024)
+        for value in ["a", "b", "a", "a"]:
+            self.assertEqual(anonymizer.encode_data(value), MD5Anonymizer().encode_data(value))
+        stats = anonymizer.reset_stats()
+        self.assertEqual((stats.hits, stats.misses, stats.evictions), (2, 2, 0))
+        self.assertEqual(anonymizer.stats.hits, 0)
+
+    def test_memory_budget_evicts_least_recently_used(self):
+        anonymizer = CachedAnonymizer(MD5Anonymizer(), max_memory=500)
+        for value in ["a", "b", "c", "d", "e"]:
+            anonymizer.encode_data(value)
+        self.assertLessEqual(anonymizer.memory, 500)
+        self.assertGreater(anonymizer.stats.evictions, 0)
+        anonymizer.encode_data("e")
+        self.assertEqual(anonymizer.stats.hits, 1)
+        anonymizer.encode_data("a")
+        self.assertEqual(anonymizer.stats.hits, 1)
+
+
+class TestSaltedEncoder(unittest.TestCase):
+
+    def test_prepared_encoder_matches_salted_string(self):
+        for anonymizer in [SHAAnonymizer("256"), SHAAnonymizer("512"), MD5Anonymizer()]:
+            for salt in ["", "salt_ž"]:
+                prepend, append = [anonymizer.get_salted_encoder(salt, location) for location in SALT_LOCATIONS]
+                for value in ["", "value", "ěščř"]:
+                    self.assertEqual(prepend(value), anonymizer.encode_data(salt + value))
+                    self.assertEqual(append(value), anonymizer.encode_data(value + salt))
+
+
+class TestKeyedAnonymizers(unittest.TestCase):
+
+    def test_blake2_uses_salt_as_key(self):
+        anonymizer = BLAKE2Anonymizer("s", digest_size=16)
+        for salt_location in SALT_LOCATIONS:
+            self.assertEqual(anonymizer.get_salted_encoder("salt", salt_location)("value"),
+                             hashlib.blake2s(b"value", key=b"salt", digest_size=16).hexdigest())
+        self.assertEqual(len(anonymizer.encode_data("value")), 32)
+
+    def test_blake2_long_salt_is_hashed_to_key(self):
+        anonymizer = BLAKE2Anonymizer("b")
+        long_salt = "s" * 100
+        key = hashlib.blake2b(long_salt.encode(), digest_size=64).digest()
+        self.assertEqual(anonymizer.get_salted_encoder(long_salt, "prepend")("value"),
+                         hashlib.blake2b(b"value", key=key).hexdigest())
+
+    def test_blake2_invalid_digest_size(self):
+        with self.assertRaises(AnonymizerException):
+            BLAKE2Anonymizer("s", digest_size=64)
+
+    def test_hmac_uses_salt_as_key(self):
+        self.assertEqual(HMACAnonymizer().get_salted_encoder("salt", "append")("value"),
+                         hmac.new(b"salt", b"value", hashlib.sha256).hexdigest())
+
+    def test_cache_keeps_keyed_salting(self):
+        anonymizer = CachedAnonymizer(HMACAnonymizer(), max_memory=1024 * 1024)
+        for salt in ["salt", "other"]:
+            encoder = anonymizer.get_salted_encoder(salt, "prepend")
+            for _ in range(2):
+                self.assertEqual(encoder("value"), HMACAnonymizer().get_salted_encoder(salt, "prepend")("value"))
+        self.assertEqual((anonymizer.stats.hits, anonymizer.stats.misses), (2, 2))
+
+
+class TestPseudonymStore(unittest.TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        self.store = PseudonymStore(os.path.join(temp_dir, "store.sqlite"), max_entries=3)
+        self.addCleanup(self.store.close)
+
+    def test_size_limit(self):
+        self.assertEqual(self.store.add_many("ns", [("a", "1"), ("b", "2")]), 2)
+        self.assertEqual(self.store.add_many("other", [("a", "3"), ("c", "4")]), 1)
+        self.assertEqual(self.store.count(), 3)
+        self.assertEqual([self.store.get("ns", value) for value in ["a", "b", "c"]], ["1", "2", None])
+
+    def test_size_limit_of_concurrent_connections(self):
+        other_store = pickle.loads(pickle.dumps(self.store))
+        self.assertEqual(self.store.add_many("ns", [("a", "1"), ("b", "2")]), 2)
+        self.assertEqual(other_store.add_many("ns", [("c", "3"), ("d", "4")]), 1)
+        self.assertEqual(self.store.count(), 3)
+        other_store.close()
+
+    def test_stored_anonymizer_matches_wrapped_anonymizer(self):
+        anonymizer = StoredAnonymizer(MD5Anonymizer(), self.store, "ns")
+        encoder = anonymizer.get_salted_encoder("salt", "append")
+        self.assertEqual([encoder(value) for value in ["a", "b", "a"]],
+                         [MD5Anonymizer().encode_data(value + "salt") for value in ["a", "b", "a"]])
+        anonymizer.flush()
+        self.assertEqual(self.store.count(), 2)
+
+        worker_anonymizer = pickle.loads(pickle.dumps(anonymizer))
+        worker_anonymizer.get_salted_encoder("salt", "append")("b")
+        self.assertEqual((worker_anonymizer.stats.hits, worker_anonymizer.stats.misses), (2, 2))
+
+    def test_unpickled_stores_share_the_connection_of_the_process(self):
+        other_store = pickle.loads(pickle.dumps(self.store))
+        self.assertIs(other_store.connection, self.store.connection)
+
+    def test_prefetch_looks_up_a_batch_at_once(self):
+        self.store.add_many("ns", [("a", "1"), ("b", "2")])
+        anonymizer = StoredAnonymizer(MD5Anonymizer(), self.store, "ns")
+        encoder = anonymizer.get_salted_encoder("", "append")
+        anonymizer.prefetch(["a", b"b", "c", "a"])
+        with mock.patch.object(self.store, "get") as get:
+            self.assertEqual([encoder(value) for value in ["a", "b", "c", "a"]],
+                             ["1", "2", MD5Anonymizer().encode_data("c"), "1"])
+        get.assert_not_called()
+        self.assertEqual((anonymizer.stats.hits, anonymizer.stats.misses), (3, 1))
+
+    def test_stored_anonymizer_memory_is_bounded(self):
+        anonymizer = StoredAnonymizer(MD5Anonymizer(), PseudonymStore(self.store.path), "ns", max_memory=1000)
+        encoder = anonymizer.get_salted_encoder("", "append")
+        pseudonyms = [encoder(str(value)) for value in range(100)]
+        anonymizer.flush()
+        self.assertLessEqual(anonymizer.memory, 1000)
+        self.assertGreater(anonymizer.stats.evictions, 0)
+
+        anonymizer.reset_stats()
+        self.assertEqual([encoder(str(value)) for value in range(100)], pseudonyms)
+        self.assertEqual((anonymizer.stats.hits, anonymizer.stats.misses), (100, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import gzip
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from tests.benchmarks.bench_import_time import SRC_DIR, measure_import_time, parse_importtime
+from tests.benchmarks.bench_suite import REPORT_PATH, compare_with_baseline, run_component
+from tests.benchmarks.datadir_generator import TABLE_NAME, DataDirSpec, generate_data_dir, generate_table
+
+
+class TestDataDirGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_sliced_gzip_table(self):
+        generate_data_dir(self.data_dir, DataDirSpec(rows=10, columns=3, slices=3, gzip=True,
+                                                     header_in_manifest=True))
+        table_dir = os.path.join(self.data_dir, "in/tables", TABLE_NAME)
+        self.assertEqual(sorted(os.listdir(table_dir)), ["part_0000.csv.gz", "part_0001.csv.gz", "part_0002.csv.gz"])
+        rows = 0
+        for slice_name in os.listdir(table_dir):
+            with gzip.open(os.path.join(table_dir, slice_name), "rt") as slice_file:
+                rows += len(slice_file.readlines())
+        self.assertEqual(rows, 10)
+
+    def test_single_file_table(self):
+        table_path = os.path.join(self.data_dir, "table.csv")
+        columns = generate_table(table_path, DataDirSpec(rows=5, columns=3, anonymized_columns=1))
+        self.assertEqual(columns, ["email_0", "attribute_0", "attribute_1"])
+        with open(table_path) as table_file:
+            self.assertEqual(table_file.readline(), "email_0,attribute_0,attribute_1\n")
+            self.assertEqual(len(table_file.readlines()), 5)
+
+    def test_component_run_is_measured(self):
+        generate_data_dir(self.data_dir, DataDirSpec(rows=100, columns=4, parameters={"performance_report":
+                                                                                      REPORT_PATH}))
+        result = run_component(self.data_dir)
+        self.assertEqual(result["stages"]["anonymize_columns"]["rows"], 100)
+        self.assertGreater(result["wall_time"], 0)
+
+
+class TestCompareWithBaseline(unittest.TestCase):
+
+    def test_regressions(self):
+        spec = DataDirSpec().to_dict()
+        baseline = {"scenarios": {"single": {"spec": spec, "wall_time": 1.0,
+                                             "stages": {"anonymize_columns": {"wall_time": 0.5}}}}}
+        results = {"scenarios": {"single": {"spec": spec, "wall_time": 1.1,
+                                            "stages": {"anonymize_columns": {"wall_time": 0.9}}}}}
+        regressions = compare_with_baseline(results, baseline, 0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("single anonymize_columns"))
+
+        results["scenarios"]["single"]["spec"] = DataDirSpec(rows=1).to_dict()
+        self.assertEqual(compare_with_baseline(results, baseline, 0.2), [])
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_parse_importtime(self):
+        stderr = ("import time: self [us] | cumulative | imported package\n"
+                  "import time:       120 |        120 |   _csv\n"
+                  "import time:       300 |        420 | csv\n")
+        self.assertEqual(parse_importtime(stderr), [("_csv", 1, 120), ("csv", 0, 420)])
+
+    def test_deferred_modules_are_not_imported(self):
+        # the import time budget is checked by the benchmark script only, timings are not stable enough for tests
+        result = measure_import_time(repeat=1)
+        self.assertEqual(set(result), {"import_ms", "wall_ms", "direct_imports", "deferred_imported"})
+        self.assertGreater(result["import_ms"], 0)
+        self.assertEqual(result["deferred_imported"], [])
+
+    def test_decompressor_does_not_import_py7zr(self):
+        code = "import sys; from decompress import Decompressor; Decompressor(); sys.exit('py7zr' in sys.modules)"
+        subprocess.run([sys.executable, "-c", code], env=dict(os.environ, PYTHONPATH=SRC_DIR), check=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
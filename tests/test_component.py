@@ -3,12 +3,22 @@ Created on 12. 11. 2018
 
 @author: esner
 '''
+import csv
+import io
+import json
+import shutil
+import tempfile
 import unittest
 import mock
 import os
+from typing import Dict, Optional, Union
 from freezegun import freeze_time
 
+from keboola.component.exceptions import UserException
+
+from anonymization import MD5Anonymizer, SHAAnonymizer
 from component import Component
+from csv_tools import open_table_file
 
 
 class TestComponent(unittest.TestCase):
@@ -23,6 +33,314 @@ class TestComponent(unittest.TestCase):
             comp.run()
 
 
+def create_component(data_dir: str) -> Component:
+    with mock.patch.dict(os.environ, {'KBC_DATADIR': data_dir}):
+        return Component()
+
+
+def create_data_dir(test_case: unittest.TestCase, parameters: dict) -> str:
+    data_dir = tempfile.mkdtemp()
+    test_case.addCleanup(shutil.rmtree, data_dir, ignore_errors=True)
+    for folder in ["in/tables", "in/files", "out/tables", "out/files"]:
+        os.makedirs(os.path.join(data_dir, folder))
+    with open(os.path.join(data_dir, "config.json"), "w") as config_file:
+        json.dump({"parameters": parameters, "action": "run"}, config_file)
+    return data_dir
+
+
+def write_table(data_dir: str, content: Union[str, Dict[str, str]], manifest: Optional[dict] = None,
+                name: str = "test.csv") -> str:
+    """
+    Writes an input table, a dict of slice names and contents writes a sliced table. Returns the table path.
+    """
+    table_path = os.path.join(data_dir, "in/tables", name)
+    if isinstance(content, dict):
+        os.makedirs(table_path)
+        files = {os.path.join(table_path, part): part_content for part, part_content in content.items()}
+    else:
+        files = {table_path: content}
+    for file_path, file_content in files.items():
+        with open(file_path, "w", newline="") as table_file:
+            table_file.write(file_content)
+    if manifest is not None:
+        with open(f"{table_path}.manifest", "w") as manifest_file:
+            json.dump(manifest, manifest_file)
+    return table_path
+
+
+class TestSlicedTables(unittest.TestCase):
+
+    def test_max_workers_validation(self):
+        comp = create_component(create_data_dir(self, {"method": "MD5", "max_workers": -1}))
+        with self.assertRaises(UserException):
+            comp.get_max_workers()
+
+    def test_failed_slice_is_named(self):
+        data_dir = create_data_dir(self, {"method": "MD5", "max_workers": 2})
+        comp = create_component(data_dir)
+        anonymizer = SHAAnonymizer()
+        slice_jobs = {}
+        for slice_name in ["part_0.csv", "part_1.csv"]:
+            slice_jobs[slice_name] = dict(table_path=os.path.join(data_dir, "in/tables", slice_name),
+                                          out_table_path=os.path.join(data_dir, "out/tables", slice_name),
+                                          table_columns=["id"], salt="", salt_location="prepend",
+                                          columns_to_anonymize=["id"], anonymizer=anonymizer, delimiter=",",
+                                          table_has_headers=False, write_columns_to_manifest=True)
+        with open(os.path.join(data_dir, "in/tables/part_0.csv"), "w") as slice_file:
+            slice_file.write("1\n2\n")
+
+        with self.assertRaisesRegex(UserException, "part_1.csv"):
+            comp._anonymize_slices("test.csv", slice_jobs, anonymizer)
+
+
+class TestPerformanceReport(unittest.TestCase):
+
+    def test_report_written(self):
+        data_dir = create_data_dir(self, {"method": "MD5", "tables_to_encrypt": {"test.csv": ["name"]},
+                                          "performance_report": "out/files/performance.json"})
+        write_table(data_dir, "id,name\n1,a\n2,b\n3,c\n")
+        write_table(data_dir, "id\n1\n", name="other.csv")
+        create_component(data_dir).run()
+
+        with open(os.path.join(data_dir, "out/files/performance.json")) as report_file:
+            report = json.load(report_file)
+        self.assertEqual(report["stages"]["anonymize_columns"]["rows"], 3)
+        self.assertEqual(report["stages"]["anonymize_columns"]["cells"], 3)
+        self.assertEqual(report["stages"]["anonymize_table"]["rows"], 3)
+        self.assertEqual(report["stages"]["passthrough"]["bytes_out"], 5)
+
+    def test_pipeline_queue_waits_reported(self):
+        data_dir = create_data_dir(self, {"method": "MD5", "tables_to_encrypt": {"test.csv": ["name"]},
+                                          "engine": "pipelined", "read_buffer_mb": 0.001, "pipeline_queue_size": 1,
+                                          "performance_report": "out/files/performance.json"})
+        write_table(data_dir, "id,name\n" + "".join(f"{i},name{i}\n" for i in range(1000)))
+        create_component(data_dir).run()
+
+        with open(os.path.join(data_dir, "out/files/performance.json")) as report_file:
+            report = json.load(report_file)
+        stage = report["stages"]["anonymize_columns"]
+        self.assertEqual(stage["rows"], 1000)
+        self.assertEqual(set(stage["queue_wait"]), {"reader_blocked", "compute_starved", "compute_blocked",
+                                                    "writer_starved"})
+
+
+class TestProfile(unittest.TestCase):
+
+    def create_profiled_table(self, parameters: dict) -> str:
+        data_dir = create_data_dir(self, {"method": "SHA256", "tables_to_encrypt": {"test.csv": ["country"]},
+                                          **parameters})
+        write_table(data_dir, "id,country\n" + "".join(f"{i},{['CZ', 'SK'][i % 2]}\n" for i in range(100)))
+        return data_dir
+
+    def test_profile_action(self):
+        data_dir = self.create_profiled_table({})
+        profile = create_component(data_dir).profile_tables()
+        self.assertEqual(profile["tables"][0]["estimated_rows"], 100)
+        self.assertEqual(profile["tables"][0]["columns"][0]["distinct_values"], 2)
+        self.assertEqual(profile["hash_throughput"]["hash_length"], 64)
+        self.assertEqual(profile["recommended_settings"]["max_workers"], 1)
+
+    def test_auto_tune_keeps_configured_settings(self):
+        data_dir = self.create_profiled_table({"auto_tune": True, "max_workers": 3})
+        component = create_component(data_dir)
+        component.run()
+        self.assertEqual(component.configuration.parameters["max_workers"], 3)
+        self.assertEqual(component.configuration.parameters["table_workers"], 1)
+        self.assertEqual(component.configuration.parameters["cache_size_mb"], 1)
+        self.assertTrue(os.path.isfile(os.path.join(data_dir, "out/tables/test.csv")))
+
+
+class TestColumnProjection(unittest.TestCase):
+
+    def test_table_rule_validation(self):
+        self.assertEqual(Component.parse_table_rule(["name"]), (["name"], {}))
+        self.assertEqual(Component.parse_table_rule({"columns": ["name"], "keep": ["id", "name"]}),
+                         (["name"], {"keep": ["id", "name"]}))
+        for table_rule in [{"columns": ["name"], "drop": ["id"], "keep": ["name"]}, {"column": ["name"]},
+                           {"columns": ["name"], "drop": "id"}]:
+            with self.assertRaises(UserException):
+                Component.parse_table_rule(table_rule)
+
+    def test_sliced_table_projected(self):
+        data_dir = create_data_dir(self, {"method": "MD5", "max_workers": 2,
+                                          "tables_to_encrypt": {"test.csv": {"columns": ["name", "note"],
+                                                                             "keep": ["name", "id", "missing"]}}})
+        write_table(data_dir, {"part_0.csv": "1,a,x\n", "part_1.csv": "2,b,y\n"}, {"columns": ["id", "name", "note"]})
+        create_component(data_dir).run()
+
+        out_path = os.path.join(data_dir, "out/tables/test.csv")
+        with open(f"{out_path}.manifest") as manifest_file:
+            manifest = json.load(manifest_file)
+        # the manifest format depends on the data type support of the stack
+        columns = manifest.get("columns") or [column["name"] for column in manifest["schema"]]
+        self.assertEqual(columns, ["id", "name"])
+        encode = MD5Anonymizer().get_salted_encoder("", "prepend")
+        for part, row in [("part_0.csv", f"1,{encode('a')}\r\n"), ("part_1.csv", f"2,{encode('b')}\r\n")]:
+            with open(os.path.join(out_path, part), newline="") as slice_file:
+                self.assertEqual(slice_file.read(), row)
+
+    def test_all_columns_dropped(self):
+        comp = create_component(create_data_dir(self, {"method": "MD5"}))
+        with self.assertRaises(UserException):
+            comp.get_output_columns({"drop": ["id"]}, ["id"], "test.csv")
+
+
+class TestChunkedTable(unittest.TestCase):
+
+    def run_component(self, parameters: dict, manifest: Optional[dict] = None) -> str:
+        data_dir = create_data_dir(self, {"method": "MD5", "tables_to_encrypt": {"test.csv": ["name"]},
+                                          **parameters})
+        write_table(data_dir, "id,name\r\n" + "".join(f'{row_number},"name\r\n{row_number} ""quoted"""\r\n'
+                                                       for row_number in range(200)), manifest)
+        create_component(data_dir).run()
+        with open(os.path.join(data_dir, "out/tables/test.csv"), newline="") as out_file:
+            return out_file.read()
+
+    def test_chunks_match_sequential_output(self):
+        self.assertEqual(self.run_component({"chunk_size_mb": 0.001, "max_workers": 2}), self.run_component({}))
+
+    def test_manifest_without_enclosure(self):
+        manifest = {"delimiter": ",", "enclosure": ""}
+        output = self.run_component({"chunk_size_mb": 0.001, "max_workers": 2}, manifest)
+        self.assertEqual(output, self.run_component({}, manifest))
+        self.assertEqual(len(list(csv.reader(io.StringIO(output, newline="")))), 201)
+
+
+class TestOutputSlicing(unittest.TestCase):
+
+    def run_component(self, parameters: dict) -> dict:
+        data_dir = create_data_dir(self, {"method": "MD5", "tables_to_encrypt": {"test.csv": ["name"]},
+                                          **parameters})
+        write_table(data_dir, "id,name\n" + "".join(f'{row_number:03d},"name\n{row_number:03d}"\n'
+                                                     for row_number in range(100)))
+        create_component(data_dir).run()
+        out_path = os.path.join(data_dir, "out/tables/test.csv")
+        with open(f"{out_path}.manifest") as manifest_file:
+            manifest = json.load(manifest_file)
+        slices = {}
+        for slice_name in sorted(os.listdir(out_path)):
+            with open_table_file(os.path.join(out_path, slice_name)) as slice_file:
+                slices[slice_name] = slice_file.read()
+        return dict(manifest=manifest, slices=slices)
+
+    def test_row_limit(self):
+        output = self.run_component({"output_slice_rows": 30})
+        self.assertEqual(len(output["slices"]), 4)
+        self.assertEqual(list(output["slices"].values())[-1].count("\n"), 10)
+        self.assertIn("id", json.dumps(output["manifest"]))
+        self.assertFalse(list(output["slices"].values())[0].startswith("id,name"))
+
+    def test_byte_limit_compressed_chunks(self):
+        output = self.run_component({"output_slice_mb": 0.0005, "compress_output": True,
+                                     "chunk_size_mb": 0.002, "max_workers": 2})
+        sequential = self.run_component({"output_slice_rows": 1000})
+        self.assertGreater(len(output["slices"]), 2)
+        self.assertTrue(all(name.endswith(".csv.gz") for name in output["slices"]))
+        self.assertTrue(all(len(content) <= 524 for content in output["slices"].values()))
+        self.assertEqual("".join(output["slices"].values()), "".join(sequential["slices"].values()))
+
+    def test_limit_validation(self):
+        comp = create_component(create_data_dir(self, {"method": "MD5", "output_slice_rows": 1.5}))
+        with self.assertRaises(UserException):
+            comp.get_output_slicing()
+
+
+class TestIncrementalSlices(unittest.TestCase):
+
+    def run_component(self, data_dir: str) -> dict:
+        shutil.rmtree(os.path.join(data_dir, "out/tables"))
+        os.makedirs(os.path.join(data_dir, "out/tables"))
+        create_component(data_dir).run()
+        shutil.copy(os.path.join(data_dir, "out/state.json"), os.path.join(data_dir, "in/state.json"))
+        out_path = os.path.join(data_dir, "out/tables/test.csv")
+        with open(f"{out_path}.manifest") as manifest_file:
+            return dict(manifest=json.load(manifest_file), slices=sorted(os.listdir(out_path)))
+
+    def test_full_load_is_fully_reprocessed(self):
+        data_dir = create_data_dir(self, {"method": "MD5", "incremental_slices": True,
+                                          "tables_to_encrypt": {"test.csv": ["name"]}})
+        table_path = write_table(data_dir, {"part_0.csv": "1,a\n", "part_1.csv": "2,b\n"},
+                                 {"columns": ["id", "name"], "incremental": False})
+        self.assertEqual(self.run_component(data_dir)["slices"], ["part_0.csv", "part_1.csv"])
+
+        with open(os.path.join(table_path, "part_1.csv"), "w") as slice_file:
+            slice_file.write("2,c\n")
+        second_run = self.run_component(data_dir)
+        self.assertEqual(second_run["slices"], ["part_0.csv", "part_1.csv"])
+        self.assertFalse(second_run["manifest"].get("incremental"))
+
+    def test_incremental_load_with_primary_key_skips_unchanged_slices(self):
+        data_dir = create_data_dir(self, {"method": "MD5", "incremental_slices": True,
+                                          "tables_to_encrypt": {"test.csv": ["name"]}})
+        table_path = write_table(data_dir, {"part_0.csv": "1,a\n", "part_1.csv": "2,b\n"},
+                                 {"columns": ["id", "name"], "incremental": True, "primary_key": ["id"]})
+        self.assertEqual(self.run_component(data_dir)["slices"], ["part_0.csv", "part_1.csv"])
+
+        with open(os.path.join(table_path, "part_1.csv"), "w") as slice_file:
+            slice_file.write("2,c\n")
+        self.assertEqual(self.run_component(data_dir)["slices"], ["part_1.csv"])
+
+        os.remove(os.path.join(table_path, "part_1.csv"))
+        self.assertEqual(self.run_component(data_dir)["slices"], ["part_0.csv"])
+
+
+class TestPseudonymStore(unittest.TestCase):
+
+    def run_component(self, in_store_path: str = "") -> str:
+        data_dir = create_data_dir(self, {"method": "MD5", "#salt": "salt", "tables_to_encrypt": {"test.csv": ["name"]},
+                                          "pseudonym_store": "pseudonyms.sqlite",
+                                          "pseudonym_store_export": "pseudonyms.csv"})
+        write_table(data_dir, "id,name\n1,a\n2,b\n3,a\n")
+        if in_store_path:
+            shutil.copy(in_store_path, os.path.join(data_dir, "in/files/pseudonyms.sqlite"))
+        comp = create_component(data_dir)
+        comp.run()
+        self.run_stats = comp.pseudonym_stats[0]
+        return data_dir
+
+    def test_pseudonyms_reused_and_exported(self):
+        first_run = self.run_component()
+        self.assertEqual((self.run_stats.hits, self.run_stats.misses), (1, 2))
+
+        second_run = self.run_component(os.path.join(first_run, "out/files/pseudonyms.sqlite"))
+        self.assertEqual((self.run_stats.hits, self.run_stats.misses), (3, 0))
+        with open(os.path.join(second_run, "out/tables/pseudonyms.csv")) as export_file:
+            self.assertEqual(export_file.read().splitlines(), [f"{value},{MD5Anonymizer().encode_data('salt' + value)}"
+                                                               for value in ["a", "b"]])
+        with open(os.path.join(second_run, "out/tables/test.csv")) as out_file, \
+                open(os.path.join(first_run, "out/tables/test.csv")) as first_out_file:
+            self.assertEqual(out_file.read(), first_out_file.read())
+
+
+class TestAnonymizeColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        self.in_path = os.path.join(self.temp_dir, "in.csv")
+        self.out_path = os.path.join(self.temp_dir, "out.csv")
+
+    def anonymize(self, content: str, table_has_headers: bool = True, write_columns_to_manifest: bool = False):
+        with open(self.in_path, "w") as in_file:
+            in_file.write(content)
+        Component.anonymize_columns(self.in_path, self.out_path, ["id", "name"], "", "prepend", ["name"],
+                                    MD5Anonymizer(), ",", table_has_headers, write_columns_to_manifest)
+        with open(self.out_path, newline="") as out_file:
+            return out_file.read()
+
+    def test_header_kept_blank_lines_skipped_short_rows_padded(self):
+        self.assertEqual(self.anonymize("id,name\n\n1,a\n2\n"),
+                         "id,name\r\n1,0cc175b9c0f1b6a831c399e269772661\r\n2,d41d8cd98f00b204e9800998ecf8427e\r\n")
+
+    def test_header_skipped_when_columns_in_manifest(self):
+        self.assertEqual(self.anonymize("id,name\n1,a\n", write_columns_to_manifest=True),
+                         "1,0cc175b9c0f1b6a831c399e269772661\r\n")
+
+    def test_row_with_extra_values_fails(self):
+        with self.assertRaises(ValueError):
+            self.anonymize("1,a,extra\n", table_has_headers=False)
+
+
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
     unittest.main()
@@ -0,0 +1,123 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from csv_tools import open_table_file, read_header, sniff_dialect, split_byte_ranges, OutputSlicing, \
+    SlicedTableWriter
+
+
+class TestReadHeader(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+
+    def test_single_file(self):
+        table_path = os.path.join(self.temp_dir, "test.csv")
+        with open(table_path, "w") as table_file:
+            table_file.write('id;"multi\nline";name\n1;2;3\n')
+        self.assertEqual(read_header(table_path, delimiter=";"), ["id", "multi\nline", "name"])
+
+    def test_gzipped_slices(self):
+        table_path = os.path.join(self.temp_dir, "test.csv.gz")
+        os.makedirs(table_path)
+        for part, content in [("part_1.csv.gz", "b,c\n"), ("part_0.csv.gz", "id,name\n1,2\n")]:
+            with gzip.open(os.path.join(table_path, part), "wt") as slice_file:
+                slice_file.write(content)
+        self.assertEqual(read_header(table_path), ["id", "name"])
+
+    def test_empty_table(self):
+        table_path = os.path.join(self.temp_dir, "empty.csv")
+        open(table_path, "w").close()
+        self.assertEqual(read_header(table_path), [])
+
+    def test_sniff_dialect(self):
+        table_path = os.path.join(self.temp_dir, "test.csv")
+        with open(table_path, "w") as table_file:
+            table_file.write("id|name\n1|a\n2|b\n")
+        self.assertEqual(sniff_dialect(table_path).delimiter, "|")
+
+
+class TestOpenTableFile(unittest.TestCase):
+
+    def test_gzip_output_is_reproducible(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        contents = []
+        for name in ["first", "second"]:
+            os.makedirs(os.path.join(temp_dir, name))
+            table_path = os.path.join(temp_dir, name, "part_0.csv.gz")
+            with open_table_file(table_path, "w", compression_level=1) as table_file:
+                table_file.write("id,name\n")
+            with open(table_path, "rb") as table_file:
+                contents.append(table_file.read())
+            with open_table_file(table_path) as table_file:
+                self.assertEqual(table_file.read(), "id,name\n")
+        self.assertEqual(contents[0], contents[1])
+
+
+class TestSlicedTableWriter(unittest.TestCase):
+
+    def write(self, rows, slicing: OutputSlicing):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        out_dir = os.path.join(temp_dir, "test.csv")
+        with SlicedTableWriter(out_dir, slicing) as writer:
+            writer.write_rows(rows[:3])
+            writer.write_rows(rows[3:])
+        slices = []
+        for slice_name in writer.slice_names:
+            with open_table_file(os.path.join(out_dir, slice_name), "rb") as slice_file:
+                slices.append(slice_file.read())
+        return writer.slice_names, slices
+
+    def test_row_limit_across_batches(self):
+        rows = [f"{number}\n".encode() for number in range(7)]
+        names, slices = self.write(rows, OutputSlicing(max_rows=2))
+        self.assertEqual(names, ["part_00000.csv", "part_00001.csv", "part_00002.csv", "part_00003.csv"])
+        self.assertEqual(slices, [b"0\n1\n", b"2\n3\n", b"4\n5\n", b"6\n"])
+
+    def test_byte_limit_keeps_rows_whole(self):
+        rows = [b"a\n", b"bb\n", b"long row\n", b"c\n", b"d\n"]
+        names, slices = self.write(rows, OutputSlicing(max_bytes=5))
+        self.assertEqual(slices, [b"a\nbb\n", b"long row\n", b"c\nd\n"])
+
+    def test_compressed_prefixed_slices(self):
+        rows = [b"1\n", b"2\n", b"3\n"]
+        names, slices = self.write(rows, OutputSlicing(max_rows=2, compress=True).with_prefix("part_00001_"))
+        self.assertEqual(names, ["part_00001_00000.csv.gz", "part_00001_00001.csv.gz"])
+        self.assertEqual(slices, [b"1\n2\n", b"3\n"])
+
+
+class TestSplitByteRanges(unittest.TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        self.table_path = os.path.join(temp_dir, "test.csv")
+
+    def split(self, content: bytes, chunk_size: int, enclosure: str = '"'):
+        with open(self.table_path, "wb") as table_file:
+            table_file.write(content)
+        byte_ranges = split_byte_ranges(self.table_path, chunk_size, enclosure)
+        return [content[start:end] for start, end in byte_ranges]
+
+    def test_ranges_end_at_records(self):
+        self.assertEqual(self.split(b"id\r\n1\r\n22\r\n333\r\n", 3), [b"id\r\n", b"1\r\n22\r\n", b"333\r\n"])
+
+    def test_enclosed_newlines_do_not_end_records(self):
+        self.assertEqual(self.split(b'1,"a\nb ""c""\nd"\n2,x\n', 2), [b'1,"a\nb ""c""\nd"\n', b"2,x\n"])
+
+    def test_without_enclosure_every_newline_ends_record(self):
+        self.assertEqual(self.split(b'1,"a\nb"\n', 2, enclosure=""), [b'1,"a\n', b'b"\n'])
+
+    def test_range_is_read_as_text(self):
+        self.split(b"id\n1\n2\n", 100)
+        with open_table_file(self.table_path, byte_range=(3, 5)) as range_file:
+            self.assertEqual(range_file.read(), "1\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import gzip
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+import py7zr
+
+from decompress import Decompressor, DecompressorException
+
+MEMBERS = {"one.csv": b"id,name\n1,a\n", "nested/two.csv": b"id,name\n" + b"2,b\n" * 100000, "empty.csv": b""}
+
+
+class TestDecompressor(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        source_dir = os.path.join(self.temp_dir, "source")
+        for name, content in MEMBERS.items():
+            os.makedirs(os.path.dirname(os.path.join(source_dir, name)), exist_ok=True)
+            with open(os.path.join(source_dir, name), "wb") as member_file:
+                member_file.write(content)
+        self.archives = {}
+        self.archives[".zip"] = os.path.join(self.temp_dir, "archive.zip")
+        with zipfile.ZipFile(self.archives[".zip"], "w", zipfile.ZIP_DEFLATED) as zip_file:
+            for name in MEMBERS:
+                zip_file.write(os.path.join(source_dir, name), name)
+        self.archives[".tar.gz"] = os.path.join(self.temp_dir, "archive.tar.gz")
+        with tarfile.open(self.archives[".tar.gz"], "w:gz") as tar_file:
+            for name in MEMBERS:
+                tar_file.add(os.path.join(source_dir, name), name)
+        self.archives[".7z"] = os.path.join(self.temp_dir, "archive.7z")
+        with py7zr.SevenZipFile(self.archives[".7z"], "w") as seven_zip_file:
+            for name in MEMBERS:
+                seven_zip_file.write(os.path.join(source_dir, name), name)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_members_are_streamed(self):
+        for archive_format, archive_path in self.archives.items():
+            with self.subTest(archive_format):
+                members = {name: stream.read() for name, stream in Decompressor.iter_members(archive_path)}
+                self.assertEqual(members, MEMBERS)
+
+    def test_gzip_member(self):
+        gzip_path = os.path.join(self.temp_dir, "table.csv.gz")
+        with gzip.open(gzip_path, "wb") as gzip_file:
+            gzip_file.write(MEMBERS["one.csv"])
+        self.assertEqual([(name, stream.read()) for name, stream in Decompressor.iter_members(gzip_path)],
+                         [("table.csv", MEMBERS["one.csv"])])
+
+    def test_stopped_7z_reading(self):
+        for name, stream in Decompressor.iter_members(self.archives[".7z"]):
+            self.assertEqual(stream.read(2), MEMBERS[name][:2])
+            break
+
+    def test_decompress_all_in_parallel(self):
+        # registering the formats twice must not fail
+        decompressor, _ = Decompressor(workers=3), Decompressor()
+        archives = [(path, os.path.join(self.temp_dir, "out", archive_format))
+                    for archive_format, path in self.archives.items()]
+        all_metrics = decompressor.decompress_all(archives)
+
+        for (path, out_path), metrics in zip(archives, all_metrics):
+            self.assertEqual(metrics.archive, path)
+            self.assertEqual(metrics.members, 3)
+            self.assertEqual(metrics.bytes_out, sum(map(len, MEMBERS.values())))
+            with open(os.path.join(out_path, "nested", "two.csv"), "rb") as member_file:
+                self.assertEqual(member_file.read(), MEMBERS["nested/two.csv"])
+
+    def test_member_outside_of_output_is_rejected(self):
+        archive_path = os.path.join(self.temp_dir, "evil.zip")
+        with zipfile.ZipFile(archive_path, "w") as zip_file:
+            zip_file.writestr("../evil.csv", "1")
+        with self.assertRaisesRegex(DecompressorException, "outside"):
+            Decompressor().decompress(archive_path, os.path.join(self.temp_dir, "out"))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "evil.csv")))
+
+    def test_corrupt_member(self):
+        gzip_path = os.path.join(self.temp_dir, "table.csv.gz")
+        with open(gzip_path, "wb") as gzip_file:
+            gzip_file.write(gzip.compress(MEMBERS["nested/two.csv"])[:-100])
+        with zipfile.ZipFile(self.archives[".zip"]) as zip_file:
+            info = zip_file.getinfo("nested/two.csv")
+        with open(self.archives[".zip"], "r+b") as zip_file:
+            # the middle of the compressed data of the member, after its local header
+            zip_file.seek(info.header_offset + 30 + len(info.filename) + info.compress_size // 2)
+            zip_file.write(b"\xff" * 8)
+        with open(self.archives[".tar.gz"], "r+b") as tar_file:
+            tar_file.truncate(os.path.getsize(self.archives[".tar.gz"]) // 2)
+        for archive_path in [gzip_path, self.archives[".zip"], self.archives[".tar.gz"]]:
+            with self.subTest(os.path.basename(archive_path)):
+                with self.assertRaisesRegex(DecompressorException, "cannot be processed"):
+                    Decompressor().decompress(archive_path, os.path.join(self.temp_dir, "out"))
+
+    def test_unsupported_file(self):
+        with self.assertRaisesRegex(DecompressorException, "unsupported file type"):
+            Decompressor().decompress(os.path.join(self.temp_dir, "table.csv"), self.temp_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+import gzip
+import importlib.util
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from anonymization import BLAKE2Anonymizer, HMACAnonymizer, MD5Anonymizer, SHAAnonymizer
+from component import Component
+from engines import ENGINE_ARROW, ENGINE_BYTES, ENGINE_CSV, ENGINE_PIPELINED, PipelineSettings, PipelineStats
+
+
+@unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+class TestArrowEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+
+    def assert_engines_match(self, content: str, table_has_headers: bool = True,
+                             write_columns_to_manifest: bool = False):
+        in_path = os.path.join(self.temp_dir, "in.csv")
+        with open(in_path, "w", newline="") as in_file:
+            in_file.write(content)
+        outputs, row_counts = [], []
+        for engine in [ENGINE_CSV, ENGINE_ARROW]:
+            out_path = os.path.join(self.temp_dir, f"{engine}.csv")
+            row_count = Component.anonymize_columns(in_path, out_path, ["id", "name", "note"], "salt", "append",
+                                                    ["name"], SHAAnonymizer("256"), ",", table_has_headers,
+                                                    write_columns_to_manifest, engine=engine)
+            with open(out_path, "rb") as out_file:
+                outputs.append(out_file.read())
+            row_counts.append(row_count)
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(row_counts[0], row_counts[1])
+
+    def test_quoting_and_newlines(self):
+        self.assert_engines_match('id,name,note\r\n1,"a\r\nb","x,y"\r\n\r\n2,"say ""hi""",\r\n3,a,""\r\n')
+
+    def test_header_in_manifest(self):
+        self.assert_engines_match("id,name,note\n1,a,b\n2,a,c\n", write_columns_to_manifest=True)
+
+    def test_short_rows_fall_back_to_csv_engine(self):
+        self.assert_engines_match("1,a\n2,b,c\n", table_has_headers=False)
+
+
+class TestBytesEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+
+    def run_engine(self, engine: str, in_path: str, out_name: str, enclosure: str = '"',
+                   table_has_headers: bool = True, write_columns_to_manifest: bool = False):
+        out_path = os.path.join(self.temp_dir, out_name)
+        row_count = Component.anonymize_columns(in_path, out_path, ["id", "name", "note"], "salt", "append",
+                                                ["name", "note"], SHAAnonymizer("256"), ",", table_has_headers,
+                                                write_columns_to_manifest, engine=engine, enclosure=enclosure)
+        opener = gzip.open if out_path.endswith(".gz") else open
+        with opener(out_path, "rb") as out_file:
+            return out_file.read(), row_count
+
+    def assert_engines_match(self, content: str, suffix: str = ".csv", **kwargs):
+        in_path = os.path.join(self.temp_dir, "in" + suffix)
+        opener = gzip.open if suffix.endswith(".gz") else open
+        with opener(in_path, "wb") as in_file:
+            in_file.write(content.encode("utf-8"))
+        expected = self.run_engine(ENGINE_CSV, in_path, "csv" + suffix, **kwargs)
+        self.assertEqual(expected, self.run_engine(ENGINE_BYTES, in_path, "bytes" + suffix, **kwargs))
+
+    def test_quoting_and_newlines(self):
+        self.assert_engines_match('id,name,note\r\n1,"a\r\nb","x,y"\r\n\r\n2,"say ""hi""",\r\n3,a,""\n4,č\rř,\n')
+
+    def test_header_in_manifest(self):
+        self.assert_engines_match("id,name,note\n1,a,b\n2,a,c\n", write_columns_to_manifest=True)
+
+    def test_short_rows(self):
+        self.assert_engines_match("1,a\n2,b,c\n\n3\n", table_has_headers=False)
+
+    def test_custom_enclosure(self):
+        self.assert_engines_match("id,name,note\n1,'a,b',\"c\n2,'it''s',d\n", enclosure="'")
+
+    def test_gzipped_table(self):
+        self.assert_engines_match('id,name,note\n1,"a\nb",c\n2,d,e\n', suffix=".csv.gz")
+
+    def test_malformed_enclosures(self):
+        self.assert_engines_match('id,name,note\n1,a"b,c"d\n2,"e"f,"g\r3,h\n4,i,j\n"k\n', table_has_headers=False)
+
+    def test_unclosed_enclosure_is_limited(self):
+        in_path = os.path.join(self.temp_dir, "in.csv")
+        with open(in_path, "w") as in_file:
+            in_file.write('id,name,note\n1,"a,b\n' + "2,c,d\n" * 100)
+        with mock.patch("engines.bytes_engine.MAX_RECORD_SIZE", 100):
+            with self.assertRaisesRegex(ValueError, "unclosed enclosure"):
+                self.run_engine(ENGINE_BYTES, in_path, "bytes.csv")
+
+    def test_bytes_encoders_match_str_encoders(self):
+        anonymizers = [MD5Anonymizer(), SHAAnonymizer("512"), BLAKE2Anonymizer("s", 8), HMACAnonymizer()]
+        for anonymizer in anonymizers:
+            for salt_location in ["prepend", "append"]:
+                encode = anonymizer.get_salted_encoder("salt", salt_location)
+                encode_bytes = anonymizer.get_salted_bytes_encoder("salt", salt_location)
+                for value in ["", "a", "žluťoučký kůň"]:
+                    self.assertEqual(encode(value).encode(), encode_bytes(value.encode()))
+
+
+class TestPipelinedEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+
+    def run_engine(self, engine: str, content: str, suffix: str = ".csv", **kwargs):
+        in_path = os.path.join(self.temp_dir, "in" + suffix)
+        opener = gzip.open if suffix.endswith(".gz") else open
+        with opener(in_path, "wb") as in_file:
+            in_file.write(content.encode("utf-8"))
+        out_path = os.path.join(self.temp_dir, engine + suffix)
+        row_count = Component.anonymize_columns(in_path, out_path, ["id", "name", "note"], "salt", "prepend", ["name"],
+                                                SHAAnonymizer("256"), ",", True, False, engine=engine, **kwargs)
+        with opener(out_path, "rb") as out_file:
+            return out_file.read(), row_count
+
+    def assert_engines_match(self, content: str, suffix: str = ".csv"):
+        # buffers smaller than a line and single slot queues exercise the block splitting and the back pressure
+        settings = PipelineSettings(read_buffer_size=7, write_buffer_size=5, queue_size=1)
+        stats = PipelineStats()
+        self.assertEqual(self.run_engine(ENGINE_BYTES, content, suffix),
+                         self.run_engine(ENGINE_PIPELINED, content, suffix, pipeline=settings, pipeline_stats=stats))
+        self.assertIn(stats.bottleneck, ["read", "compute", "write"])
+
+    def test_quoted_newlines_across_blocks(self):
+        self.assert_engines_match('id,name,note\n' + '1,"a\nb\nc","x,y"\n2,b,c\n3,"d\r\ne",f\n' * 20)
+
+    def test_gzipped_table(self):
+        self.assert_engines_match("id,name,note\n" + "".join(f"{i},n{i % 7},x\n" for i in range(1000)), ".csv.gz")
+
+    def test_empty_table(self):
+        self.assert_engines_match("")
+
+    def test_error_is_raised(self):
+        with self.assertRaisesRegex(ValueError, "Row 3 contains 4 values"):
+            self.run_engine(ENGINE_PIPELINED, "id,name,note\n1,a,b\n2,a,b,c\n" + "3,a,b\n" * 10000,
+                            pipeline=PipelineSettings(read_buffer_size=16, queue_size=1))
+
+    def test_bottleneck(self):
+        self.assertEqual(PipelineStats(compute_starved=2.0, reader_blocked=1.0).bottleneck, "read")
+        self.assertEqual(PipelineStats(compute_blocked=2.0, reader_blocked=1.0).bottleneck, "write")
+        self.assertEqual(PipelineStats(reader_blocked=2.0, writer_starved=2.0).bottleneck, "compute")
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+class TestColumnProjection(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        self.engines = [ENGINE_CSV, ENGINE_BYTES, ENGINE_PIPELINED]
+        if importlib.util.find_spec("pyarrow"):
+            self.engines.append(ENGINE_ARROW)
+
+    def assert_engines_project(self, content: str, output_columns, expected: bytes):
+        in_path = os.path.join(self.temp_dir, "in.csv")
+        with open(in_path, "w", newline="") as in_file:
+            in_file.write(content)
+        for engine in self.engines:
+            out_path = os.path.join(self.temp_dir, f"{engine}.csv")
+            row_count = Component.anonymize_columns(in_path, out_path, ["id", "name", "note"], "salt", "append",
+                                                    ["name"], MD5Anonymizer(), ",", True, False, engine=engine,
+                                                    output_columns=output_columns)
+            with open(out_path, "rb") as out_file:
+                self.assertEqual(out_file.read(), expected, engine)
+            self.assertEqual(row_count, 2, engine)
+
+    def test_dropped_column_not_written(self):
+        name_hash = MD5Anonymizer().get_salted_encoder("salt", "append")("a").encode()
+        self.assert_engines_project('id,name,note\n1,a,"x\ny"\n2,a,z\n', ["id", "name"],
+                                    b"id,name\r\n1," + name_hash + b"\r\n2," + name_hash + b"\r\n")
+
+    def test_single_empty_column_is_enclosed(self):
+        self.assert_engines_project('id,name,note\n1,a,\n2,"b,c",""\n', ["note"], b'note\r\n""\r\n""\r\n')
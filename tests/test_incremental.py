@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from incremental import SliceState, IncrementalStateException, config_fingerprint
+
+
+class TestSliceState(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        self.slice_paths = {}
+        for slice_name in ["part_0.csv", "part_1.csv"]:
+            self.slice_paths[slice_name] = os.path.join(self.temp_dir, slice_name)
+            self.write_slice(slice_name, f"{slice_name}\n")
+
+    def write_slice(self, slice_name: str, content: str):
+        with open(self.slice_paths[slice_name], "w") as slice_file:
+            slice_file.write(content)
+
+    def run_twice(self, first_config: str, second_config: str):
+        first_run = SliceState({})
+        self.assertEqual(first_run.get_changed_slices("test.csv", first_config, self.slice_paths),
+                         ["part_0.csv", "part_1.csv"])
+        return SliceState(first_run.to_dict()).get_changed_slices("test.csv", second_config, self.slice_paths)
+
+    def test_unchanged_slices_skipped(self):
+        config = config_fingerprint(method="MD5", salt="salt", columns=["id"])
+        self.assertEqual(self.run_twice(config, config), [])
+
+    def test_changed_slice_processed(self):
+        config = config_fingerprint(method="MD5", salt="salt", columns=["id"])
+        first_run = SliceState({})
+        first_run.get_changed_slices("test.csv", config, self.slice_paths)
+        self.write_slice("part_1.csv", "changed\n")
+        self.assertEqual(SliceState(first_run.to_dict()).get_changed_slices("test.csv", config, self.slice_paths),
+                         ["part_1.csv"])
+
+    def test_config_change_invalidates_state(self):
+        self.assertEqual(self.run_twice(config_fingerprint(method="MD5", salt="salt", columns=["id"]),
+                                        config_fingerprint(method="MD5", salt="other", columns=["id"])),
+                         ["part_0.csv", "part_1.csv"])
+
+    def test_removed_slices(self):
+        config = config_fingerprint(method="MD5", salt="salt", columns=["id"])
+        first_run = SliceState({})
+        first_run.get_changed_slices("test.csv", config, self.slice_paths)
+        second_run = SliceState(first_run.to_dict())
+        remaining_slices = {"part_0.csv": self.slice_paths["part_0.csv"]}
+        self.assertEqual(second_run.get_removed_slices("test.csv", config, remaining_slices), ["part_1.csv"])
+        self.assertEqual(second_run.get_removed_slices("test.csv", "other", {}), [])
+
+    def test_salt_not_stored(self):
+        state = SliceState({})
+        state.get_changed_slices("test.csv", config_fingerprint(salt="secret-salt"), self.slice_paths)
+        self.assertNotIn("secret-salt", str(state.to_dict()))
+
+    def test_other_tables_kept(self):
+        state = SliceState({"other.csv": {"config": "x", "slices": {}}})
+        state.get_changed_slices("test.csv", "y", self.slice_paths)
+        self.assertEqual(set(state.to_dict()), {"other.csv", "test.csv"})
+
+    def test_invalid_mode(self):
+        with self.assertRaises(IncrementalStateException):
+            SliceState({}, "size")
+
+
+if __name__ == "__main__":
+    unittest.main()
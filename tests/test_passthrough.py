@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from passthrough import Passthrough, PassthroughException
+
+
+class TestPassthrough(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        self.source = os.path.join(self.temp_dir, "in", "table.csv")
+        os.makedirs(os.path.join(self.source))
+        for slice_name in ["part_0.csv", "part_1.csv"]:
+            with open(os.path.join(self.source, slice_name), "w") as slice_file:
+                slice_file.write("1,2\n")
+        self.destination = os.path.join(self.temp_dir, "out", "table.csv")
+
+    def transfer(self, mode: str) -> Passthrough:
+        passthrough = Passthrough(mode)
+        passthrough.transfer(self.source, self.destination)
+        self.assertEqual(sorted(os.listdir(self.destination)), ["part_0.csv", "part_1.csv"])
+        return passthrough
+
+    def test_link_keeps_input(self):
+        passthrough = self.transfer("link")
+        self.assertTrue(os.path.exists(os.path.join(self.source, "part_0.csv")))
+        self.assertEqual(sum(stats.bytes for stats in passthrough.stats.values()), 8)
+
+    def test_move_removes_input(self):
+        passthrough = self.transfer("move")
+        self.assertFalse(os.path.exists(os.path.join(self.source, "part_0.csv")))
+        self.assertEqual(passthrough.stats["rename"].files, 2)
+
+    def test_copy_replaces_existing_output(self):
+        os.makedirs(self.destination)
+        with open(os.path.join(self.destination, "part_0.csv"), "w") as slice_file:
+            slice_file.write("old")
+        passthrough = self.transfer("copy")
+        with open(os.path.join(self.destination, "part_0.csv")) as slice_file:
+            self.assertEqual(slice_file.read(), "1,2\n")
+        self.assertEqual(list(passthrough.stats), ["copy"])
+
+    def test_default_copy_does_not_share_input(self):
+        passthrough = Passthrough()
+        passthrough.transfer(self.source, self.destination)
+        source_stat = os.stat(os.path.join(self.source, "part_0.csv"))
+        self.assertNotEqual(os.stat(os.path.join(self.destination, "part_0.csv")).st_ino, source_stat.st_ino)
+        self.assertEqual(list(passthrough.stats), ["copy"])
+
+    def test_unsupported_mode(self):
+        with self.assertRaises(PassthroughException):
+            Passthrough("teleport")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,20 @@
+import fnmatch
+import unittest
+
+from pattern_matching import PatternMatcher
+
+
+class TestPatternMatcher(unittest.TestCase):
+
+    def test_matches_like_fnmatch(self):
+        patterns = ["test.csv", "*.csv", "in.c-*.orders?.csv", "[ab]*.csv", "*.csv.gz"]
+        matcher = PatternMatcher(patterns)
+        for name in ["test.csv", "other.csv", "in.c-main.orders1.csv", "a.csv", "test.csv.gz", "test.txt", "*.csv"]:
+            self.assertEqual(matcher.match(name), [pattern for pattern in patterns if fnmatch.fnmatch(name, pattern)])
+
+    def test_no_patterns(self):
+        self.assertEqual(PatternMatcher([]).match("test.csv"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from profiling import TableProfile, ColumnProfile, sample_table, measure_hash_throughput, recommend_settings
+
+
+class TestSampleTable(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+
+    def write_table(self, name: str, rows: range, header: bool = True) -> str:
+        path = os.path.join(self.temp_dir, name)
+        content = ("id,country,email\n" if header else "") + "".join(
+            f"{i:06d},{['CZ', 'US'][i % 2]},user{i:06d}@example.com\n" for i in rows)
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(path, "wb") as table_file:
+            table_file.write(content.encode("utf-8"))
+        return path
+
+    def test_whole_table_is_exact(self):
+        path = self.write_table("table.csv", range(100))
+        profile = sample_table("table.csv", [path], ["id", "country", "email"], ["country", "email"], ",", '"', True)
+        self.assertTrue(profile.exact)
+        self.assertEqual(profile.estimated_rows, 100)
+        self.assertEqual(profile.estimated_bytes, os.path.getsize(path))
+        country, email = profile.columns
+        self.assertEqual((country.distinct_values, country.distinct_ratio), (2, 0.02))
+        self.assertEqual(email.distinct_ratio, 1.0)
+
+    def test_sample_is_extrapolated(self):
+        path = self.write_table("table.csv", range(100000))
+        profile = sample_table("table.csv", [path], ["id", "country", "email"], ["email"], ",", '"', True,
+                               sample_rows=1000)
+        self.assertFalse(profile.exact)
+        self.assertEqual(profile.sampled_rows, 1000)
+        self.assertAlmostEqual(profile.estimated_rows, 100000, delta=1000)
+
+    def test_gzipped_slices(self):
+        paths = [self.write_table(f"part_{i}.csv.gz", range(i * 50000, (i + 1) * 50000), header=False)
+                 for i in range(2)]
+        profile = sample_table("sliced", paths, ["id", "country", "email"], ["country"], ",", '"', False,
+                               sample_rows=20000)
+        self.assertFalse(profile.exact)
+        self.assertEqual(profile.files, 2)
+        self.assertAlmostEqual(profile.estimated_rows, 100000, delta=20000)
+        self.assertGreater(profile.estimated_bytes, profile.size)
+
+
+class TestRecommendSettings(unittest.TestCase):
+
+    def create_profile(self, files: int, size: int, rows: int, distinct_ratio: float) -> TableProfile:
+        profile = TableProfile("table.csv", files, size)
+        profile.sampled_rows = rows
+        profile.exact = True
+        profile.parse_time = rows / 1000000
+        profile.columns = [ColumnProfile("email", int(rows * distinct_ratio), rows, 20)]
+        return profile
+
+    def test_small_run_stays_sequential(self):
+        throughput = measure_hash_throughput(str.upper, ["a", "b"], min_time=0.01)
+        recommended = recommend_settings([self.create_profile(1, 1000, 100, 1.0)], throughput, 8, 100)
+        self.assertEqual(recommended, {"cache_size_mb": 0, "max_workers": 1, "table_workers": 1})
+
+    def test_large_tables(self):
+        throughput = {"values_per_second": 100000, "bytes_per_second": 2000000, "hash_length": 64}
+        profiles = [self.create_profile(1, 1024 ** 3, 10000000, 1.0),
+                    self.create_profile(4, 1000000, 1000000, 0.01)]
+        recommended = recommend_settings(profiles, throughput, 8, 100)
+        # 1 % of a million distinct values, each taking 20 + 64 + 100 bytes
+        self.assertEqual(recommended["cache_size_mb"], 2)
+        self.assertEqual(recommended["chunk_size_mb"], 128)
+        self.assertEqual(recommended["max_workers"], 8)
+        self.assertEqual(recommended["table_workers"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import threading
+import unittest
+
+from scheduling import TableScheduler, TableTask
+
+
+class TestTableScheduler(unittest.TestCase):
+
+    def test_largest_tables_started_first(self):
+        started = []
+        release = threading.Event()
+
+        def action(table_name: str):
+            started.append(table_name)
+            if len(started) == 2:
+                release.set()
+            release.wait(5)
+
+        tasks = [TableTask(name, size, lambda name=name: action(name))
+                 for name, size in [("small", 1), ("huge", 100), ("medium", 10), ("large", 50)]]
+        TableScheduler(workers=2).run(tasks)
+        self.assertEqual(sorted(started[:2]), ["huge", "large"])
+        self.assertEqual(sorted(started), ["huge", "large", "medium", "small"])
+
+    def test_single_worker_keeps_order(self):
+        processed = []
+        tasks = [TableTask(name, size, lambda name=name: processed.append(name))
+                 for name, size in [("small", 1), ("huge", 100)]]
+        TableScheduler().run(tasks)
+        self.assertEqual(processed, ["small", "huge"])
+
+    def test_failure_is_raised(self):
+        def fail():
+            raise ValueError("broken table")
+
+        tasks = [TableTask("ok", 1, lambda: None), TableTask("broken", 2, fail)]
+        with self.assertRaisesRegex(ValueError, "broken table"):
+            TableScheduler(workers=2).run(tasks)
+
+
+if __name__ == "__main__":
+    unittest.main()